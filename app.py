@@ -14,6 +14,7 @@ sys.path.insert(0, str(project_root))
 from src.data.loader import DataLoader
 from src.data.cleaner import DataCleaner
 from src.analysis.analyzer import HappinessAnalyzer
+from src.analysis.result_cache import ResultCache
 from src.visualization.charts import HappinessVisualizer
 
 # Configure logging
@@ -70,14 +71,12 @@ def run_analysis(whr_data):
     """Run statistical analysis."""
     try:
         analyzer = HappinessAnalyzer(whr_data)
-        pearson_corr, spearman_corr = analyzer.calculate_correlations()
         
-        significant = analyzer.get_significant_factors(pearson_corr, spearman_corr)
-        comparisons = analyzer.compare_nordic_countries()
-        hypotheses = analyzer.generate_hypotheses(significant, comparisons)
-        finland_profile = analyzer.get_finland_profile()
+        # Results persist on disk, so a fresh worker skips recomputation
+        results = analyzer.run_full_analysis(ResultCache(Path("data") / ".cache" / "results"))
         
-        return analyzer, pearson_corr, spearman_corr, significant, comparisons, hypotheses, finland_profile
+        return (analyzer, results["pearson"], results["spearman"], results["significant"],
+                results["comparisons"], results["hypotheses"], results["finland_profile"])
     except Exception as e:
         st.error(f"Error running analysis: {e}")
         return None, None, None, None, None, None, None
@@ -107,6 +106,13 @@ if page == "📊 Executive Summary":
             st.metric("Finland Global Rank", 
                      f"{finland_profile['global_rank']}/{finland_profile['total_countries']}")
             st.caption("World Happiness Report 2024")
+            try:
+                uncertainty = analyzer.simulate_rank_uncertainty(max_workers=1)["summary"]
+                finland = uncertainty.loc[finland_profile["country"]]
+                st.caption(f"95% rank interval: {finland['Rank lower']}-{finland['Rank upper']}, "
+                           f"P(#1) = {finland['P(#1)']:.1%}")
+            except (ValueError, KeyError):
+                pass
     
     with col2:
         if "score" in finland_profile:
@@ -164,7 +170,9 @@ elif page == "🔍 Data Explorer":
 elif page == "📈 Correlation Analysis":
     st.subheader("Statistical Correlations with Happiness Score")
     
-    tab1, tab2 = st.tabs(["Pearson Correlation", "Spearman Correlation"])
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["Pearson Correlation", "Spearman Correlation",
+                                                        "Factor Matrix", "Driver Model", "By Region",
+                                                        "Partial Correlation", "Country Influence"])
     
     with tab1:
         st.info("Pearson correlation measures linear relationships")
@@ -181,6 +189,52 @@ elif page == "📈 Correlation Analysis":
         st.info("Spearman correlation measures monotonic relationships")
         fig = HappinessVisualizer.create_correlation_bar_chart(spearman_corr, "Spearman Correlations", top_n=12)
         st.plotly_chart(fig, use_container_width=True)
+    
+    with tab3:
+        st.info("Pairwise correlations between all factors")
+        method = st.radio("Method", ["pearson", "spearman"], horizontal=True)
+        matrix, _ = analyzer.get_correlation_matrix(method)
+        fig = HappinessVisualizer.create_correlation_heatmap(matrix, f"{method.title()} Factor Correlations")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with tab4:
+        st.info("Standardized multivariate model: each driver's effect holding the others fixed")
+        alpha = st.slider("Ridge penalty", 0.0, 50.0, 0.0, step=1.0)
+        drivers = analyzer.fit_driver_model(mode="bootstrap", alpha=alpha)
+        full_fit = analyzer.fit_driver_model(alpha=alpha)
+        st.metric("R² (all countries)", f"{full_fit['r2'].iloc[0]:.3f}")
+        fig = HappinessVisualizer.create_driver_chart(drivers["summary"])
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(drivers["summary"], use_container_width=True)
+    
+    with tab5:
+        st.info("Correlations with the happiness score computed within each region")
+        if analyzer.REGION_COL in analyzer.whr_data.columns:
+            method = st.radio("Method", ["pearson", "spearman"], horizontal=True, key="region_method")
+            grid, _ = analyzer.calculate_grouped_correlations(method=method)
+            fig = HappinessVisualizer.create_correlation_heatmap(grid, f"{method.title()} Correlations by Region")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("The loaded WHR data has no region column")
+    
+    with tab6:
+        st.info("Correlations with the happiness score after removing the effect of the chosen covariates")
+        candidates = list(pearson_corr.index)
+        default = [col for col in candidates if "GDP" in col][:1]
+        covariates = st.multiselect("Control for", candidates, default=default)
+        partial = analyzer.calculate_partial_correlations(covariates)
+        fig = HappinessVisualizer.create_correlation_bar_chart(partial, "Partial Correlations", top_n=12)
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(partial, use_container_width=True)
+    
+    with tab7:
+        st.info("How much each country moves a factor's correlation (full sample minus leave-that-country-out)")
+        influence = analyzer.calculate_influence()["influence"]
+        factor = st.selectbox("Factor", list(pearson_corr.index), key="influence_factor")
+        fig = HappinessVisualizer.create_influence_chart(influence[factor], f"Country Influence on {factor}")
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(influence[[factor]].dropna().sort_values(factor, key=abs, ascending=False),
+                     use_container_width=True)
 
 # PAGE 4: NORDIC COMPARISON
 elif page == "🌍 Nordic Comparison":
@@ -222,6 +276,30 @@ elif page == "🌍 Nordic Comparison":
                 st.warning(f"Could not create visualization: {e}")
     else:
         st.warning("No comparison data available")
+    
+    # Nearest neighbours on the standardized factors
+    st.subheader("Most Similar Countries")
+    countries = sorted(analyzer.whr_data[analyzer.country_col].dropna().tolist())
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected_country = st.selectbox(
+            "Country", countries,
+            index=countries.index("Finland") if "Finland" in countries else 0
+        )
+    with col2:
+        n_neighbours = st.slider("Neighbours", 1, 20, 5)
+    similar_df = analyzer.find_similar_countries(selected_country, k=n_neighbours)
+    st.dataframe(similar_df, use_container_width=True)
+    
+    # Component-wise breakdown of the score gap between two countries
+    if "Finland" in analyzer.country_index:
+        st.subheader("Why Is Finland Ahead?")
+        others = [country for country in countries if country != "Finland"]
+        nearest = analyzer.find_similar_countries("Finland", k=1)["Country"].iloc[0]
+        other_country = st.selectbox("Compare Finland with", others, index=others.index(nearest))
+        gap_df = analyzer.explain_gap("Finland", other_country)
+        st.metric("Ladder Score Gap", f"{gap_df['Gap'].sum():+.3f}")
+        st.dataframe(gap_df, use_container_width=True)
 
 # PAGE 5: INSIGHTS & HYPOTHESES
 elif page == "💡 Insights & Hypotheses":
@@ -1,3 +1,6 @@
 """Analysis module for statistical computations."""
 
-__all__ = ["HappinessAnalyzer"]
+__all__ = ["HappinessAnalyzer", "CorrelationEngine", "RankTable",
+           "DriverModel", "SufficientStatistics",
+           "ResultCache", "CountrySimilarityIndex",
+           "PanelCube", "RankSimulator", "GapTensor"]
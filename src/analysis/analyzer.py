@@ -1,11 +1,21 @@
 """Statistical analysis module for happiness factors."""
 
+import hashlib
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import pandas as pd
 import numpy as np
-from scipy import stats
-from sklearn.preprocessing import StandardScaler
+
+from src.analysis.correlation import CorrelationEngine
+from src.analysis.drivers import DriverModel
+from src.analysis.gaps import GapTensor
+from src.analysis.panel import PanelCube
+from src.analysis.ranking import RankTable
+from src.analysis.result_cache import ResultCache
+from src.analysis.similarity import CountrySimilarityIndex
+from src.analysis.statistics import SufficientStatistics
+from src.analysis.uncertainty import RankSimulator
+from src.data.country_index import CountryIndex
 
 logger = logging.getLogger(__name__)
 
@@ -16,15 +26,52 @@ class HappinessAnalyzer:
     # Nordic countries for comparison
     NORDIC_COUNTRIES = ["Finland", "Denmark", "Sweden", "Norway", "Iceland"]
     
-    def __init__(self, whr_data: pd.DataFrame):
+    # Peer groups with precomputed within-group ranks
+    PEER_GROUPS = {"Nordic": NORDIC_COUNTRIES}
+    
+    # Prefix of the WHR factor-contribution columns used as model drivers
+    DRIVER_PREFIX = "Explained by:"
+    
+    # Region metadata column used as the default grouping
+    REGION_COL = "Regional indicator"
+    
+    # 95% confidence interval columns of the ladder score
+    WHISKER_COLS = ("lowerwhisker", "upperwhisker")
+    
+    # Remainder of the ladder score after the "Explained by:" components
+    RESIDUAL_COL = "Dystopia + residual"
+    
+    def __init__(self, whr_data: pd.DataFrame, year_col: Optional[str] = None):
         """Initialize analyzer with WHR data.
         
+        In panel mode (year_col given) the full long-format data is kept in
+        ``panel_data`` for the per-year methods, and the single-snapshot
+        methods run on the latest year.
+        
         Args:
             whr_data: World Happiness Report DataFrame
+            year_col: Year column of long-format multi-year data (None = one snapshot)
         """
+        self.year_col = year_col
+        self.panel_data: Optional[pd.DataFrame] = None
+        self._panel: Optional[PanelCube] = None
+        if year_col is not None:
+            self.panel_data = whr_data.copy()
+            latest = whr_data[year_col].max()
+            whr_data = whr_data[whr_data[year_col] == latest].drop(columns=year_col).reset_index(drop=True)
         self.whr_data = whr_data.copy()
         self._identify_country_col()
         self._identify_score_col()
+        self.country_index = CountryIndex.from_series(self.whr_data[self.country_col])
+        self._matrix_cache: Dict[str, Dict] = {}
+        self.matrix_stats = {"hits": 0, "columns_computed": 0}
+        self._bootstrap_cache: Dict[Tuple, pd.DataFrame] = {}
+        self._rank_uncertainty_cache: Dict[Tuple, Dict[str, pd.DataFrame]] = {}
+        self.peer_groups: Dict[str, List[str]] = {name: list(members) for name, members in self.PEER_GROUPS.items()}
+        self._rank_table: Optional[RankTable] = None
+        self._statistics: Optional[SufficientStatistics] = None
+        self._similarity_index: Optional[CountrySimilarityIndex] = None
+        self._gap_tensor: Optional[GapTensor] = None
     
     def _identify_country_col(self):
         """Identify country column."""
@@ -46,49 +93,354 @@ class HappinessAnalyzer:
         numeric_cols = self.whr_data.select_dtypes(include=[np.number]).columns
         self.score_col = numeric_cols[0] if len(numeric_cols) > 0 else None
     
-    def calculate_correlations(self, include_cols: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Calculate Pearson and Spearman correlations with happiness score.
+    @property
+    def rank_table(self) -> RankTable:
+        """Rank table over all numeric metrics, built on first use.
+        
+        Returns:
+            RankTable with global ranks and ranks within every peer group
+        """
+        if self._rank_table is None:
+            self._rank_table = RankTable.from_frame(self.whr_data)
+            for name, members in self.peer_groups.items():
+                self._rank_table.add_group(name, self.country_index.positions(members))
+            logger.info(f"Built rank table for {len(self.whr_data)} countries x "
+                        f"{len(self._rank_table.metrics)} metrics")
+        return self._rank_table
+    
+    @property
+    def statistics(self) -> SufficientStatistics:
+        """Sufficient statistics over all numeric columns, built on first use.
+        
+        Returns:
+            SufficientStatistics kept current by :meth:`update_rows`
+        """
+        if self._statistics is None:
+            self._statistics = SufficientStatistics.from_frame(self.whr_data)
+        return self._statistics
+    
+    def _similarity_features(self) -> List[str]:
+        """Factor columns compared by the similarity index."""
+        drivers = [c for c in self.whr_data.columns if c.startswith(self.DRIVER_PREFIX)]
+        if drivers:
+            return drivers
+        _, factor_cols = self._numeric_factors()
+        return factor_cols
+    
+    @property
+    def similarity_index(self) -> CountrySimilarityIndex:
+        """Nearest-neighbour index over standardized factors, built on first use.
+        
+        Returns:
+            CountrySimilarityIndex kept current by :meth:`update_rows`
+        """
+        if self._similarity_index is None:
+            features = self._similarity_features()
+            self._similarity_index = CountrySimilarityIndex.from_frame(
+                self.whr_data, self.country_col, features)
+            logger.info(f"Built similarity index for {len(self.whr_data)} countries x "
+                        f"{len(features)} factors")
+        return self._similarity_index
+    
+    def find_similar_countries(self, country: str, k: int = 5,
+                               radius: Optional[float] = None) -> pd.DataFrame:
+        """Find the countries most similar to a country on the factors.
+        
+        Args:
+            country: Country name
+            k: Number of neighbours (ignored when radius is given)
+            radius: Optional distance cutoff in standardized units
+            
+        Returns:
+            DataFrame with Country, Distance and the happiness score,
+            nearest first
+            
+        Raises:
+            KeyError: If the country is not in the data
+        """
+        index = self.similarity_index
+        neighbours = index.knn(country, k) if radius is None else index.radius(country, radius)
+        if self.score_col is not None:
+            rows = [self.country_index.positions(name)[0] for name in neighbours["Country"]]
+            neighbours[self.score_col] = self.whr_data[self.score_col].to_numpy()[rows]
+        return neighbours
+    
+    @property
+    def panel(self) -> PanelCube:
+        """Year x country x metric cube of the panel data, built on first use.
+        
+        Returns:
+            PanelCube over all numeric columns
+            
+        Raises:
+            ValueError: If the analyzer was not created in panel mode
+        """
+        if self.panel_data is None:
+            raise ValueError("Panel methods need long-format data and a year_col")
+        if self._panel is None:
+            self._panel = PanelCube.from_long(self.panel_data, self.country_col, self.year_col)
+        return self._panel
+    
+    def get_panel_correlations(self, method: str = "pearson",
+                               include_cols: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Correlate every factor with the score in every year at once.
+        
+        Args:
+            method: "pearson" or "spearman"
+            include_cols: Specific factors (None = all numeric except score)
+            
+        Returns:
+            Tuple of (correlation DataFrame, p-value DataFrame), indexed by
+            year with one column per factor; factor-years with fewer than 3
+            pairs are NaN
+        """
+        cube = self.panel
+        factors = [c for c in (include_cols or cube.metrics) if c in cube.metrics and c != self.score_col]
+        r, p, n = cube.correlations(self.score_col, factors, method)
+        return r.where(n >= 3), p.where(n >= 3)
+    
+    def get_panel_ranks(self, metric: Optional[str] = None) -> pd.DataFrame:
+        """Get every country's rank on a metric in every year.
+        
+        Args:
+            metric: Metric to rank (None = happiness score)
+            
+        Returns:
+            Country x year DataFrame of ranks (1 = highest)
+        """
+        return self.panel.rank_frame(metric or self.score_col)
+    
+    def get_rank_changes(self, metric: Optional[str] = None, periods: int = 1) -> pd.DataFrame:
+        """Get year-over-year rank changes.
+        
+        Args:
+            metric: Metric to rank (None = happiness score)
+            periods: Number of panel years to compare across
+            
+        Returns:
+            Country x year DataFrame of places gained since the earlier year
+        """
+        return self.panel.rank_changes(metric or self.score_col, periods)
+    
+    def compare_peer_groups_by_year(self, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+        """Compare peer groups in every panel year in one grouped pass.
+        
+        Args:
+            groups: Mapping of country name to group name
+            
+        Returns:
+            Dictionary of DataFrames:
+                "ranks": rank within group per (year, member country) and
+                    metric (0 = missing value), plus a "Group" column
+                "mean", "std", "count": per (year, group) and metric
+        """
+        cube = self.panel
+        group_names = list(dict.fromkeys(groups.values()))
+        codes = {name: code for code, name in enumerate(group_names)}
+        labels = np.full(len(cube.countries), -1)
+        for country, group in groups.items():
+            labels[cube.country_index.positions(country)] = codes[group]
+        
+        members = np.flatnonzero(labels >= 0)
+        ranks = cube.group_ranks(labels)[:, members].reshape(-1, len(cube.metrics))
+        index = pd.MultiIndex.from_product(
+            [cube.years, [cube.countries[i] for i in members]], names=["Year", self.country_col])
+        ranks = pd.DataFrame(ranks, index=index, columns=cube.metrics)
+        ranks.insert(0, "Group", pd.Categorical.from_codes(np.tile(labels[members], len(cube.years)), group_names))
+        
+        result = {"ranks": ranks}
+        result.update(cube.group_summary(labels, group_names))
+        logger.info(f"Compared {len(members)} countries across {len(group_names)} peer groups "
+                    f"in {len(cube.years)} years")
+        return result
+    
+    @property
+    def gap_tensor(self) -> GapTensor:
+        """All-pairs gaps over the score components, built on first use.
+        
+        Components are the "Explained by:" columns plus "Dystopia + residual",
+        which together sum to the ladder score.
+        
+        Returns:
+            GapTensor over all countries
+        """
+        if self._gap_tensor is None:
+            components = [c for c in self.whr_data.columns if c.startswith(self.DRIVER_PREFIX)]
+            if self.RESIDUAL_COL in self.whr_data.columns:
+                components.append(self.RESIDUAL_COL)
+            self._gap_tensor = GapTensor.from_frame(self.whr_data, self.country_col, components)
+            logger.info(f"Built gap tensor for {len(self.whr_data)} countries x {len(components)} components")
+        return self._gap_tensor
+    
+    def explain_gap(self, country: str, other: str) -> pd.DataFrame:
+        """Explain the score gap between two countries by component.
+        
+        Args:
+            country: Country name (e.g. "Finland")
+            other: Country to compare against
+            
+        Returns:
+            DataFrame with each component's Gap (country minus other) and
+            Share of the total gap, largest first
+            
+        Raises:
+            KeyError: If either country is not in the data
+        """
+        return self.gap_tensor.explain(country, other)
+    
+    def get_gap_matrix(self, component: Optional[str] = None) -> pd.DataFrame:
+        """Get gaps between every pair of countries.
+        
+        Args:
+            component: Component name (None = total over all components)
+            
+        Returns:
+            Country x country DataFrame; entry (a, b) is a's gap over b
+        """
+        return self.gap_tensor.matrix(component)
+    
+    def update_rows(self, rows: pd.DataFrame) -> None:
+        """Insert new countries or revise existing ones.
+        
+        The streaming statistics are updated in O(k²) per row instead of
+        being rebuilt; the country index and rank table are refreshed and
+        the similarity index takes the changed rows incrementally.
+        
+        Args:
+            rows: Rows with the country column and any subset of the other
+                columns; revisions keep current values for columns not given
+        """
+        statistics = self.statistics
+        found = [self.country_index.positions(name) for name in rows[self.country_col]]
+        existing = np.array([len(pos) > 0 for pos in found], dtype=bool)
+        columns = [col for col in rows.columns if col in self.whr_data.columns and col != self.country_col]
+        
+        # Complete every row before touching any state: revisions keep their
+        # current values for columns not given, new countries get NaN
+        positions = np.array([pos[0] for pos in found if len(pos)], dtype=np.intp)
+        current = self.whr_data.iloc[positions]
+        revised = current.copy()
+        for col in columns:
+            revised[col] = rows.loc[existing, col].to_numpy()
+        added = rows.loc[~existing].reindex(columns=self.whr_data.columns)
+        
+        if existing.any():
+            statistics.update(current, revised)
+        if not existing.all():
+            statistics.add(added)
+        
+        if existing.any():
+            self.whr_data.iloc[positions] = revised
+        if not existing.all():
+            self.whr_data = pd.concat([self.whr_data, added], ignore_index=True)
+        
+        self.country_index = CountryIndex.from_series(self.whr_data[self.country_col])
+        self._rank_table = None
+        self._gap_tensor = None
+        if self._similarity_index is not None:
+            features = self._similarity_index.features
+            changed = pd.concat([revised, added])
+            self._similarity_index.update(changed[self.country_col].tolist(),
+                                          changed[features].to_numpy(dtype=float, na_value=np.nan))
+        logger.info(f"Updated {int(existing.sum())} and added {int((~existing).sum())} countries")
+    
+    def get_streaming_correlations(self) -> pd.DataFrame:
+        """Get Pearson correlations with the score from the streaming statistics.
+        
+        Returns:
+            DataFrame with Correlation and P-value per factor, ordered like
+            calculate_correlations
+        """
+        r, p, n = self.statistics.correlation_with(self.score_col)
+        keep = n >= 3
+        return pd.DataFrame({
+            "Correlation": r[keep],
+            "P-value": p[keep]
+        }).sort_values("Correlation", key=abs, ascending=False)
+    
+    def add_peer_group(self, name: str, countries: List[str]) -> None:
+        """Register a peer group and precompute ranks within it.
+        
+        Args:
+            name: Group name
+            countries: Member country names
+        """
+        self.peer_groups[name] = list(countries)
+        if self._rank_table is not None:
+            self._rank_table.add_group(name, self.country_index.positions(countries))
+    
+    def _group_labels(self, groups: Dict[str, str]) -> Tuple[np.ndarray, List[str]]:
+        """Convert a country-to-group mapping into a group code per row.
+        
+        Args:
+            groups: Mapping of country name to group name
+            
+        Returns:
+            Tuple of (group code per row, -1 for unmapped rows; group names by code)
+        """
+        group_names = list(dict.fromkeys(groups.values()))
+        codes = {name: code for code, name in enumerate(group_names)}
+        
+        labels = np.full(len(self.whr_data), -1)
+        for country, group in groups.items():
+            labels[self.country_index.positions(country)] = codes[group]
+        return labels, group_names
+    
+    @staticmethod
+    def _column_fingerprint(values: pd.Series) -> str:
+        """Hash a column's values (including missing positions)."""
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+    
+    def _numeric_factors(self, include_cols: Optional[List[str]] = None) -> Tuple[Optional[pd.DataFrame], List[str]]:
+        """Get numeric data and the factor columns to correlate with the score.
         
         Args:
             include_cols: Specific columns to correlate (None = all numeric except score)
             
         Returns:
-            Tuple of (Pearson correlations, Spearman correlations) DataFrames
+            Tuple of (numeric DataFrame or None if the score is missing, factor columns)
         """
-        numeric_df = self.whr_data.select_dtypes(include=[np.number]).copy()
+        numeric_df = self.whr_data.select_dtypes(include=[np.number])
         
         if self.score_col not in numeric_df.columns:
             logger.error(f"Score column {self.score_col} not found")
-            return None, None
+            return None, []
         
         # Get columns to correlate with
         if include_cols:
             factor_cols = [c for c in include_cols if c in numeric_df.columns]
         else:
             factor_cols = [c for c in numeric_df.columns if c != self.score_col]
+        return numeric_df, factor_cols
+    
+    def calculate_correlations(self, include_cols: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Calculate Pearson and Spearman correlations with happiness score.
         
-        # Calculate correlations
-        pearson_corrs = {}
-        pearson_pvals = {}
-        spearman_corrs = {}
-        spearman_pvals = {}
-        
-        for col in factor_cols:
-            # Remove NaN values for comparison
-            valid_data = numeric_df[[self.score_col, col]].dropna()
-            
-            if len(valid_data) < 3:
-                continue
-            
-            # Pearson
-            pearson_r, pearson_p = stats.pearsonr(valid_data[self.score_col], valid_data[col])
-            pearson_corrs[col] = pearson_r
-            pearson_pvals[col] = pearson_p
+        Args:
+            include_cols: Specific columns to correlate (None = all numeric except score)
             
-            # Spearman
-            spearman_r, spearman_p = stats.spearmanr(valid_data[self.score_col], valid_data[col])
-            spearman_corrs[col] = spearman_r
-            spearman_pvals[col] = spearman_p
+        Returns:
+            Tuple of (Pearson correlations, Spearman correlations) DataFrames
+        """
+        numeric_df, factor_cols = self._numeric_factors(include_cols)
+        
+        if numeric_df is None:
+            return None, None
+        
+        # Correlate all factors at once on pairwise-complete rows
+        score = numeric_df[self.score_col].to_numpy(dtype=float)
+        factors = numeric_df[factor_cols].to_numpy(dtype=float)
+        pearson_r, pearson_p, n = CorrelationEngine.pearson(score, factors)
+        spearman_r, spearman_p, _ = CorrelationEngine.spearman(score, factors)
+        
+        # Skip factors with fewer than 3 paired observations
+        keep = n >= 3
+        kept_cols = [col for col, k in zip(factor_cols, keep) if k]
+        pearson_corrs = dict(zip(kept_cols, pearson_r[keep]))
+        pearson_pvals = dict(zip(kept_cols, pearson_p[keep]))
+        spearman_corrs = dict(zip(kept_cols, spearman_r[keep]))
+        spearman_pvals = dict(zip(kept_cols, spearman_p[keep]))
         
         # Create result DataFrames
         pearson_df = pd.DataFrame({
@@ -104,19 +456,404 @@ class HappinessAnalyzer:
         logger.info(f"Calculated correlations for {len(factor_cols)} factors")
         return pearson_df, spearman_df
     
+    def calculate_grouped_correlations(self, groups: Optional[Union[str, Dict[str, str]]] = None,
+                                       method: str = "pearson",
+                                       include_cols: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Correlate every factor with the score separately within each group.
+        
+        All groups are computed in one grouped pass over per-group sums and
+        cross products rather than by filtering and correlating per group.
+        
+        Args:
+            groups: Grouping column name, or mapping of country name to group
+                name (None = the region column)
+            method: "pearson" or "spearman"
+            include_cols: Specific factors (None = all numeric except score)
+            
+        Returns:
+            Tuple of (correlation DataFrame, p-value DataFrame) with one row per
+            group and one column per factor; cells with fewer than 3 pairs are NaN
+            
+        Raises:
+            ValueError: If the grouping column is missing or method is unknown
+        """
+        if groups is None:
+            groups = self.REGION_COL
+        if isinstance(groups, str):
+            if groups not in self.whr_data.columns:
+                raise ValueError(f"Grouping column {groups} not found in WHR data")
+            codes, names = pd.factorize(self.whr_data[groups], sort=True)
+            labels, group_names = codes, [str(name) for name in names]
+        else:
+            labels, group_names = self._group_labels(groups)
+        
+        numeric_df, factor_cols = self._numeric_factors(include_cols)
+        if numeric_df is None:
+            return None, None
+        
+        r, p, n = CorrelationEngine.grouped(numeric_df[self.score_col].to_numpy(dtype=float),
+                                            numeric_df[factor_cols].to_numpy(dtype=float),
+                                            labels, len(group_names), method)
+        index = pd.Index(group_names, name="Group")
+        corr_df = pd.DataFrame(np.where(n >= 3, r, np.nan), index=index, columns=factor_cols)
+        pval_df = pd.DataFrame(np.where(n >= 3, p, np.nan), index=index, columns=factor_cols)
+        
+        logger.info(f"Calculated {method} correlations for {len(group_names)} groups x {len(factor_cols)} factors")
+        return corr_df, pval_df
+    
+    def calculate_partial_correlations(self, covariates: List[str], method: str = "pearson",
+                                       include_cols: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Correlate every factor with the score, controlling for covariates.
+        
+        All factors are computed at once from batched precision matrices, so
+        changing the covariate selection only costs one small batched inverse.
+        
+        Args:
+            covariates: Columns to control for (e.g. "Explained by: Log GDP per capita")
+            method: "pearson" or "spearman"
+            include_cols: Specific factors (None = all numeric except score and covariates)
+            
+        Returns:
+            DataFrame with Correlation (partial), P-value, Zero-order
+            correlation and N per factor, ordered by absolute partial
+            correlation; None if the score column is missing
+            
+        Raises:
+            ValueError: If a covariate is not a numeric column
+        """
+        numeric_df, factor_cols = self._numeric_factors(include_cols)
+        if numeric_df is None:
+            return None
+        
+        missing = [col for col in covariates if col not in numeric_df.columns]
+        if missing:
+            raise ValueError(f"Covariates not found among numeric columns: {missing}")
+        factor_cols = [col for col in factor_cols if col not in covariates]
+        
+        score = numeric_df[self.score_col].to_numpy(dtype=float)
+        factors = numeric_df[factor_cols].to_numpy(dtype=float)
+        r, p, n = CorrelationEngine.partial(score, factors, numeric_df[covariates].to_numpy(dtype=float), method)
+        zero_order = (CorrelationEngine.pearson if method == "pearson" else CorrelationEngine.spearman)(score, factors)[0]
+        
+        # Need at least one residual degree of freedom beyond the covariates
+        keep = n >= len(covariates) + 3
+        result = pd.DataFrame({
+            "Correlation": r[keep],
+            "P-value": p[keep],
+            "Zero-order": zero_order[keep],
+            "N": n[keep]
+        }, index=[col for col, k in zip(factor_cols, keep) if k])
+        
+        logger.info(f"Calculated partial correlations for {len(result)} factors "
+                    f"controlling for {len(covariates)} covariates")
+        return result.sort_values("Correlation", key=abs, ascending=False)
+    
+    def calculate_influence(self, include_cols: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Measure how much each country moves each factor's Pearson correlation.
+        
+        Leave-one-country-out correlations for every country and factor are
+        derived in closed form from the running sums (no refits).
+        
+        Args:
+            include_cols: Specific factors (None = all numeric except score)
+            
+        Returns:
+            Dictionary of country x factor DataFrames:
+                "influence": full-sample correlation minus the correlation
+                    without the country (positive = the country pushes the
+                    correlation up; NaN where it has no value)
+                "loo": correlations without each country
+        """
+        numeric_df, factor_cols = self._numeric_factors(include_cols)
+        if numeric_df is None:
+            return {}
+        
+        loo, r = CorrelationEngine.jackknife(numeric_df[self.score_col].to_numpy(dtype=float),
+                                             numeric_df[factor_cols].to_numpy(dtype=float))
+        index = pd.Index(self.whr_data[self.country_col].to_numpy(), name=self.country_col)
+        loo_df = pd.DataFrame(loo, index=index, columns=factor_cols)
+        
+        logger.info(f"Calculated jackknife influence for {len(index)} countries x {len(factor_cols)} factors")
+        return {
+            "influence": pd.DataFrame(r[None, :] - loo, index=index, columns=factor_cols),
+            "loo": loo_df
+        }
+    
+    def calculate_bootstrap_intervals(self, n_resamples: int = 10_000, method: str = "pearson",
+                                      confidence: float = 0.95, seed: int = 0,
+                                      include_cols: Optional[List[str]] = None,
+                                      max_workers: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Calculate bootstrap confidence intervals for score-factor correlations.
+        
+        Results (point estimates, p-values and intervals) are cached by the
+        data fingerprint and bootstrap settings, so repeated calls are free.
+        
+        Args:
+            n_resamples: Number of bootstrap resamples
+            method: "pearson" or "spearman"
+            confidence: Confidence level of the percentile intervals
+            seed: Seed for deterministic resampling
+            include_cols: Specific columns to correlate (None = all numeric except score)
+            max_workers: Worker processes (None = CPU count, 1 = run inline)
+            
+        Returns:
+            DataFrame with Correlation, P-value, CI lower, CI upper and Std error
+            per factor, ordered like calculate_correlations
+        """
+        numeric_df, factor_cols = self._numeric_factors(include_cols)
+        
+        if numeric_df is None:
+            return None
+        
+        columns = [self.score_col] + factor_cols
+        key = (method, n_resamples, confidence, seed,
+               tuple((col, self._column_fingerprint(numeric_df[col])) for col in columns))
+        if key in self._bootstrap_cache:
+            return self._bootstrap_cache[key].copy()
+        
+        score = numeric_df[self.score_col].to_numpy(dtype=float)
+        factors = numeric_df[factor_cols].to_numpy(dtype=float)
+        point = CorrelationEngine.spearman if method == "spearman" else CorrelationEngine.pearson
+        r, p, n = point(score, factors)
+        intervals = CorrelationEngine.bootstrap(score, factors, n_resamples, method, confidence,
+                                                seed, max_workers)
+        
+        keep = n >= 3
+        result = pd.DataFrame({
+            "Correlation": r[keep],
+            "P-value": p[keep],
+            "CI lower": intervals["lower"][keep],
+            "CI upper": intervals["upper"][keep],
+            "Std error": intervals["std_error"][keep]
+        }, index=[col for col, k in zip(factor_cols, keep) if k]).sort_values("Correlation", key=abs, ascending=False)
+        
+        self._bootstrap_cache[key] = result
+        logger.info(f"Bootstrapped {method} intervals for {len(result)} factors ({n_resamples} resamples)")
+        return result.copy()
+    
+    def calculate_permutation_pvalues(self, method: str = "pearson", n_permutations: int = 10_000,
+                                      p_threshold: float = 0.05, seed: int = 0,
+                                      include_cols: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Calculate permutation-test p-values for score-factor correlations.
+        
+        Factors whose significance at ``p_threshold`` is already settled stop
+        early, so clear-cut factors need only a few hundred permutations.
+        
+        Args:
+            method: "pearson" or "spearman"
+            n_permutations: Maximum permutations per factor
+            p_threshold: Significance threshold used for early stopping
+            seed: Seed for deterministic permutations
+            include_cols: Specific columns to test (None = all numeric except score)
+            
+        Returns:
+            DataFrame with Correlation, P-value and Permutations per factor
+        """
+        numeric_df, factor_cols = self._numeric_factors(include_cols)
+        
+        if numeric_df is None:
+            return None
+        
+        score = numeric_df[self.score_col].to_numpy(dtype=float)
+        factors = numeric_df[factor_cols].to_numpy(dtype=float)
+        point = CorrelationEngine.spearman if method == "spearman" else CorrelationEngine.pearson
+        r, _, n = point(score, factors)
+        test = CorrelationEngine.permutation_test(score, factors, method, n_permutations,
+                                                  alpha=p_threshold, seed=seed)
+        
+        keep = n >= 3
+        result = pd.DataFrame({
+            "Correlation": r[keep],
+            "P-value": test["p_values"][keep],
+            "Permutations": test["permutations"][keep]
+        }, index=[col for col, k in zip(factor_cols, keep) if k]).sort_values("Correlation", key=abs, ascending=False)
+        
+        logger.info(f"Permutation-tested {len(result)} factors ({int(result['Permutations'].sum())} permutations)")
+        return result
+    
+    def fit_driver_model(self, mode: str = "full", alpha: float = 0.0,
+                         groups: Optional[Dict[str, str]] = None,
+                         n_resamples: int = 1_000, seed: int = 0,
+                         include_cols: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Fit a standardized multivariate model of the score on its drivers.
+        
+        Args:
+            mode: "full" (one fit), "bootstrap" (replicates), "groups" (one fit
+                per group) or "leave_one_group_out"
+            alpha: Ridge penalty (0 = OLS)
+            groups: Mapping of country name to group (group modes)
+            n_resamples: Number of replicates (bootstrap mode)
+            seed: Seed for deterministic resampling (bootstrap mode)
+            include_cols: Driver columns (None = all "Explained by:" columns)
+            
+        Returns:
+            Dictionary from DriverModel.fit plus a "summary" DataFrame with the
+            mean, standard deviation and 2.5%/97.5% percentiles of each
+            coefficient across subsets
+        """
+        if include_cols:
+            drivers = [c for c in include_cols if c in self.whr_data.columns]
+        else:
+            drivers = [c for c in self.whr_data.columns if c.startswith(self.DRIVER_PREFIX)]
+            if not drivers:
+                _, drivers = self._numeric_factors()
+        
+        n_rows = len(self.whr_data)
+        names = None
+        if mode == "full":
+            weights = None
+        elif mode == "bootstrap":
+            weights = DriverModel.bootstrap_weights(n_rows, n_resamples, seed)
+            names = [f"Replicate {i}" for i in range(n_resamples)]
+        elif mode in ("groups", "leave_one_group_out"):
+            if not groups:
+                raise ValueError(f"Mode {mode} requires a country-to-group mapping")
+            labels, group_names = self._group_labels(groups)
+            weights, names = DriverModel.group_weights(labels, group_names, leave_out=mode != "groups")
+        else:
+            raise ValueError(f"Unknown driver model mode: {mode}")
+        
+        result = DriverModel(alpha).fit(self.whr_data[drivers], self.whr_data[self.score_col], weights, names)
+        coefficients = result["coefficients"]
+        result["summary"] = pd.DataFrame({
+            "Coefficient": coefficients.mean(),
+            "Std": coefficients.std() if len(coefficients) > 1 else np.nan,
+            "Lower": coefficients.quantile(0.025),
+            "Upper": coefficients.quantile(0.975)
+        }).sort_values("Coefficient", key=abs, ascending=False)
+        return result
+    
+    def get_correlation_matrix(self, method: str = "pearson",
+                               include_cols: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Calculate the full factor-by-factor correlation matrix with p-values.
+        
+        Results are cached per method alongside a fingerprint of every column.
+        Later calls only compute the rows and columns of factors that were
+        added or whose values changed (one cross block against the cached
+        factors); removed factors are dropped from the cache.
+        
+        Args:
+            method: "pearson" or "spearman"
+            include_cols: Specific columns to include (None = all numeric)
+            
+        Returns:
+            Tuple of (correlation matrix, p-value matrix) DataFrames
+        """
+        numeric_df = self.whr_data.select_dtypes(include=[np.number])
+        if include_cols:
+            columns = [c for c in include_cols if c in numeric_df.columns]
+        else:
+            columns = list(numeric_df.columns)
+        
+        hashes = {col: self._column_fingerprint(numeric_df[col]) for col in numeric_df.columns}
+        cached = self._matrix_cache.get(method)
+        
+        # Keep cached factors whose data is unchanged, then append new ones
+        if cached is not None:
+            keep = [i for i, (col, h) in enumerate(zip(cached["columns"], cached["hashes"]))
+                    if hashes.get(col) == h]
+            cache_cols = [cached["columns"][i] for i in keep]
+        else:
+            keep, cache_cols = [], []
+        cached_set = set(cache_cols)
+        new_cols = [col for col in columns if col not in cached_set]
+        all_cols = cache_cols + new_cols
+        
+        k, m = len(all_cols), len(keep)
+        r = np.empty((k, k))
+        p = np.empty((k, k))
+        n = np.empty((k, k), dtype=np.int64)
+        if m:
+            block = np.ix_(keep, keep)
+            r[:m, :m] = cached["r"][block]
+            p[:m, :m] = cached["p"][block]
+            n[:m, :m] = cached["n"][block]
+        
+        if new_cols:
+            values = numeric_df[all_cols].to_numpy(dtype=float)
+            block_r, block_p, block_n = CorrelationEngine.cross(values[:, m:], values, method)
+            r[m:, :], r[:, m:] = block_r, block_r.T
+            p[m:, :], p[:, m:] = block_p, block_p.T
+            n[m:, :], n[:, m:] = block_n, block_n.T
+            self.matrix_stats["columns_computed"] += len(new_cols)
+            logger.info(f"Computed {method} correlations for {len(new_cols)} of {k} factors")
+        else:
+            self.matrix_stats["hits"] += 1
+        
+        self._matrix_cache[method] = {
+            "columns": all_cols,
+            "hashes": [hashes[col] for col in all_cols],
+            "r": r,
+            "p": p,
+            "n": n
+        }
+        
+        order = [all_cols.index(col) for col in columns]
+        corr_df = pd.DataFrame(r[np.ix_(order, order)], index=columns, columns=columns)
+        pval_df = pd.DataFrame(p[np.ix_(order, order)], index=columns, columns=columns)
+        return corr_df, pval_df
+    
+    def add_factor(self, name: str, values) -> None:
+        """Add or replace a factor column.
+        
+        Cached correlation matrices are updated lazily: only this factor's
+        row and column are computed on the next matrix request.
+        
+        Args:
+            name: Factor column name
+            values: Values aligned with the WHR rows
+        """
+        self.whr_data[name] = values
+        self._rank_table = None
+        self._statistics = None
+        self._similarity_index = None
+        self._gap_tensor = None
+    
+    def remove_factor(self, name: str) -> None:
+        """Remove a factor column.
+        
+        Args:
+            name: Factor column name
+        """
+        if name == self.score_col:
+            raise ValueError("Cannot remove the happiness score column")
+        self.whr_data = self.whr_data.drop(columns=name)
+        self._rank_table = None
+        self._statistics = None
+        self._similarity_index = None
+        self._gap_tensor = None
+    
     def get_significant_factors(self, pearson_df: pd.DataFrame, 
                                spearman_df: pd.DataFrame, 
-                               p_threshold: float = 0.05) -> Dict[str, Dict]:
+                               p_threshold: float = 0.05,
+                               method: str = "parametric",
+                               n_permutations: int = 10_000,
+                               seed: int = 0) -> Dict[str, Dict]:
         """Get factors with significant correlation to happiness.
         
         Args:
             pearson_df: Pearson correlation results
             spearman_df: Spearman correlation results
             p_threshold: P-value threshold for significance
+            method: "parametric" to use the given p-values, or "permutation"
+                to replace them with permutation-test p-values
+            n_permutations: Maximum permutations per factor (permutation method)
+            seed: Seed for deterministic permutations (permutation method)
             
         Returns:
             Dictionary of significant factors with their stats
         """
+        if method == "permutation":
+            factors = list(pearson_df.index)
+            pearson_df = pearson_df.copy()
+            spearman_df = spearman_df.copy()
+            pearson_df["P-value"] = self.calculate_permutation_pvalues(
+                "pearson", n_permutations, p_threshold, seed, factors)["P-value"]
+            spearman_df["P-value"] = self.calculate_permutation_pvalues(
+                "spearman", n_permutations, p_threshold, seed, factors)["P-value"]
+        elif method != "parametric":
+            raise ValueError(f"Unknown significance method: {method}")
+        
         significant = {}
         
         for idx in pearson_df.index:
@@ -131,6 +868,44 @@ class HappinessAnalyzer:
         logger.info(f"Found {len(significant)} significant factors (p < {p_threshold})")
         return significant
     
+    def compare_peer_groups(self, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+        """Compare countries within arbitrary peer groups in one grouped pass.
+        
+        Ranks for every group and metric come from a single sort keyed by
+        group label; means, standard deviations and counts from a single
+        groupby over the metric matrix.
+        
+        Args:
+            groups: Mapping of country name to group name (e.g. region, OECD)
+            
+        Returns:
+            Dictionary of DataFrames:
+                "ranks": rank within group per member country and metric
+                    (0 = missing value), plus a "Group" column
+                "values": metric values per member country
+                "mean", "std", "count": per group (rows) and metric (columns)
+        """
+        table = self.rank_table
+        labels, group_names = self._group_labels(groups)
+        
+        members = np.flatnonzero(labels >= 0)
+        member_labels = pd.Categorical.from_codes(labels[members], group_names)
+        names = pd.Index(self.whr_data[self.country_col].to_numpy()[members], name=self.country_col)
+        
+        ranks = pd.DataFrame(RankTable.compute_ranks(table.values, labels)[members],
+                             index=names, columns=table.metrics)
+        ranks.insert(0, "Group", member_labels)
+        values = pd.DataFrame(table.values[members], index=names, columns=table.metrics)
+        
+        summary = values.groupby(np.asarray(member_labels), sort=False).agg(["mean", "std", "count"])
+        result = {"ranks": ranks, "values": values}
+        for stat in ["mean", "std", "count"]:
+            result[stat] = summary.xs(stat, axis=1, level=1).reindex(
+                [name for name in group_names if name in set(member_labels)])
+        
+        logger.info(f"Compared {len(members)} countries across {len(result['mean'])} peer groups")
+        return result
+    
     def compare_nordic_countries(self) -> Dict[str, Dict]:
         """Compare Finland with other Nordic countries.
         
@@ -139,38 +914,38 @@ class HappinessAnalyzer:
         Returns:
             Comparison dictionary with rankings and statistics
         """
-        # Filter to Nordic countries using string search
-        nordic_data = self.whr_data[
-            self.whr_data[self.country_col].astype(str).isin(self.NORDIC_COUNTRIES)
-        ].copy()
+        result = self.compare_peer_groups({country: "Nordic" for country in self.NORDIC_COUNTRIES})
+        ranks, values = result["ranks"], result["values"]
         
-        if len(nordic_data) == 0:
+        if len(ranks) == 0:
             logger.warning("No Nordic countries found in data")
             return {}
         
+        member_keys = CountryIndex.normalize_series(ranks.index.to_series())
+        finland_rows = np.flatnonzero(member_keys == CountryIndex.normalize("Finland"))
+        
         comparison = {}
         
-        # Get numeric columns (factors)
-        numeric_cols = nordic_data.select_dtypes(include=[np.number]).columns
+        for col in result["mean"].columns:
+            col_ranks = ranks[col].to_numpy()
+            if len(finland_rows) == 0 or col_ranks[finland_rows[0]] == 0:
+                continue
+            
+            ranked = np.flatnonzero(col_ranks > 0)
+            ranked = ranked[np.argsort(col_ranks[ranked])]
+            col_values = values[col].to_numpy()
+            comparison[col] = {
+                "ranking": [
+                    {self.country_col: ranks.index[i], col: float(col_values[i]), "Rank": int(col_ranks[i])}
+                    for i in ranked
+                ],
+                "finland_rank": int(col_ranks[finland_rows[0]]),
+                "finland_value": float(col_values[finland_rows[0]]),
+                "nordic_average": float(result["mean"].loc["Nordic", col]),
+                "nordic_std": float(result["std"].loc["Nordic", col])
+            }
         
-        for col in numeric_cols:
-            col_data = nordic_data[[self.country_col, col]].dropna()
-            if len(col_data) > 0:
-                ranked = col_data.sort_values(col, ascending=False).reset_index(drop=True)
-                ranked["Rank"] = range(1, len(ranked) + 1)
-                
-                # Find Finland's rank
-                finland_row = ranked[ranked[self.country_col].astype(str).str.contains("Finland", case=False)]
-                if len(finland_row) > 0:
-                    comparison[col] = {
-                        "ranking": ranked[[self.country_col, col, "Rank"]].to_dict("records"),
-                        "finland_rank": int(finland_row["Rank"].values[0]),
-                        "finland_value": float(finland_row[col].values[0]),
-                        "nordic_average": float(col_data[col].mean()),
-                        "nordic_std": float(col_data[col].std())
-                    }
-        
-        logger.info(f"Compared Finland with {len(nordic_data)} Nordic countries")
+        logger.info(f"Compared Finland with {len(ranks)} Nordic countries")
         return comparison
     
     def generate_hypotheses(self, significant_factors: Dict[str, Dict], 
@@ -262,41 +1037,148 @@ class HappinessAnalyzer:
         logger.info(f"Generated {len(hypotheses)} data-driven hypotheses")
         return hypotheses
     
-    def get_finland_profile(self) -> Dict[str, any]:
-        """Get comprehensive profile of Finland's happiness data.
+    def get_profiles(self, countries: List[str]) -> Dict[str, Dict[str, any]]:
+        """Get profiles for many countries in one vectorized lookup.
         
+        Args:
+            countries: Country names (case and whitespace insensitive)
+            
         Returns:
-            Finland's profile dictionary
+            Dictionary of requested name to profile; unknown countries are omitted
         """
-        # Convert country column to string and search for Finland
-        finland_data = self.whr_data[
-            self.whr_data[self.country_col].astype(str).str.contains("Finland", case=False, na=False)
-        ]
-        
-        if len(finland_data) == 0:
-            logger.warning("Finland not found in dataset")
+        found = [(country, positions[0]) for country in countries
+                 for positions in [self.country_index.positions(country)] if len(positions)]
+        for country in countries:
+            if country not in self.country_index:
+                logger.warning(f"{country} not found in dataset")
+        if not found:
             return {}
         
-        finland_row = finland_data.iloc[0]
-        profile = {
-            "country": finland_row[self.country_col],
-            "all_data": finland_row.to_dict()
-        }
+        rows = np.array([row for _, row in found], dtype=np.intp)
+        table = self.rank_table
+        records = self.whr_data.iloc[rows].to_dict("records")
+        ranks = table.ranks[rows]
+        group_ranks = {name: table.group_ranks(name)[0][rows] for name in table.groups()}
+        
+        score_pos = table.metric_position(self.score_col) if self.score_col in table.metrics else None
         
-        # Rank Finland globally
-        if self.score_col:
-            global_ranking = self.whr_data[[self.country_col, self.score_col]].dropna().sort_values(
-                self.score_col, ascending=False
-            ).reset_index(drop=True)
-            global_ranking["Rank"] = range(1, len(global_ranking) + 1)
+        profiles = {}
+        for i, (country, row) in enumerate(found):
+            profile = {
+                "country": records[i][self.country_col],
+                "all_data": records[i],
+                "ranks": {metric: int(rank) for metric, rank in zip(table.metrics, ranks[i]) if rank},
+                "peer_ranks": {
+                    name: {metric: int(rank) for metric, rank in zip(table.metrics, group[i]) if rank}
+                    for name, group in group_ranks.items() if group[i].any()
+                }
+            }
             
-            finland_rank = global_ranking[
-                global_ranking[self.country_col].astype(str).str.contains("Finland", case=False)
-            ]
+            # Global rank: countries scoring higher, plus ties listed earlier
+            if score_pos is not None and ranks[i, score_pos]:
+                profile["global_rank"] = int(ranks[i, score_pos])
+                profile["total_countries"] = int(table.counts[score_pos])
+                profile["score"] = float(table.values[row, score_pos])
+            profiles[country] = profile
+        
+        return profiles
+    
+    def get_country_profile(self, country: str) -> Dict[str, any]:
+        """Get comprehensive profile of a country's happiness data.
+        
+        Args:
+            country: Country name (case and whitespace insensitive)
+            
+        Returns:
+            Country profile dictionary (empty if country not found)
+        """
+        return self.get_profiles([country]).get(country, {})
+    
+    def run_full_analysis(self, cache: Optional[ResultCache] = None,
+                          p_threshold: float = 0.05) -> Dict[str, any]:
+        """Run the standard analysis pipeline, optionally through a result cache.
+        
+        Args:
+            cache: Persistent result cache; results are keyed by the content
+                of the WHR data and the parameters
+            p_threshold: P-value threshold for significance
+            
+        Returns:
+            Dictionary with pearson, spearman, significant, comparisons,
+            hypotheses and finland_profile
+        """
+        def compute() -> Dict[str, any]:
+            pearson, spearman = self.calculate_correlations()
+            significant = self.get_significant_factors(pearson, spearman, p_threshold)
+            comparisons = self.compare_nordic_countries()
+            return {
+                "pearson": pearson,
+                "spearman": spearman,
+                "significant": significant,
+                "comparisons": comparisons,
+                "hypotheses": self.generate_hypotheses(significant, comparisons),
+                "finland_profile": self.get_finland_profile()
+            }
+        
+        if cache is None:
+            return compute()
+        key = ResultCache.key(self.whr_data, task="full_analysis", p_threshold=p_threshold)
+        return cache.get_or_compute(key, compute)
+    
+    def simulate_rank_uncertainty(self, n_draws: int = 10_000, confidence: float = 0.95,
+                                  seed: int = 0, chunk_size: int = 1_000,
+                                  max_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """Simulate ranks from the ladder-score confidence intervals.
+        
+        Scores are drawn as normal with standard deviation
+        (upperwhisker - lowerwhisker) / (2 * 1.96); results are cached per
+        input data and parameters.
+        
+        Args:
+            n_draws: Number of simulated rankings
+            confidence: Coverage of the rank intervals
+            seed: Root seed for the draws
+            chunk_size: Draws generated per task
+            max_workers: Worker processes (None = CPU count, 1 = run inline)
             
-            if len(finland_rank) > 0:
-                profile["global_rank"] = int(finland_rank["Rank"].values[0])
-                profile["total_countries"] = len(global_ranking)
-                profile["score"] = float(finland_rank[self.score_col].values[0])
+        Returns:
+            Dictionary of DataFrames:
+                "summary": point rank, mean and median rank, P(#1), P(top 10)
+                    and rank interval per country, ordered by point rank
+                "distribution": probability of each rank (columns) per country
+                
+        Raises:
+            ValueError: If the score or whisker columns are missing
+        """
+        columns = [self.score_col, *self.WHISKER_COLS]
+        missing = [col for col in columns if col not in self.whr_data.columns]
+        if missing:
+            raise ValueError(f"Rank simulation needs columns {missing}")
+        
+        key = (n_draws, confidence, seed, chunk_size,
+               tuple(self._column_fingerprint(self.whr_data[col]) for col in [self.country_col] + columns))
+        if key in self._rank_uncertainty_cache:
+            return {name: df.copy() for name, df in self._rank_uncertainty_cache[key].items()}
         
-        return profile
+        lower, upper = self.WHISKER_COLS
+        simulator = RankSimulator(self.whr_data[self.score_col].to_numpy(dtype=float),
+                                  self.whr_data[lower].to_numpy(dtype=float),
+                                  self.whr_data[upper].to_numpy(dtype=float),
+                                  self.whr_data[self.country_col].tolist())
+        counts = simulator.simulate(n_draws, seed, chunk_size, max_workers)
+        summary = simulator.summarize(counts, confidence)
+        distribution = pd.DataFrame(counts / n_draws, index=pd.Index(simulator.names, name="Country"),
+                                    columns=pd.RangeIndex(1, counts.shape[1] + 1, name="Rank"))
+        
+        result = {"summary": summary, "distribution": distribution.loc[summary.index]}
+        self._rank_uncertainty_cache[key] = result
+        logger.info(f"Simulated {n_draws} rankings of {len(summary)} countries")
+        return {name: df.copy() for name, df in result.items()}
+    
+    def get_finland_profile(self) -> Dict[str, any]:
+        """Get comprehensive profile of Finland's happiness data.
+        
+        Returns:
+            Finland's profile dictionary
+        """
+        return self.get_country_profile("Finland")
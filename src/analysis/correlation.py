@@ -0,0 +1,537 @@
+"""Vectorized correlation engine for many factors at once."""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy import stats
+
+logger = logging.getLogger(__name__)
+
+
+class CorrelationEngine:
+    """Batched Pearson and Spearman correlations with pairwise-complete data.
+
+    All factors are correlated with a target in a handful of NumPy matrix
+    operations instead of one ``scipy.stats`` call per column. Missing values
+    are handled pairwise (each factor uses the rows where both it and the
+    target are present), matching ``dropna`` followed by ``pearsonr`` /
+    ``spearmanr``, and p-values come from one vectorized t-distribution call.
+    """
+
+    @staticmethod
+    def pearson(x: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Correlate a target with every column of a factor matrix.
+
+        Args:
+            x: Target values, shape (n,)
+            Y: Factor values, shape (n, k), NaN for missing
+
+        Returns:
+            Tuple of (correlations, p-values, pairwise sample sizes), each shape (k,)
+        """
+        x = np.asarray(x, dtype=float)
+        Y = np.asarray(Y, dtype=float).reshape(len(x), -1)
+        mask = ~np.isnan(Y) & ~np.isnan(x)[:, None]
+        n = mask.sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = np.where(mask, x[:, None], 0.0).sum(axis=0) / n
+            y_mean = np.where(mask, Y, 0.0).sum(axis=0) / n
+            dx = np.where(mask, x[:, None] - x_mean, 0.0)
+            dy = np.where(mask, Y - y_mean, 0.0)
+            r = (dx * dy).sum(axis=0) / np.sqrt((dx * dx).sum(axis=0) * (dy * dy).sum(axis=0))
+
+        r = np.clip(r, -1.0, 1.0)
+        return r, CorrelationEngine.p_values(r, n), n
+
+    @staticmethod
+    def spearman(x: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Rank-correlate a target with every column of a factor matrix.
+
+        Columns sharing the same missing-value pattern are ranked together in
+        one call, so complete data is ranked exactly once.
+
+        Args:
+            x: Target values, shape (n,)
+            Y: Factor values, shape (n, k), NaN for missing
+
+        Returns:
+            Tuple of (correlations, p-values, pairwise sample sizes), each shape (k,)
+        """
+        x = np.asarray(x, dtype=float)
+        Y = np.asarray(Y, dtype=float).reshape(len(x), -1)
+        mask = ~np.isnan(Y) & ~np.isnan(x)[:, None]
+        r = np.full(Y.shape[1], np.nan)
+
+        for cols in CorrelationEngine._mask_groups(mask):
+            rows = mask[:, cols[0]]
+            if rows.sum() < 2:
+                continue
+            x_ranks = stats.rankdata(x[rows])
+            y_ranks = stats.rankdata(Y[np.ix_(rows, cols)], axis=0)
+            r[cols] = CorrelationEngine.pearson(x_ranks, y_ranks)[0]
+
+        n = mask.sum(axis=0)
+        return r, CorrelationEngine.p_values(r, n), n
+
+    @staticmethod
+    def cross(X: np.ndarray, Y: np.ndarray,
+              method: str = "pearson") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Correlate every column of X with every column of Y.
+
+        Each pair uses its own pairwise-complete rows, so ``cross(X, X)`` is
+        the full correlation matrix (as ``DataFrame.corr`` would give) with
+        p-values, computed with matrix products instead of a loop over pairs.
+
+        Args:
+            X: First factor matrix, shape (n, a), NaN for missing
+            Y: Second factor matrix, shape (n, b), NaN for missing
+            method: "pearson" or "spearman"
+
+        Returns:
+            Tuple of (correlations, p-values, pairwise sample sizes), each shape (a, b)
+        """
+        if method not in ("pearson", "spearman"):
+            raise ValueError(f"Unknown correlation method: {method}")
+        X = np.asarray(X, dtype=float)
+        X = X.reshape(len(X), -1)
+        Y = np.asarray(Y, dtype=float).reshape(len(X), -1)
+        mask_x = ~np.isnan(X)
+        mask_y = ~np.isnan(Y)
+
+        if method == "pearson":
+            r = CorrelationEngine._pearson_cross(X, mask_x, Y, mask_y)
+        else:
+            # Columns with the same missing pattern share their pairwise rows,
+            # so ranking each column once is exact for those pairs
+            x_ranks = np.where(mask_x, stats.rankdata(np.where(mask_x, X, np.inf), axis=0), np.nan)
+            y_ranks = np.where(mask_y, stats.rankdata(np.where(mask_y, Y, np.inf), axis=0), np.nan)
+            r = CorrelationEngine._pearson_cross(x_ranks, mask_x, y_ranks, mask_y)
+
+            groups = np.unique(np.packbits(np.hstack([mask_x, mask_y]), axis=0),
+                               axis=1, return_inverse=True)[1].ravel()
+            same = groups[:X.shape[1], None] == groups[None, X.shape[1]:]
+            for i in np.flatnonzero(~same.all(axis=1)):
+                cols = np.flatnonzero(~same[i])
+                r[i, cols] = CorrelationEngine.spearman(X[:, i], Y[:, cols])[0]
+
+        n = mask_x.T.astype(float) @ mask_y.astype(float)
+        return r, CorrelationEngine.p_values(r, n), n.astype(np.int64)
+
+    @staticmethod
+    def grouped(x: np.ndarray, Y: np.ndarray, labels: np.ndarray, n_groups: int,
+                method: str = "pearson") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Correlate a target with every factor separately within each group.
+
+        Per-group counts, sums, sums of squares and cross products for all
+        factors come from one one-hot (groups x rows) matrix product, so all
+        groups are computed in a single pass instead of one filter and
+        correlation call per group. Spearman ranks within each group using
+        one sort per column keyed by (group, value).
+
+        Args:
+            x: Target values, shape (n,)
+            Y: Factor values, shape (n, k), NaN for missing
+            labels: Group code per row in [0, n_groups), -1 = no group
+            n_groups: Number of groups
+            method: "pearson" or "spearman"
+
+        Returns:
+            Tuple of (correlations, p-values, pairwise sample sizes), each
+            shape (n_groups, k)
+        """
+        if method not in ("pearson", "spearman"):
+            raise ValueError(f"Unknown correlation method: {method}")
+        x = np.asarray(x, dtype=float)
+        Y = np.asarray(Y, dtype=float).reshape(len(x), -1)
+        labels = np.asarray(labels)
+        mask = ~np.isnan(Y) & ~np.isnan(x)[:, None] & (labels >= 0)[:, None]
+        onehot = (np.arange(n_groups)[:, None] == labels[None, :]).astype(float)
+        m = mask.astype(float)
+        n = onehot @ m
+
+        X = np.broadcast_to(x[:, None], Y.shape)
+        if method == "spearman":
+            X = CorrelationEngine._grouped_rank(X, mask, labels, n)
+            Y = CorrelationEngine._grouped_rank(Y, mask, labels, n)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Shift by the overall means for numerical stability
+            X = np.where(mask, X - np.where(mask, X, 0.0).sum(axis=0) / m.sum(axis=0), 0.0)
+            Y = np.where(mask, Y - np.where(mask, Y, 0.0).sum(axis=0) / m.sum(axis=0), 0.0)
+            sx = onehot @ X
+            sy = onehot @ Y
+            cov = onehot @ (X * Y) - sx * sy / n
+            var_x = onehot @ (X * X) - sx * sx / n
+            var_y = onehot @ (Y * Y) - sy * sy / n
+            r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        r[n < 2] = np.nan
+        return r, CorrelationEngine.p_values(r, n), n.astype(np.int64)
+
+    @staticmethod
+    def partial(x: np.ndarray, Y: np.ndarray, Z: np.ndarray,
+                method: str = "pearson") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Partially correlate a target with every factor, controlling for covariates.
+
+        Each factor uses the rows where it, the target and all covariates are
+        present. The covariance matrices of (factor, target, covariates) for
+        all factors come from one weighted ``einsum`` and are inverted in one
+        batched call; the partial correlation is read off each precision
+        matrix as ``-P[0, 1] / sqrt(P[0, 0] * P[1, 1])``.
+
+        Args:
+            x: Target values, shape (n,)
+            Y: Factor values, shape (n, k), NaN for missing
+            Z: Covariate values, shape (n, q), NaN for missing
+            method: "pearson" or "spearman" (partial correlation of ranks)
+
+        Returns:
+            Tuple of (partial correlations, p-values with n - 2 - q degrees of
+            freedom, sample sizes), each shape (k,)
+        """
+        if method not in ("pearson", "spearman"):
+            raise ValueError(f"Unknown correlation method: {method}")
+        x = np.asarray(x, dtype=float)
+        Y = np.asarray(Y, dtype=float).reshape(len(x), -1)
+        Z = np.asarray(Z, dtype=float).reshape(len(x), -1)
+        q = Z.shape[1]
+
+        # Stack (factor, target, covariates) per factor: shape (n, k, 2 + q)
+        base = np.hstack([x[:, None], Z])
+        stacked = np.concatenate([Y[:, :, None], np.broadcast_to(base[:, None, :], Y.shape + base.shape[1:])], axis=2)
+        mask = ~np.isnan(stacked).any(axis=2)
+        n = mask.sum(axis=0)
+        if method == "spearman":
+            stacked = CorrelationEngine.rank(np.where(mask[:, :, None], stacked, np.nan), axis=0)
+        stacked = np.where(mask[:, :, None], stacked, 0.0)
+
+        w = mask.astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.einsum("nk,nka->ka", w, stacked) / n[:, None]
+            centred = np.where(mask[:, :, None], stacked - means, 0.0)
+            cov = np.einsum("nka,nkb->kab", centred, centred) / (n - 1)[:, None, None]
+
+        r = np.full(Y.shape[1], np.nan)
+        valid = (n > q + 2) & np.isfinite(cov).all(axis=(1, 2))
+        if valid.any():
+            try:
+                precision = np.linalg.inv(cov[valid])
+            except np.linalg.LinAlgError:
+                # Some factor is collinear with the covariates
+                precision = np.linalg.pinv(cov[valid], hermitian=True)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r[valid] = -precision[:, 0, 1] / np.sqrt(precision[:, 0, 0] * precision[:, 1, 1])
+        r = np.clip(r, -1.0, 1.0)
+        return r, CorrelationEngine.p_values(r, n - q), n
+
+    @staticmethod
+    def jackknife(x: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Leave-one-out Pearson correlations for every row and factor.
+
+        Removing a row from a pairwise-complete sample only subtracts its
+        contribution from the count, sums, sums of squares and cross
+        product, so all n x k leave-one-out correlations follow in closed
+        form from those running sums without refitting.
+
+        Args:
+            x: Target values, shape (n,)
+            Y: Factor values, shape (n, k), NaN for missing
+
+        Returns:
+            Tuple of (leave-one-out correlations, shape (n, k), NaN where the
+            row is not part of the factor's sample; full-sample correlations,
+            shape (k,))
+        """
+        x = np.asarray(x, dtype=float)
+        Y = np.asarray(Y, dtype=float).reshape(len(x), -1)
+        mask = ~np.isnan(Y) & ~np.isnan(x)[:, None]
+        n = mask.sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Centre on the full-sample means so the downdates stay accurate
+            dx = np.where(mask, x[:, None] - np.where(mask, x[:, None], 0.0).sum(axis=0) / n, 0.0)
+            dy = np.where(mask, Y - np.where(mask, Y, 0.0).sum(axis=0) / n, 0.0)
+            sxx, syy, sxy = (dx * dx).sum(axis=0), (dy * dy).sum(axis=0), (dx * dy).sum(axis=0)
+            r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+
+            # Sums of centred values are 0, so without row i they are -dx_i, -dy_i
+            m = n - 1
+            cov = sxy - dx * dy - dx * dy / m
+            var_x = sxx - dx * dx - dx * dx / m
+            var_y = syy - dy * dy - dy * dy / m
+            loo = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        loo[~mask | (n < 3)[None, :]] = np.nan
+        r[n < 2] = np.nan
+        return loo, r
+
+    @staticmethod
+    def bootstrap(x: np.ndarray, Y: np.ndarray, n_resamples: int = 10_000,
+                  method: str = "pearson", confidence: float = 0.95, seed: int = 0,
+                  max_workers: Optional[int] = None,
+                  block_size: int = 1_000) -> Dict[str, np.ndarray]:
+        """Bootstrap confidence intervals for target-factor correlations.
+
+        Resamples are drawn as index matrices (one row of row indices per
+        resample) and scored for all factors with batched array operations.
+        Blocks of resamples run in a process pool, each with its own child
+        of ``SeedSequence(seed)``, so results depend only on the seed and
+        block size, not on the number of workers.
+
+        Args:
+            x: Target values, shape (n,)
+            Y: Factor values, shape (n, k), NaN for missing
+            n_resamples: Number of bootstrap resamples
+            method: "pearson" or "spearman"
+            confidence: Confidence level of the percentile intervals
+            seed: Root seed for the resample streams
+            max_workers: Worker processes (None = CPU count, 1 = run inline)
+            block_size: Resamples per task
+
+        Returns:
+            Dictionary of "lower", "upper" and "std_error" arrays, each shape (k,)
+        """
+        if method not in ("pearson", "spearman"):
+            raise ValueError(f"Unknown correlation method: {method}")
+        x = np.asarray(x, dtype=float)
+        Y = np.asarray(Y, dtype=float).reshape(len(x), -1)
+        mask = ~np.isnan(Y) & ~np.isnan(x)[:, None]
+
+        sizes = [block_size] * (n_resamples // block_size)
+        if n_resamples % block_size:
+            sizes.append(n_resamples % block_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(x, Y, mask, size, method, child) for size, child in zip(sizes, seeds)]
+
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            blocks = [CorrelationEngine._bootstrap_block(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                blocks = list(pool.map(CorrelationEngine._bootstrap_block, *zip(*tasks)))
+        samples = np.vstack(blocks) if blocks else np.empty((0, Y.shape[1]))
+
+        k = Y.shape[1]
+        result = {key: np.full(k, np.nan) for key in ("lower", "upper", "std_error")}
+        valid = np.isfinite(samples).any(axis=0)
+        if valid.any():
+            alpha = (1 - confidence) / 2
+            bounds = np.nanquantile(samples[:, valid], [alpha, 1 - alpha], axis=0)
+            result["lower"][valid], result["upper"][valid] = bounds
+            result["std_error"][valid] = np.nanstd(samples[:, valid], axis=0, ddof=1)
+        logger.debug(f"Bootstrapped {k} factors with {n_resamples} resamples")
+        return result
+
+    @staticmethod
+    def permutation_test(x: np.ndarray, Y: np.ndarray, method: str = "pearson",
+                         n_permutations: int = 10_000, block_size: int = 500,
+                         alpha: float = 0.05, early_stop: bool = True,
+                         confidence: float = 0.999, seed: int = 0) -> Dict[str, np.ndarray]:
+        """Two-sided permutation p-values for target-factor correlations.
+
+        Permutations of the (standardized) target are generated a block at a
+        time and scored against every factor with one matrix multiply. With
+        ``early_stop``, a factor stops receiving permutations once a
+        Clopper-Pearson interval on its p-value lies entirely above or below
+        ``alpha``.
+
+        Args:
+            x: Target values, shape (n,)
+            Y: Factor values, shape (n, k), NaN for missing
+            method: "pearson" or "spearman"
+            n_permutations: Maximum permutations per factor
+            block_size: Permutations generated per block
+            alpha: Significance threshold used for early stopping
+            early_stop: Whether to stop factors whose decision is settled
+            confidence: Confidence of the early-stopping interval
+            seed: Seed for deterministic permutations
+
+        Returns:
+            Dictionary of "p_values" and "permutations" (used per factor), each shape (k,)
+        """
+        if method not in ("pearson", "spearman"):
+            raise ValueError(f"Unknown correlation method: {method}")
+        x = np.asarray(x, dtype=float)
+        Y = np.asarray(Y, dtype=float).reshape(len(x), -1)
+        mask = ~np.isnan(Y) & ~np.isnan(x)[:, None]
+
+        k = Y.shape[1]
+        exceed = np.zeros(k, dtype=np.int64)
+        done = np.zeros(k, dtype=np.int64)
+        groups = CorrelationEngine._mask_groups(mask)
+        seeds = np.random.SeedSequence(seed).spawn(len(groups))
+
+        for cols, child in zip(groups, seeds):
+            rows = mask[:, cols[0]]
+            if rows.sum() < 3:
+                continue
+            xs = x[rows]
+            ys = Y[np.ix_(rows, cols)]
+            if method == "spearman":
+                xs = CorrelationEngine.rank(xs)
+                ys = CorrelationEngine.rank(ys, axis=0)
+
+            # Unit-norm centered columns make the dot product the correlation
+            xs = xs - xs.mean()
+            ys = ys - ys.mean(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                xs = xs / np.sqrt((xs * xs).sum())
+                ys = ys / np.sqrt((ys * ys).sum(axis=0))
+            observed = np.abs(xs @ ys) * (1 - 1e-12)
+
+            rng = np.random.default_rng(child)
+            active = np.flatnonzero(np.isfinite(observed))
+            while len(active) and done[cols[active[0]]] < n_permutations:
+                size = min(block_size, n_permutations - done[cols[active[0]]])
+                permuted = rng.permuted(np.broadcast_to(xs, (size, len(xs))), axis=1)
+                scores = np.abs(permuted @ ys[:, active])
+                exceed[cols[active]] += (scores >= observed[active]).sum(axis=0)
+                done[cols[active]] += size
+
+                if early_stop:
+                    lower, upper = CorrelationEngine._p_value_bounds(
+                        exceed[cols[active]], done[cols[active]], confidence)
+                    active = active[(lower <= alpha) & (upper >= alpha)]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p_values = np.where(done > 0, (exceed + 1) / (done + 1), np.nan)
+        logger.debug(f"Permutation test used {done.sum()} factor-permutations for {k} factors")
+        return {"p_values": p_values, "permutations": done}
+
+    @staticmethod
+    def rank(values: np.ndarray, axis: int = 0) -> np.ndarray:
+        """Average ranks (ties share their mean rank) along an axis.
+
+        Equivalent to ``scipy.stats.rankdata(values, axis=axis)`` for data
+        without NaN, but ranks all slices with one sort.
+
+        Args:
+            values: Array to rank
+            axis: Axis along which to rank
+
+        Returns:
+            Float array of ranks starting at 1
+        """
+        values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+        n = values.shape[-1]
+        order = np.argsort(values, axis=-1, kind="mergesort")
+        ordered = np.take_along_axis(values, order, axis=-1)
+
+        positions = np.broadcast_to(np.arange(n), ordered.shape)
+        starts = np.ones(ordered.shape, dtype=bool)
+        starts[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+        ends = np.ones(ordered.shape, dtype=bool)
+        ends[..., :-1] = starts[..., 1:]
+        first = np.maximum.accumulate(np.where(starts, positions, 0), axis=-1)
+        last = np.flip(np.minimum.accumulate(np.flip(np.where(ends, positions, n - 1), -1), axis=-1), -1)
+
+        ranks = np.empty(ordered.shape)
+        np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=-1)
+        return np.moveaxis(ranks, -1, axis)
+
+    @staticmethod
+    def p_values(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+        """Two-sided p-values for correlations under the null of no association.
+
+        Args:
+            r: Correlation coefficients
+            n: Sample sizes behind each coefficient
+
+        Returns:
+            Array of p-values (NaN where undefined)
+        """
+        r = np.asarray(r, dtype=float)
+        df = np.asarray(n, dtype=float) - 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = r * np.sqrt(df / ((1.0 - r) * (1.0 + r)))
+            p = 2 * stats.t.sf(np.abs(t), np.where(df > 0, df, np.nan))
+        return np.where(np.isnan(r), np.nan, p)
+
+    @staticmethod
+    def _pearson_cross(X: np.ndarray, mask_x: np.ndarray,
+                       Y: np.ndarray, mask_y: np.ndarray) -> np.ndarray:
+        """Pairwise-complete Pearson matrix from masked sums of products."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Shift columns by their means for numerical stability
+            mx = mask_x.astype(float)
+            my = mask_y.astype(float)
+            X = np.where(mask_x, X, 0.0)
+            Y = np.where(mask_y, Y, 0.0)
+            X = np.where(mask_x, X - X.sum(axis=0) / mx.sum(axis=0), 0.0)
+            Y = np.where(mask_y, Y - Y.sum(axis=0) / my.sum(axis=0), 0.0)
+
+            n = mx.T @ my
+            sx = X.T @ my
+            sy = mx.T @ Y
+            sxy = X.T @ Y
+            sxx = (X * X).T @ my
+            syy = mx.T @ (Y * Y)
+
+            cov = sxy - sx * sy / n
+            var_x = sxx - sx * sx / n
+            var_y = syy - sy * sy / n
+            r = cov / np.sqrt(var_x * var_y)
+        return np.clip(r, -1.0, 1.0)
+
+    @staticmethod
+    def _grouped_rank(values: np.ndarray, mask: np.ndarray, labels: np.ndarray,
+                      counts: np.ndarray) -> np.ndarray:
+        """Average ranks of each column within each group over masked rows."""
+        # Offsetting global ranks by group keeps groups apart and ties intact
+        n = len(values)
+        ranks = CorrelationEngine.rank(np.where(mask, values, np.nan), axis=0)
+        keys = np.where(mask, ranks + np.maximum(labels, 0)[:, None] * (n + 1), np.nan)
+        starts = np.cumsum(counts, axis=0) - counts
+        offset = np.take_along_axis(starts, np.broadcast_to(np.maximum(labels, 0)[:, None], values.shape), axis=0)
+        return np.where(mask, CorrelationEngine.rank(keys, axis=0) - offset, np.nan)
+
+    @staticmethod
+    def _p_value_bounds(exceed: np.ndarray, done: np.ndarray,
+                        confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Clopper-Pearson interval for permutation p-values."""
+        tail = (1 - confidence) / 2
+        lower = np.where(exceed > 0, stats.beta.ppf(tail, exceed, done - exceed + 1), 0.0)
+        upper = np.where(exceed < done, stats.beta.ppf(1 - tail, exceed + 1, done - exceed), 1.0)
+        return lower, upper
+
+    @staticmethod
+    def _bootstrap_block(x: np.ndarray, Y: np.ndarray, mask: np.ndarray, size: int,
+                         method: str, seed: np.random.SeedSequence) -> np.ndarray:
+        """Correlations of one block of bootstrap resamples, shape (size, k)."""
+        rng = np.random.default_rng(seed)
+        out = np.full((size, Y.shape[1]), np.nan)
+
+        for cols in CorrelationEngine._mask_groups(mask):
+            rows = np.flatnonzero(mask[:, cols[0]])
+            if len(rows) < 3:
+                continue
+            index = rows[rng.integers(0, len(rows), (size, len(rows)))]
+            xb = x[index]
+            if method == "spearman":
+                xb = CorrelationEngine.rank(xb, axis=1)
+            xb = xb - xb.mean(axis=1, keepdims=True)
+            x_ss = (xb * xb).sum(axis=1)
+
+            # Bound the (size, rows, factors) working array
+            step = max(1, 4_000_000 // (size * len(rows)))
+            for start in range(0, len(cols), step):
+                part = cols[start:start + step]
+                yb = Y[:, part][index]
+                if method == "spearman":
+                    yb = CorrelationEngine.rank(yb, axis=1)
+                yb = yb - yb.mean(axis=1, keepdims=True)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out[:, part] = (np.einsum("bm,bmf->bf", xb, yb)
+                                    / np.sqrt(x_ss[:, None] * (yb * yb).sum(axis=1)))
+        return out
+
+    @staticmethod
+    def _mask_groups(mask: np.ndarray) -> List[np.ndarray]:
+        """Group column positions by identical missing-value pattern."""
+        if mask.shape[1] == 0:
+            return []
+        packed = np.packbits(mask, axis=0)
+        _, inverse = np.unique(packed, axis=1, return_inverse=True)
+        inverse = inverse.ravel()
+        return [np.flatnonzero(inverse == g) for g in range(inverse.max() + 1)]
@@ -0,0 +1,134 @@
+"""Multivariate driver model fitted over many country subsets at once."""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+
+class DriverModel:
+    """Standardized OLS/ridge regression of the happiness score on its drivers.
+
+    Features and target are standardized once, so coefficients are beta
+    weights comparable across drivers. Any number of row subsets (leave-one-
+    group-out, bootstrap replicates, peer groups) are expressed as a weight
+    matrix with one row per subset and solved together: weighted Gram
+    matrices come from one ``einsum`` and all normal equations from one
+    batched ``np.linalg.solve``.
+    """
+
+    def __init__(self, alpha: float = 0.0):
+        """Initialize model.
+
+        Args:
+            alpha: Ridge penalty on the standardized coefficients (0 = OLS)
+        """
+        if alpha < 0:
+            raise ValueError("alpha must be non-negative")
+        self.alpha = alpha
+        self.scaler = StandardScaler()
+
+    def fit(self, X: pd.DataFrame, y: pd.Series, weights: Optional[np.ndarray] = None,
+            names: Optional[Sequence[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Fit the model on every subset in one batched solve.
+
+        Rows with a missing feature or target are dropped before fitting.
+
+        Args:
+            X: Driver features, one row per country
+            y: Target aligned with X
+            weights: Row weights per subset, shape (subsets, rows); 0/1 for
+                subsets, counts for bootstrap replicates (None = one full fit)
+            names: Optional subset names
+
+        Returns:
+            Dictionary with "coefficients" (subsets x features DataFrame),
+            "intercept", "r2" and "n" (effective rows) Series
+        """
+        features = list(X.columns)
+        values = X.to_numpy(dtype=float)
+        target = np.asarray(y, dtype=float)
+        complete = ~np.isnan(values).any(axis=1) & ~np.isnan(target)
+
+        if weights is None:
+            weights = np.ones((1, len(values)))
+        weights = np.asarray(weights, dtype=float).reshape(-1, len(values))[:, complete]
+        if names is None:
+            names = [f"Subset {i}" for i in range(len(weights))] if len(weights) > 1 else ["All"]
+
+        Xs = self.scaler.fit_transform(values[complete])
+        ys = (target[complete] - target[complete].mean()) / target[complete].std()
+        coef, intercept, r2 = self._solve(Xs, ys, weights, self.alpha)
+
+        index = pd.Index(list(names), name="Subset")
+        logger.info(f"Fitted driver model on {len(weights)} subsets x {len(features)} drivers")
+        return {
+            "coefficients": pd.DataFrame(coef, index=index, columns=features),
+            "intercept": pd.Series(intercept, index=index),
+            "r2": pd.Series(r2, index=index),
+            "n": pd.Series(weights.sum(axis=1), index=index)
+        }
+
+    @staticmethod
+    def bootstrap_weights(n_rows: int, n_resamples: int = 1_000, seed: int = 0) -> np.ndarray:
+        """Bootstrap replicates as resampling-count weights.
+
+        Args:
+            n_rows: Number of rows
+            n_resamples: Number of replicates
+            seed: Seed for deterministic resampling
+
+        Returns:
+            Weight matrix, shape (n_resamples, n_rows)
+        """
+        rng = np.random.default_rng(seed)
+        return rng.multinomial(n_rows, np.full(n_rows, 1 / n_rows), size=n_resamples).astype(float)
+
+    @staticmethod
+    def group_weights(labels: np.ndarray, group_names: List[str],
+                      leave_out: bool = False) -> Tuple[np.ndarray, List[str]]:
+        """Subset weights for each group (or for everything except each group).
+
+        Args:
+            labels: Group code per row (-1 = no group)
+            group_names: Name of each group code
+            leave_out: Whether to build leave-one-group-out subsets
+
+        Returns:
+            Tuple of (weight matrix with one row per group, subset names)
+        """
+        labels = np.asarray(labels)
+        member = labels[None, :] == np.arange(len(group_names))[:, None]
+        if leave_out:
+            return (~member & (labels >= 0)[None, :]).astype(float), [f"Without {name}" for name in group_names]
+        return member.astype(float), list(group_names)
+
+    @staticmethod
+    def _solve(X: np.ndarray, y: np.ndarray, weights: np.ndarray,
+               alpha: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Weighted least squares with intercept for every weight row."""
+        p = X.shape[1]
+        w_sum = weights.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = weights @ X / w_sum[:, None]
+            y_mean = weights @ y / w_sum
+
+        gram = np.einsum("sn,np,nq->spq", weights, X, X, optimize=True)
+        gram -= w_sum[:, None, None] * x_mean[:, :, None] * x_mean[:, None, :]
+        gram += alpha * np.eye(p)
+        xty = weights @ (X * y[:, None]) - w_sum[:, None] * x_mean * y_mean[:, None]
+
+        try:
+            coef = np.linalg.solve(gram, xty[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            # Some subset is rank deficient; fall back to minimum-norm solutions
+            coef = np.einsum("spq,sq->sp", np.linalg.pinv(gram), xty)
+        intercept = y_mean - (x_mean * coef).sum(axis=1)
+
+        residuals = y[None, :] - coef @ X.T - intercept[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r2 = 1 - (weights * residuals ** 2).sum(axis=1) / (weights * (y[None, :] - y_mean[:, None]) ** 2).sum(axis=1)
+        return coef, intercept, r2
@@ -0,0 +1,144 @@
+"""Component-wise score gaps between every pair of countries."""
+
+import logging
+from typing import Iterator, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+from src.data.country_index import CountryIndex
+
+logger = logging.getLogger(__name__)
+
+
+class GapTensor:
+    """All-pairs (country x country x component) gap tensor.
+
+    Entry (i, j, c) is component c of country i minus that of country j, so
+    a pair's gaps sum to its score gap when the components decompose the
+    score. When the full tensor fits in ``max_bytes`` it is built with one
+    broadcast and every pair query is a slice; otherwise it is only ever
+    materialized in row blocks of at most ``max_bytes`` (blocked mode),
+    and pair queries subtract the two component rows.
+    """
+
+    def __init__(self, values: np.ndarray, names: List[str], components: List[str],
+                 max_bytes: int = 64 * 1024 ** 2):
+        """Initialize tensor from per-country components.
+
+        Args:
+            values: Component values, shape (countries, components), NaN for missing
+            names: Country names
+            components: Component names
+            max_bytes: Memory limit for the materialized tensor or one block
+        """
+        self.values = np.asarray(values, dtype=float).reshape(len(names), len(components))
+        self.names = list(names)
+        self.components = list(components)
+        self.country_index = CountryIndex.from_series(pd.Series(self.names, dtype=object))
+
+        row_bytes = max(1, len(self.names) * len(self.components) * self.values.itemsize)
+        self.block_rows = max(1, max_bytes // row_bytes)
+        self.blocked = self.block_rows < len(self.names)
+        self.tensor: Optional[np.ndarray] = None
+        if not self.blocked:
+            self.tensor = self.values[:, None, :] - self.values[None, :, :]
+        logger.debug(f"Gap tensor over {len(self.names)} countries x {len(self.components)} components "
+                     f"({'blocks of ' + str(self.block_rows) + ' rows' if self.blocked else 'materialized'})")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, country_col: str, components: List[str],
+                   **kwargs) -> "GapTensor":
+        """Build tensor from a DataFrame.
+
+        Args:
+            df: Data with one row per country
+            country_col: Country name column
+            components: Component columns
+            **kwargs: Options passed to the constructor
+
+        Returns:
+            GapTensor over the frame's countries
+        """
+        return cls(df[components].to_numpy(dtype=float, na_value=np.nan),
+                   df[country_col].astype(object).tolist(), components, **kwargs)
+
+    def gaps(self, a: str, b: str) -> np.ndarray:
+        """Get the component gaps of country a over country b.
+
+        Args:
+            a: Country name
+            b: Country name
+
+        Returns:
+            Gap per component, shape (components,)
+
+        Raises:
+            KeyError: If either country is unknown
+        """
+        i, j = self._position(a), self._position(b)
+        if self.tensor is not None:
+            return self.tensor[i, j]
+        return self.values[i] - self.values[j]
+
+    def explain(self, a: str, b: str) -> pd.DataFrame:
+        """Break down why country a scores above (or below) country b.
+
+        Args:
+            a: Country name
+            b: Country name
+
+        Returns:
+            DataFrame per component with the Gap and its Share of the total
+            gap (NaN if a component is missing), ordered by absolute gap
+
+        Raises:
+            KeyError: If either country is unknown
+        """
+        gaps = self.gaps(a, b)
+        total = gaps.sum()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = gaps / total if total != 0 else np.full(len(gaps), np.nan)
+        return pd.DataFrame({"Gap": gaps, "Share": share},
+                            index=pd.Index(self.components, name="Component")
+                            ).sort_values("Gap", key=abs, ascending=False)
+
+    def matrix(self, component: Optional[str] = None) -> pd.DataFrame:
+        """Get the country x country gap matrix of one component or the total.
+
+        Args:
+            component: Component name (None = sum over components)
+
+        Returns:
+            Square DataFrame; entry (a, b) is a's gap over b
+        """
+        index = pd.Index(self.names, name="Country")
+        out = np.empty((len(self.names), len(self.names)))
+        for rows, block in self.iter_blocks():
+            if component is None:
+                out[rows] = block.sum(axis=2)
+            else:
+                out[rows] = block[:, :, self.components.index(component)]
+        return pd.DataFrame(out, index=index, columns=index)
+
+    def iter_blocks(self) -> Iterator[Tuple[slice, np.ndarray]]:
+        """Iterate over the tensor in memory-bounded row blocks.
+
+        Yields:
+            Tuple of (row slice, gap block of shape (rows, countries, components))
+        """
+        if self.tensor is not None:
+            yield slice(0, len(self.names)), self.tensor
+            return
+        for start in range(0, len(self.names), self.block_rows):
+            rows = slice(start, start + self.block_rows)
+            yield rows, self.values[rows, None, :] - self.values[None, :, :]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _position(self, country: str) -> int:
+        """Row position of a country."""
+        positions = self.country_index.positions(country)
+        if not len(positions):
+            raise KeyError(f"{country} is not in the gap tensor")
+        return int(positions[0])
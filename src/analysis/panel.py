@@ -0,0 +1,226 @@
+"""Dense year x country x metric cube for multi-year WHR panels."""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+from src.analysis.correlation import CorrelationEngine
+from src.analysis.ranking import RankTable
+from src.data.country_index import CountryIndex
+
+logger = logging.getLogger(__name__)
+
+
+class PanelCube:
+    """Long-format panel pivoted once into a (year, country, metric) array.
+
+    Countries absent in a year are NaN rows of that year's slice, so every
+    statistic is a reduction over the country axis that covers all years
+    at once: correlations from masked sums, ranks from one column-wise sort
+    of the (country, year x metric) reshape, and peer-group summaries from
+    a one-hot group matrix contracted with the cube.
+    """
+
+    def __init__(self, values: np.ndarray, years: List[int], countries: List[str],
+                 metrics: List[str]):
+        """Initialize cube from a dense array.
+
+        Args:
+            values: Metric values, shape (years, countries, metrics), NaN for missing
+            years: Year labels, ascending
+            countries: Country names
+            metrics: Metric names
+        """
+        self.values = np.asarray(values, dtype=float).reshape(len(years), len(countries), len(metrics))
+        self.years = list(years)
+        self.countries = list(countries)
+        self.metrics = list(metrics)
+        self.country_index = CountryIndex.from_series(pd.Series(self.countries, dtype=object))
+        self._metric_pos = {metric: j for j, metric in enumerate(self.metrics)}
+        self._ranks: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, country_col: str, year_col: str,
+                  metrics: Optional[List[str]] = None) -> "PanelCube":
+        """Pivot long-format data (one row per country and year) into a cube.
+
+        Country names are matched case- and whitespace-insensitively; if a
+        country appears twice in a year the last row wins.
+
+        Args:
+            df: Long-format panel
+            country_col: Country name column
+            year_col: Year column
+            metrics: Columns to include (None = all numeric columns except the year)
+
+        Returns:
+            PanelCube over the panel's years and countries
+        """
+        if metrics is None:
+            metrics = [c for c in df.select_dtypes(include=[np.number]).columns if c != year_col]
+        df = df[df[year_col].notna() & df[country_col].notna()]
+
+        year_codes, years = pd.factorize(df[year_col], sort=True)
+        country_codes, _ = pd.factorize(CountryIndex.normalize_series(df[country_col]))
+        first = np.unique(country_codes, return_index=True)[1]
+        countries = df[country_col].to_numpy()[first].tolist()
+
+        values = np.full((len(years), len(countries), len(metrics)), np.nan)
+        values[year_codes, country_codes] = df[metrics].to_numpy(dtype=float, na_value=np.nan)
+
+        duplicates = len(df) - len(np.unique(year_codes * len(countries) + country_codes))
+        if duplicates:
+            logger.warning(f"Panel has {duplicates} duplicate country-year rows; keeping the last")
+        logger.info(f"Built panel cube of {len(years)} years x {len(countries)} countries x "
+                    f"{len(metrics)} metrics")
+        return cls(values, [y.item() if hasattr(y, "item") else y for y in years], countries, metrics)
+
+    def metric(self, name: str) -> np.ndarray:
+        """Get one metric for every year and country.
+
+        Args:
+            name: Metric name
+
+        Returns:
+            Array of shape (years, countries)
+        """
+        return self.values[:, :, self._metric_pos[name]]
+
+    def correlations(self, target: str, factors: Optional[List[str]] = None,
+                     method: str = "pearson") -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Correlate a target with every factor in every year at once.
+
+        Missing values are handled pairwise within each year, matching
+        calculate_correlations on that year's snapshot.
+
+        Args:
+            target: Target metric (e.g. the ladder score)
+            factors: Factor metrics (None = all metrics except the target)
+            method: "pearson" or "spearman"
+
+        Returns:
+            Tuple of (correlations, p-values, pairwise sample sizes), each a
+            DataFrame indexed by year with one column per factor
+
+        Raises:
+            ValueError: If method is unknown
+        """
+        if method not in ("pearson", "spearman"):
+            raise ValueError(f"Unknown correlation method: {method}")
+        if factors is None:
+            factors = [m for m in self.metrics if m != target]
+
+        x = self.metric(target)[:, :, None]
+        Y = self.values[:, :, [self._metric_pos[f] for f in factors]]
+        mask = ~np.isnan(Y) & ~np.isnan(x)
+        n = mask.sum(axis=1)
+
+        if method == "spearman":
+            # Rank each year/factor pair over its own complete rows
+            x = CorrelationEngine.rank(np.where(mask, x, np.nan), axis=1)
+            Y = CorrelationEngine.rank(np.where(mask, Y, np.nan), axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = np.where(mask, x, 0.0).sum(axis=1, keepdims=True) / n[:, None, :]
+            y_mean = np.where(mask, Y, 0.0).sum(axis=1, keepdims=True) / n[:, None, :]
+            dx = np.where(mask, x - x_mean, 0.0)
+            dy = np.where(mask, Y - y_mean, 0.0)
+            r = (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+        r = np.clip(r, -1.0, 1.0)
+        r[n < 2] = np.nan
+
+        index = pd.Index(self.years, name="Year")
+        return (pd.DataFrame(r, index=index, columns=factors),
+                pd.DataFrame(CorrelationEngine.p_values(r, n), index=index, columns=factors),
+                pd.DataFrame(n, index=index, columns=factors))
+
+    @property
+    def ranks(self) -> np.ndarray:
+        """Descending ranks within each year, shape (years, countries, metrics).
+
+        Computed on first use; 0 marks a missing value.
+        """
+        if self._ranks is None:
+            self._ranks = self._rank(self.values)
+        return self._ranks
+
+    def rank_frame(self, metric: str) -> pd.DataFrame:
+        """Get ranks on one metric as a country x year table.
+
+        Args:
+            metric: Metric name
+
+        Returns:
+            DataFrame of ranks (missing where the country has no value)
+        """
+        ranks = self.ranks[:, :, self._metric_pos[metric]].T
+        return pd.DataFrame(np.where(ranks > 0, ranks, np.nan), index=pd.Index(self.countries, name="Country"),
+                            columns=pd.Index(self.years, name="Year")).astype("Int64")
+
+    def rank_changes(self, metric: str, periods: int = 1) -> pd.DataFrame:
+        """Get rank changes between each year and the year ``periods`` before it.
+
+        Args:
+            metric: Metric name
+            periods: Number of panel years to look back
+
+        Returns:
+            Country x year DataFrame of places gained (positive = moved up);
+            missing where either year lacks the country. The first
+            ``periods`` years are dropped.
+        """
+        ranks = self.rank_frame(metric)
+        return (ranks.shift(periods, axis=1) - ranks).iloc[:, periods:]
+
+    def group_summary(self, labels: np.ndarray, group_names: List[str]) -> Dict[str, pd.DataFrame]:
+        """Per-year mean, standard deviation and count of every metric per group.
+
+        Args:
+            labels: Group code per country (-1 = no group)
+            group_names: Name of each group code
+
+        Returns:
+            Dictionary with "mean", "std" (ddof=1) and "count" DataFrames
+            indexed by (year, group) with one column per metric
+        """
+        labels = np.asarray(labels)
+        onehot = (labels[None, :] == np.arange(len(group_names))[:, None]).astype(float)
+        present = ~np.isnan(self.values)
+        filled = np.where(present, self.values, 0.0)
+
+        count = np.einsum("gc,ycm->ygm", onehot, present.astype(float))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.einsum("gc,ycm->ygm", onehot, filled) / count
+            # Second pass around the group means avoids cancellation
+            centred = np.where(present[:, None], filled[:, None] - mean[:, :, None], 0.0)
+            sq = np.einsum("gc,ygcm->ygm", onehot, centred ** 2)
+            std = np.sqrt(sq / (count - 1))
+        mean[count == 0] = np.nan
+        std[count < 2] = np.nan
+
+        index = pd.MultiIndex.from_product([self.years, group_names], names=["Year", "Group"])
+        shape = (len(index), len(self.metrics))
+        return {
+            "mean": pd.DataFrame(mean.reshape(shape), index=index, columns=self.metrics),
+            "std": pd.DataFrame(std.reshape(shape), index=index, columns=self.metrics),
+            "count": pd.DataFrame(count.reshape(shape).astype(np.int64), index=index, columns=self.metrics)
+        }
+
+    def group_ranks(self, labels: np.ndarray) -> np.ndarray:
+        """Ranks within each group and year.
+
+        Args:
+            labels: Group code per country (-1 = no group)
+
+        Returns:
+            int32 array of shape (years, countries, metrics), 0 outside groups
+        """
+        return self._rank(self.values, labels)
+
+    def _rank(self, values: np.ndarray, labels: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rank every (year, metric) column over countries in one sort."""
+        years, countries, metrics = values.shape
+        flat = values.transpose(1, 0, 2).reshape(countries, years * metrics)
+        ranks = RankTable.compute_ranks(flat, labels)
+        return ranks.reshape(countries, years, metrics).transpose(1, 0, 2)
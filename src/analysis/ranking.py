@@ -0,0 +1,134 @@
+"""Precomputed rank tables for countries across all metrics."""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RankTable:
+    """Descending ranks of every row on every metric, computed once.
+
+    Ranks are ordinal (1 = highest value, ties broken by row order) and 0
+    marks a missing value. Global ranks are built with one column-wise
+    argsort; ranks within a peer group reuse the same sort, so looking up
+    any country's global or peer rank afterwards is a single array index.
+    """
+
+    def __init__(self, values: np.ndarray, metrics: List[str]):
+        """Initialize table from a metric matrix.
+
+        Args:
+            values: Metric values, shape (rows, metrics), NaN for missing
+            metrics: Metric names, one per column
+        """
+        self.values = np.asarray(values, dtype=float).reshape(-1, len(metrics))
+        self.metrics = list(metrics)
+        self.ranks = self.compute_ranks(self.values)
+        self.counts = (~np.isnan(self.values)).sum(axis=0)
+        self._metric_pos = {metric: j for j, metric in enumerate(self.metrics)}
+        self._groups: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, metrics: Optional[List[str]] = None) -> "RankTable":
+        """Build table from DataFrame columns.
+
+        Args:
+            df: Data with one row per country
+            metrics: Columns to rank (None = all numeric columns)
+
+        Returns:
+            RankTable over the frame's row positions
+        """
+        if metrics is None:
+            metrics = list(df.select_dtypes(include=[np.number]).columns)
+        return cls(df[metrics].to_numpy(dtype=float, na_value=np.nan), metrics)
+
+    @staticmethod
+    def compute_ranks(values: np.ndarray, labels: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rank each column in descending order, optionally within label groups.
+
+        Args:
+            values: Metric values, shape (rows, metrics), NaN for missing
+            labels: Optional non-negative group label per row (-1 = unranked)
+
+        Returns:
+            int32 array of ranks, 0 for missing or unranked rows
+        """
+        n = values.shape[0]
+        if labels is None:
+            labels = np.zeros(n, dtype=np.int64)
+        labels = np.asarray(labels)
+
+        # Sort by value (descending, NaN last), then stably by group label
+        order = np.argsort(-values, axis=0, kind="stable")
+        by_label = np.argsort(labels[order], axis=0, kind="stable")
+        order = np.take_along_axis(order, by_label, axis=0)
+
+        # Every column has the same label sequence once sorted
+        sorted_labels = np.sort(labels, kind="stable")
+        within = np.arange(n) - np.searchsorted(sorted_labels, sorted_labels, side="left") + 1
+
+        ranks = np.empty(values.shape, dtype=np.int32)
+        np.put_along_axis(ranks, order, np.broadcast_to(within[:, None], values.shape).astype(np.int32), axis=0)
+        ranks[np.isnan(values) | (labels < 0)[:, None]] = 0
+        return ranks
+
+    def add_group(self, name: str, rows: np.ndarray):
+        """Precompute ranks within a peer group.
+
+        Args:
+            name: Group name
+            rows: Row positions of the group's members
+        """
+        labels = np.full(len(self.values), -1)
+        labels[np.asarray(rows, dtype=np.intp)] = 0
+        ranks = self.compute_ranks(self.values, labels)
+        self._groups[name] = (ranks, (ranks > 0).sum(axis=0))
+        logger.debug(f"Ranked peer group {name} with {len(rows)} members")
+
+    def group_ranks(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Get ranks within a peer group.
+
+        Args:
+            name: Group name given to :meth:`add_group`
+
+        Returns:
+            Tuple of (rank matrix with 0 outside the group, ranked members per metric)
+        """
+        return self._groups[name]
+
+    def groups(self) -> List[str]:
+        """Get names of precomputed peer groups.
+
+        Returns:
+            List of group names
+        """
+        return list(self._groups)
+
+    def metric_position(self, metric: str) -> int:
+        """Get the column position of a metric.
+
+        Args:
+            metric: Metric name
+
+        Returns:
+            Column position in the rank matrix
+        """
+        return self._metric_pos[metric]
+
+    def rank(self, row: int, metric: str, group: Optional[str] = None) -> int:
+        """Look up one rank.
+
+        Args:
+            row: Row position
+            metric: Metric name
+            group: Peer group name (None = global rank)
+
+        Returns:
+            Rank (0 if the value is missing or the row is outside the group)
+        """
+        ranks = self.ranks if group is None else self._groups[group][0]
+        return int(ranks[row, self._metric_pos[metric]])
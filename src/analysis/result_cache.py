@@ -0,0 +1,261 @@
+"""Content-addressed on-disk cache for analysis results."""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Persist analysis results keyed by a hash of their inputs.
+
+    Keys combine a content hash of the input DataFrame (values, index, column
+    names and dtypes) with the analysis parameters and a digest of the
+    analysis source code, so identical inputs map to the same entry across
+    processes and restarts, and editing the analysis code invalidates old
+    results. Entries are zlib-compressed JSON (frames, arrays and NumPy
+    scalars are tagged objects) written atomically, so reading a shared
+    cache directory never executes code; when the cache grows past
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    FORMAT_VERSION = 2
+    SUFFIX = ".result"
+    _code_version: Optional[str] = None
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 256 * 1024 ** 2):
+        """Initialize cache rooted at a directory.
+
+        Args:
+            cache_dir: Directory where result entries are stored
+            max_bytes: Size limit before least recently used entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def key(cls, df: pd.DataFrame, **params) -> str:
+        """Compute a content address for a frame plus analysis parameters.
+
+        Args:
+            df: Input DataFrame
+            **params: Parameters that affect the result (must have stable repr)
+
+        Returns:
+            Hex digest identifying the inputs
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode("utf-8"))
+        digest.update(repr(sorted(params.items())).encode("utf-8"))
+        digest.update(f"v{cls.FORMAT_VERSION}|{cls.code_version()}".encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def code_version(cls) -> str:
+        """Digest of the analysis package sources, computed once per process.
+
+        Returns:
+            Hex digest that changes whenever a module in src/analysis changes
+        """
+        if cls._code_version is None:
+            digest = hashlib.blake2b(digest_size=8)
+            for path in sorted(Path(__file__).parent.glob("*.py")):
+                digest.update(path.name.encode("utf-8"))
+                digest.update(path.read_bytes())
+            cls._code_version = digest.hexdigest()
+        return cls._code_version
+
+    def get(self, key: str) -> Optional[Any]:
+        """Load a cached result.
+
+        Args:
+            key: Content address from :meth:`key`
+
+        Returns:
+            Cached result, or None on a cache miss
+        """
+        path = self._entry_path(key)
+        try:
+            payload = path.read_bytes()
+            value = json.loads(zlib.decompress(payload).decode("utf-8"), object_hook=self._decode)
+        except FileNotFoundError:
+            self._record(hit=False)
+            return None
+        except (OSError, zlib.error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Discarding unreadable result cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self._record(hit=False)
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._record(hit=True)
+        return value
+
+    def put(self, key: str, value: Any) -> bool:
+        """Store a result.
+
+        Args:
+            key: Content address from :meth:`key`
+            value: Result built from dicts, lists, strings, numbers, bytes,
+                NumPy arrays/scalars, Series and DataFrames
+
+        Returns:
+            True if the entry was written
+        """
+        path = self._entry_path(key)
+        tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        try:
+            payload = zlib.compress(json.dumps(value, default=self._encode).encode("utf-8"), 6)
+            if len(payload) > self.max_bytes:
+                logger.debug(f"Result {key[:12]} exceeds cache size limit, skipping cache")
+                return False
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write result cache entry {key[:12]}: {e}")
+            tmp.unlink(missing_ok=True)
+            return False
+
+        self._evict()
+        return True
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return a cached result, computing and storing it on a miss.
+
+        Args:
+            key: Content address from :meth:`key`
+            compute: Zero-argument function producing the result
+
+        Returns:
+            Cached or freshly computed result
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current size.
+
+        Returns:
+            Dictionary with hits, misses, entries and bytes
+        """
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries)
+        }
+
+    def clear(self):
+        """Remove all entries."""
+        for path, _, _ in self._entries():
+            path.unlink(missing_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        """File path of an entry."""
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def _entries(self):
+        """List (path, size, last use) for every entry."""
+        if not self.cache_dir.exists():
+            return []
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def _evict(self):
+        """Delete least recently used entries until under the size limit."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted result cache entry {path.name}")
+
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        """Encode a value json cannot serialize natively as a tagged object."""
+        if isinstance(value, pd.DataFrame):
+            if not value.columns.is_unique:
+                raise TypeError("Cannot cache a frame with duplicate columns")
+            return {"__frame__": {
+                "columns": value.columns.tolist(),
+                "dtypes": [str(dtype) for dtype in value.dtypes],
+                "data": [value[col].tolist() for col in value.columns],
+                "index": value.index.tolist(),
+                "index_dtype": str(value.index.dtype),
+                "index_name": value.index.name
+            }}
+        if isinstance(value, pd.Series):
+            return {"__series__": {
+                "data": value.tolist(),
+                "dtype": str(value.dtype),
+                "name": value.name,
+                "index": value.index.tolist(),
+                "index_dtype": str(value.index.dtype),
+                "index_name": value.index.name
+            }}
+        if isinstance(value, np.ndarray):
+            return {"__array__": {"data": value.tolist(), "dtype": str(value.dtype)}}
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, bytes):
+            return {"__bytes__": base64.b64encode(value).decode("ascii")}
+        raise TypeError(f"Cannot cache values of type {type(value).__name__}")
+
+    @staticmethod
+    def _decode(obj: Dict) -> Any:
+        """Rebuild a tagged object written by :meth:`_encode`."""
+        if len(obj) != 1:
+            return obj
+        tag, body = next(iter(obj.items()))
+        if tag == "__frame__":
+            index = pd.Index(body["index"], dtype=body["index_dtype"], name=body["index_name"])
+            return pd.DataFrame({
+                col: pd.Series(data, dtype=dtype, index=index)
+                for col, data, dtype in zip(body["columns"], body["data"], body["dtypes"])
+            }, index=index, columns=body["columns"])
+        if tag == "__series__":
+            index = pd.Index(body["index"], dtype=body["index_dtype"], name=body["index_name"])
+            return pd.Series(body["data"], dtype=body["dtype"], index=index, name=body["name"])
+        if tag == "__array__":
+            return np.array(body["data"], dtype=body["dtype"])
+        if tag == "__bytes__":
+            return base64.b64decode(body)
+        return obj
+
+    def _record(self, hit: bool):
+        """Update hit/miss counters (dashboards may call from several threads)."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
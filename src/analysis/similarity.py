@@ -0,0 +1,215 @@
+"""Nearest-neighbour similarity index over standardized country factors."""
+
+import logging
+from typing import List, Optional
+import pandas as pd
+import numpy as np
+from scipy.spatial import cKDTree
+
+from src.data.country_index import CountryIndex
+
+logger = logging.getLogger(__name__)
+
+
+class CountrySimilarityIndex:
+    """KD-tree over standardized factor vectors for similarity queries.
+
+    Factors are standardized with the means and standard deviations of the
+    data the index was built from; missing factors are imputed with the
+    mean (0 after standardization) so every country can be queried.
+    Revised or new countries go to a small brute-force buffer (revised
+    tree points are masked out) and the tree is rebuilt only when the
+    buffer exceeds ``rebuild_threshold``.
+    """
+
+    def __init__(self, names: List[str], values: np.ndarray, features: List[str],
+                 rebuild_threshold: int = 32):
+        """Initialize index from raw factor values.
+
+        Args:
+            names: Country name per row
+            values: Raw factor values, shape (countries, features), NaN for missing
+            features: Factor names
+            rebuild_threshold: Buffered updates allowed before the tree is rebuilt
+        """
+        values = np.asarray(values, dtype=float).reshape(len(names), len(features))
+        self.features = list(features)
+        self.rebuild_threshold = rebuild_threshold
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.nanmean(values, axis=0) if len(values) else np.zeros(len(features))
+            std = np.nanstd(values, axis=0) if len(values) else np.ones(len(features))
+        self.std = np.where((std > 0) & np.isfinite(std), std, 1.0)
+
+        self.names: List[str] = []
+        self.vectors = np.empty((0, len(features)))
+        self._positions = {}
+        self._add(names, self.standardize(values))
+        self.rebuild()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, country_col: str, features: List[str],
+                   **kwargs) -> "CountrySimilarityIndex":
+        """Build index from a DataFrame.
+
+        Args:
+            df: Data with one row per country
+            country_col: Country name column
+            features: Factor columns to compare on
+            **kwargs: Options passed to the constructor
+
+        Returns:
+            CountrySimilarityIndex over the frame's countries
+        """
+        return cls(df[country_col].astype(object).tolist(),
+                   df[features].to_numpy(dtype=float, na_value=np.nan), features, **kwargs)
+
+    def standardize(self, values: np.ndarray) -> np.ndarray:
+        """Standardize raw factor values with the index's scaling.
+
+        Args:
+            values: Raw values, shape (rows, features)
+
+        Returns:
+            Standardized values with missing entries imputed as 0
+        """
+        scaled = (np.asarray(values, dtype=float).reshape(-1, len(self.features)) - self.mean) / self.std
+        return np.nan_to_num(scaled, nan=0.0)
+
+    def rebuild(self):
+        """Rebuild the KD-tree over all current vectors."""
+        self._tree = cKDTree(self.vectors) if len(self.vectors) else None
+        self._tree_rows = np.arange(len(self.vectors))
+        self._stale = np.zeros(len(self.vectors), dtype=bool)
+        self._pending: List[int] = []
+        logger.debug(f"Built similarity tree over {len(self.vectors)} countries")
+
+    def update(self, names: List[str], values: np.ndarray):
+        """Insert new countries or revise existing ones.
+
+        Args:
+            names: Country names
+            values: Raw factor values, shape (len(names), features)
+        """
+        vectors = self.standardize(values)
+        new_names, new_vectors = [], []
+        for name, vector in zip(names, vectors):
+            pos = self._positions.get(CountryIndex.normalize(name))
+            if pos is None:
+                new_names.append(name)
+                new_vectors.append(vector)
+                continue
+            self.vectors[pos] = vector
+            if pos < len(self._stale):
+                self._stale[pos] = True
+            if pos not in self._pending:
+                self._pending.append(pos)
+
+        if new_names:
+            start = len(self.vectors)
+            self._add(new_names, np.array(new_vectors))
+            self._pending.extend(range(start, len(self.vectors)))
+
+        if len(self._pending) > self.rebuild_threshold:
+            self.rebuild()
+
+    def knn(self, country: str, k: int = 5) -> pd.DataFrame:
+        """Find the k countries most similar to a country.
+
+        Args:
+            country: Country name (case and whitespace insensitive)
+            k: Number of neighbours
+
+        Returns:
+            DataFrame with Country and Distance, nearest first
+
+        Raises:
+            KeyError: If the country is not indexed
+        """
+        pos = self._position(country)
+        return self.query_vector(self.vectors[pos], k, exclude=pos)
+
+    def radius(self, country: str, r: float) -> pd.DataFrame:
+        """Find all countries within a distance of a country.
+
+        Args:
+            country: Country name (case and whitespace insensitive)
+            r: Euclidean distance in standardized units
+
+        Returns:
+            DataFrame with Country and Distance, nearest first
+
+        Raises:
+            KeyError: If the country is not indexed
+        """
+        pos = self._position(country)
+        vector = self.vectors[pos]
+        rows = []
+        if self._tree is not None:
+            rows = [row for row in self._tree.query_ball_point(vector, r) if not self._stale[row]]
+        candidates = np.array(sorted(set(rows) | set(self._pending)), dtype=np.intp)
+        candidates = candidates[candidates != pos]
+        distances = np.linalg.norm(self.vectors[candidates] - vector, axis=1)
+        keep = distances <= r
+        return self._result(candidates[keep], distances[keep])
+
+    def query_vector(self, vector: np.ndarray, k: int = 5,
+                     exclude: Optional[int] = None) -> pd.DataFrame:
+        """Find the k countries nearest to a standardized vector.
+
+        Args:
+            vector: Standardized factor vector
+            k: Number of neighbours
+            exclude: Row position to leave out (e.g. the query country)
+
+        Returns:
+            DataFrame with Country and Distance, nearest first
+        """
+        candidates, distances = [], []
+        if self._tree is not None:
+            # Over-fetch to cover masked (revised) and excluded points
+            fetch = min(len(self._tree_rows), k + int(self._stale.sum()) + 1)
+            tree_dist, tree_rows = self._tree.query(vector, k=fetch)
+            tree_dist, tree_rows = np.atleast_1d(tree_dist), np.atleast_1d(tree_rows)
+            valid = ~self._stale[tree_rows]
+            candidates.append(tree_rows[valid])
+            distances.append(tree_dist[valid])
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.intp)
+            candidates.append(pending)
+            distances.append(np.linalg.norm(self.vectors[pending] - vector, axis=1))
+
+        candidates = np.concatenate(candidates) if candidates else np.array([], dtype=np.intp)
+        distances = np.concatenate(distances) if distances else np.array([])
+        if exclude is not None:
+            keep = candidates != exclude
+            candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")[:k]
+        return self._result(candidates[order], distances[order])
+
+    def __contains__(self, country: str) -> bool:
+        return CountryIndex.normalize(country) in self._positions
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _add(self, names: List[str], vectors: np.ndarray):
+        """Append countries and their vectors."""
+        for name in names:
+            self._positions[CountryIndex.normalize(name)] = len(self.names)
+            self.names.append(name)
+        self.vectors = np.vstack([self.vectors, vectors]) if len(vectors) else self.vectors
+
+    def _position(self, country: str) -> int:
+        """Row position of a country."""
+        try:
+            return self._positions[CountryIndex.normalize(country)]
+        except KeyError:
+            raise KeyError(f"{country} is not in the similarity index") from None
+
+    def _result(self, rows: np.ndarray, distances: np.ndarray) -> pd.DataFrame:
+        """Format neighbour rows as a DataFrame."""
+        order = np.argsort(distances, kind="stable")
+        return pd.DataFrame({
+            "Country": [self.names[row] for row in rows[order]],
+            "Distance": distances[order]
+        })
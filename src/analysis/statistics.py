@@ -0,0 +1,241 @@
+"""Incremental sufficient statistics for streaming correlation updates."""
+
+import logging
+from typing import List, Optional, Tuple, Union
+import pandas as pd
+import numpy as np
+
+from src.analysis.correlation import CorrelationEngine
+
+logger = logging.getLogger(__name__)
+
+
+class SufficientStatistics:
+    """Pairwise-complete counts, sums and cross products for k columns.
+
+    For every column pair (i, j) the store keeps the number of rows where
+    both are present, the sums of each over those rows, the sums of squares
+    and the sum of products. Adding, removing or revising rows costs
+    O(k²) per row, partitions merge by addition, and means, variances and
+    correlations are read off the matrices without touching the data.
+    Values are accumulated relative to a fixed shift (the first batch's
+    means) to avoid cancellation in the variance formulas.
+    """
+
+    def __init__(self, columns: List[str]):
+        """Initialize an empty store.
+
+        Args:
+            columns: Column names tracked by the store
+        """
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift: Optional[np.ndarray] = None
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Optional[List[str]] = None) -> "SufficientStatistics":
+        """Build a store from a DataFrame.
+
+        Args:
+            df: Data rows
+            columns: Columns to track (None = all numeric columns)
+
+        Returns:
+            Store holding all rows of df
+        """
+        if columns is None:
+            columns = list(df.select_dtypes(include=[np.number]).columns)
+        return cls(columns).add(df)
+
+    def add(self, rows: Union[pd.DataFrame, np.ndarray]) -> "SufficientStatistics":
+        """Add rows.
+
+        Args:
+            rows: DataFrame with the tracked columns, or array of shape (r, k)
+
+        Returns:
+            self, for chaining
+        """
+        values = self._values(rows)
+        if self.shift is None and len(values):
+            with np.errstate(invalid="ignore"):
+                counts = (~np.isnan(values)).sum(axis=0)
+                self.shift = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+        self._accumulate(values, 1.0)
+        return self
+
+    def remove(self, rows: Union[pd.DataFrame, np.ndarray]) -> "SufficientStatistics":
+        """Remove rows previously added.
+
+        Args:
+            rows: The exact rows (values) that were added
+
+        Returns:
+            self, for chaining
+
+        Raises:
+            ValueError: If more rows are removed than were added
+        """
+        values = self._values(rows)
+        self._check_removable(values)
+        self._accumulate(values, -1.0)
+        return self
+
+    def update(self, old_rows: Union[pd.DataFrame, np.ndarray],
+               new_rows: Union[pd.DataFrame, np.ndarray]) -> "SufficientStatistics":
+        """Replace previously added rows with revised values.
+
+        Both sets of rows are validated before anything is changed, so a
+        failed update leaves the store untouched.
+
+        Args:
+            old_rows: Rows as they were added
+            new_rows: Revised rows, aligned with old_rows
+
+        Returns:
+            self, for chaining
+
+        Raises:
+            ValueError: If either set lacks tracked columns, the row counts
+                differ, or the old rows were never added
+        """
+        old_values = self._values(old_rows)
+        new_values = self._values(new_rows)
+        if len(old_values) != len(new_values):
+            raise ValueError("Old and revised rows must have the same length")
+        self._check_removable(old_values)
+        self._accumulate(old_values, -1.0)
+        self._accumulate(new_values, 1.0)
+        return self
+
+    def merge(self, other: "SufficientStatistics") -> "SufficientStatistics":
+        """Merge a store built over another partition of rows.
+
+        Args:
+            other: Store over the same columns
+
+        Returns:
+            self, for chaining
+        """
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge statistics over different columns")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+
+        # Re-express the other partition's sums relative to this shift
+        d = other.shift - self.shift
+        self.sxy += (other.sxy + d[:, None] * other.sx.T + d[None, :] * other.sx
+                     + other.n * d[:, None] * d[None, :])
+        self.sxx += other.sxx + 2 * d[:, None] * other.sx + other.n * d[:, None] ** 2
+        self.sx += other.sx + other.n * d[:, None]
+        self.n += other.n
+        return self
+
+    @property
+    def count(self) -> pd.Series:
+        """Non-missing values per column."""
+        return pd.Series(np.diag(self.n).astype(np.int64), index=self.columns)
+
+    def means(self) -> pd.Series:
+        """Get column means.
+
+        Returns:
+            Series of means (NaN for empty columns)
+        """
+        n = np.diag(self.n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.diag(self.sx) / n + self._shift()
+        return pd.Series(np.where(n > 0, means, np.nan), index=self.columns)
+
+    def variances(self) -> pd.Series:
+        """Get sample variances (ddof=1).
+
+        Returns:
+            Series of variances (NaN with fewer than 2 values)
+        """
+        return pd.Series(np.diag(self.covariance().to_numpy()), index=self.columns)
+
+    def covariance(self) -> pd.DataFrame:
+        """Get the pairwise-complete sample covariance matrix.
+
+        Returns:
+            Square DataFrame of covariances
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self.sxy - self.sx * self.sx.T / self.n) / (self.n - 1)
+        cov[self.n < 2] = np.nan
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        """Get the pairwise-complete Pearson correlation matrix.
+
+        Returns:
+            Square DataFrame of correlations (as DataFrame.corr would give)
+        """
+        return pd.DataFrame(self._correlation(), index=self.columns, columns=self.columns)
+
+    def correlation_with(self, target: str) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """Correlate one column with every other tracked column.
+
+        Args:
+            target: Target column name
+
+        Returns:
+            Tuple of (correlations, p-values, pairwise sample sizes) Series
+            indexed by the other columns
+        """
+        i = self.columns.index(target)
+        others = [j for j in range(len(self.columns)) if j != i]
+        names = [self.columns[j] for j in others]
+        r = self._correlation()[i, others]
+        n = self.n[i, others]
+        return (pd.Series(r, index=names), pd.Series(CorrelationEngine.p_values(r, n), index=names),
+                pd.Series(n.astype(np.int64), index=names))
+
+    def _correlation(self) -> np.ndarray:
+        """Pairwise-complete correlation array."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self.sxy - self.sx * self.sx.T / self.n
+            var_x = self.sxx - self.sx ** 2 / self.n
+            var_y = self.sxx.T - self.sx.T ** 2 / self.n
+            r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        r[self.n < 2] = np.nan
+        return r
+
+    def _shift(self) -> np.ndarray:
+        """Current shift (zeros before any rows are added)."""
+        return self.shift if self.shift is not None else np.zeros(len(self.columns))
+
+    def _values(self, rows: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Convert rows to a float array over the tracked columns."""
+        if isinstance(rows, pd.DataFrame):
+            missing = [col for col in self.columns if col not in rows.columns]
+            if missing:
+                raise ValueError(f"Rows are missing tracked columns: {missing}")
+            rows = rows[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        return np.asarray(rows, dtype=float).reshape(-1, len(self.columns))
+
+    def _check_removable(self, values: np.ndarray):
+        """Raise if removing rows would leave negative pair counts."""
+        present = (~np.isnan(values)).astype(float)
+        if np.any(present.T @ present > self.n + 0.5):
+            raise ValueError("Cannot remove rows that were never added")
+
+    def _accumulate(self, values: np.ndarray, sign: float):
+        """Add (sign=1) or subtract (sign=-1) rows from the sums."""
+        if len(values) == 0:
+            return
+        present = ~np.isnan(values)
+        mask = present.astype(float)
+        shifted = np.where(present, values - self._shift(), 0.0)
+
+        self.n += sign * (mask.T @ mask)
+        self.sx += sign * (shifted.T @ mask)
+        self.sxx += sign * ((shifted * shifted).T @ mask)
+        self.sxy += sign * (shifted.T @ shifted)
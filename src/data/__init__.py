@@ -1,3 +1,4 @@
 """Data loading and processing module."""
 
-__all__ = ["DataLoader", "DataCleaner"]
+__all__ = ["DataLoader", "DataCleaner", "ColumnarCache", "CountryIndex", "DataProfiler",
+           "HyperLogLog", "KLLSketch", "BloomFilter"]
@@ -0,0 +1,308 @@
+"""Columnar on-disk cache for parsed CSV datasets."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnarCache:
+    """Store parsed DataFrames as typed NumPy columns keyed by a file fingerprint.
+
+    Each cache entry is a directory holding one ``.npy`` file per column plus a
+    ``meta.json`` manifest. String columns are dictionary encoded (integer codes
+    plus a unicode category array), so warm loads never touch the CSV parser and
+    never need pickle.
+    """
+
+    FORMAT_VERSION = 1
+    HASH_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        """Initialize cache rooted at a directory.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+        """
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fingerprint(cls, path: Union[str, Path], variant: str = "") -> str:
+        """Compute cache key from file path, size, mtime and content hash.
+
+        Args:
+            path: Source file path
+            variant: Extra string mixed into the key (e.g. parse options)
+
+        Returns:
+            Hex digest identifying this exact version of the file
+        """
+        path = Path(path)
+        stat = path.stat()
+        content = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(cls.HASH_BLOCK_SIZE), b""):
+                content.update(block)
+
+        key = hashlib.blake2b(digest_size=16)
+        key.update(
+            f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|"
+            f"{content.hexdigest()}|{variant}|v{cls.FORMAT_VERSION}".encode("utf-8")
+        )
+        return key.hexdigest()
+
+    def entry_path(self, path: Union[str, Path], key: str) -> Path:
+        """Get the cache entry directory for a source file and key.
+
+        Args:
+            path: Source file path
+            key: Fingerprint from :meth:`fingerprint`
+
+        Returns:
+            Path of the cache entry directory
+        """
+        return self.cache_dir / f"{Path(path).stem}-{key[:16]}"
+
+    def load(self, path: Union[str, Path], key: str,
+             filters: Optional[Dict[str, Callable[[pd.Series], np.ndarray]]] = None) -> Optional[pd.DataFrame]:
+        """Load a cached DataFrame if a valid entry exists.
+
+        With ``filters``, only the filter columns are read in full. Each
+        predicate receives the column (for dictionary-encoded columns only the
+        distinct values) and returns a boolean mask; the remaining columns are
+        memory-mapped and only the matching rows are materialized.
+
+        Args:
+            path: Source file path
+            key: Fingerprint from :meth:`fingerprint`
+            filters: Optional mapping of column name to row predicate
+
+        Returns:
+            Cached DataFrame, or None on a cache miss
+        """
+        entry = self.entry_path(path, key)
+        meta = self._read_meta(entry, key)
+        if meta is None:
+            self._record(hit=False)
+            return None
+
+        try:
+            rows = None
+            if filters:
+                by_name = {col["name"]: col for col in meta["columns"]}
+                mask = np.ones(meta["rows"], dtype=bool)
+                for name, predicate in filters.items():
+                    mask &= self._column_mask(entry, by_name[name], predicate)
+                rows = np.flatnonzero(mask)
+            data = {col["name"]: self._load_column(entry, col, rows) for col in meta["columns"]}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable cache entry {entry}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            self._record(hit=False)
+            return None
+
+        self._record(hit=True)
+        return pd.DataFrame(data, columns=[col["name"] for col in meta["columns"]])
+
+    def store(self, path: Union[str, Path], df: pd.DataFrame, key: str,
+              variant: str = "") -> bool:
+        """Write a DataFrame to the cache.
+
+        Replaces entries for older versions of the same source file and
+        variant; entries of other variants are kept.
+
+        Args:
+            path: Source file path the frame was parsed from
+            df: Parsed DataFrame
+            key: Fingerprint from :meth:`fingerprint`
+            variant: Variant the key was computed with
+
+        Returns:
+            True if the entry was written, False if the frame is not cacheable
+        """
+        if not df.columns.is_unique or not isinstance(df.index, pd.RangeIndex):
+            logger.debug(f"Frame from {path} has no cacheable layout, skipping cache")
+            return False
+
+        entry = self.entry_path(path, key)
+        tmp = entry.with_name(f".{entry.name}.tmp-{os.getpid()}")
+
+        try:
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            columns = []
+            for i, name in enumerate(df.columns):
+                col_meta = self._store_column(tmp, f"col{i}", df[name])
+                if col_meta is None:
+                    logger.debug(f"Column {name!r} of {path} is not cacheable, skipping cache")
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    return False
+                col_meta["name"] = str(name)
+                columns.append(col_meta)
+
+            meta = {
+                "version": self.FORMAT_VERSION,
+                "key": key,
+                "source": str(path),
+                "variant": variant,
+                "rows": len(df),
+                "columns": columns
+            }
+            (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+            self._evict_stale(path, variant, keep=entry.name)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {path}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+
+        logger.info(f"Cached {len(df)} rows from {Path(path).name} in {entry}")
+        return True
+
+    def read_columns(self, path: Union[str, Path], key: str) -> Optional[List[str]]:
+        """Get the column names of a cached entry without loading it.
+
+        Args:
+            path: Source file path
+            key: Fingerprint from :meth:`fingerprint`
+
+        Returns:
+            List of column names, or None if no valid entry exists
+        """
+        meta = self._read_meta(self.entry_path(path, key), key)
+        return [col["name"] for col in meta["columns"]] if meta is not None else None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit/miss counters.
+
+        Returns:
+            Dictionary with hit and miss counts
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _record(self, hit: bool):
+        """Update hit/miss counters (loads may run on several threads)."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _read_meta(self, entry: Path, key: str) -> Optional[Dict]:
+        """Read and validate an entry manifest."""
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != self.FORMAT_VERSION or meta.get("key") != key:
+            return None
+        return meta
+
+    def _evict_stale(self, path: Union[str, Path], variant: str, keep: str):
+        """Remove entries for older versions of the same source file and variant."""
+        if not self.cache_dir.exists():
+            return
+        for old in self.cache_dir.glob(f"{Path(path).stem}-*"):
+            if old.name == keep or not old.is_dir():
+                continue
+            try:
+                meta = json.loads((old / "meta.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if meta.get("source") == str(path) and meta.get("variant") == variant:
+                shutil.rmtree(old, ignore_errors=True)
+
+    @staticmethod
+    def _store_column(entry: Path, stem: str, series: pd.Series) -> Optional[Dict]:
+        """Write one column and return its manifest record (None if unsupported)."""
+        dtype = series.dtype
+
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = ColumnarCache._encode_values(dtype.categories)
+            if categories is None:
+                return None
+            np.save(entry / f"{stem}.codes.npy", series.cat.codes.to_numpy())
+            np.save(entry / f"{stem}.categories.npy", categories)
+            return {"kind": "category", "file": stem, "ordered": bool(dtype.ordered)}
+
+        if dtype == object:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            categories = ColumnarCache._encode_values(uniques)
+            if categories is None:
+                return None
+            np.save(entry / f"{stem}.codes.npy", codes.astype(np.int32))
+            np.save(entry / f"{stem}.categories.npy", categories)
+            return {"kind": "object", "file": stem}
+
+        if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+            np.save(entry / f"{stem}.npy", series.to_numpy())
+            return {"kind": "array", "file": stem}
+
+        return None
+
+    @staticmethod
+    def _encode_values(values) -> Optional[np.ndarray]:
+        """Convert category values to a pickle-free NumPy array."""
+        values = pd.Index(values)
+        if values.dtype == object:
+            if not all(isinstance(v, str) for v in values):
+                return None
+            return values.to_numpy(dtype=str) if len(values) else np.array([], dtype="U1")
+        if isinstance(values.dtype, np.dtype):
+            return values.to_numpy()
+        return None
+
+    @staticmethod
+    def _column_mask(entry: Path, col: Dict, predicate: Callable[[pd.Series], np.ndarray]) -> np.ndarray:
+        """Evaluate a row predicate on one cached column."""
+        stem = col["file"]
+        if col["kind"] == "array":
+            return np.asarray(predicate(pd.Series(np.load(entry / f"{stem}.npy"))), dtype=bool)
+
+        # Dictionary-encoded: evaluate once per distinct value, then map codes
+        categories = np.load(entry / f"{stem}.categories.npy")
+        if categories.dtype.kind == "U":
+            categories = categories.astype(object)
+        matches = np.append(np.asarray(predicate(pd.Series(categories)), dtype=bool), False)
+        codes = np.load(entry / f"{stem}.codes.npy", mmap_mode="r")
+        return matches[np.where(codes < 0, len(categories), codes)]
+
+    @staticmethod
+    def _load_column(entry: Path, col: Dict, rows: Optional[np.ndarray] = None) -> pd.Series:
+        """Read one column (optionally a subset of rows) from its ``.npy`` files."""
+        stem = col["file"]
+        mmap_mode = "r" if rows is not None else None
+        if col["kind"] == "array":
+            values = np.load(entry / f"{stem}.npy", mmap_mode=mmap_mode)
+            return pd.Series(np.array(values[rows]) if rows is not None else values)
+
+        codes = np.load(entry / f"{stem}.codes.npy", mmap_mode=mmap_mode)
+        if rows is not None:
+            codes = np.array(codes[rows])
+        categories = np.load(entry / f"{stem}.categories.npy")
+        if categories.dtype.kind == "U":
+            categories = categories.astype(object)
+
+        if col["kind"] == "category":
+            return pd.Series(pd.Categorical.from_codes(codes, categories, ordered=col["ordered"]))
+
+        values = np.empty(len(codes), dtype=object)
+        values[:] = categories.take(codes, mode="clip") if len(categories) else np.nan
+        values[codes < 0] = np.nan
+        return pd.Series(values, dtype=object)
@@ -1,10 +1,12 @@
 """Data cleaning and preprocessing module."""
 
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
 
+from src.data.country_index import CountryIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +20,9 @@ class DataCleaner:
         "Republic of Ireland": "Ireland"
     }
     
+    # FAO element averaged into AvgFoodSupply
+    FOOD_SUPPLY_ELEMENT = "Food supply (kcal/capita/day)"
+    
     @staticmethod
     def clean_whr_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean World Happiness Report data.
@@ -38,13 +43,15 @@ class DataCleaner:
         # Remove duplicates keeping first occurrence
         df = df.drop_duplicates(subset=["Country name"], keep="first")
         
-        # Convert numeric columns
+        # Convert numeric columns stored as text, leaving genuine text columns
         numeric_cols = df.select_dtypes(include=["object"]).columns
         for col in numeric_cols:
             try:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+                converted = pd.to_numeric(df[col], errors="coerce")
             except Exception:
-                pass
+                continue
+            if converted.notna().sum() == df[col].notna().sum():
+                df[col] = converted
         
         logger.info(f"Cleaned WHR data: {len(df)} rows")
         return df
@@ -61,15 +68,11 @@ class DataCleaner:
         """
         df = df.copy()
         
-        # Find and standardize country/area column
-        area_col = None
-        for col in df.columns:
-            if "Area" in col or "Country" in col.lower():
-                area_col = col
-                break
+        # Find and standardize country/area column (the name, not "Area Code")
+        area_col = CountryIndex.find_column(df)
         
         if area_col:
-            df[area_col] = df[area_col].str.strip()
+            df[area_col] = DataCleaner._strip_text(df[area_col])
         
         # Remove rows with missing critical values
         critical_cols = [col for col in df.columns if "Value" in col or "value" in col]
@@ -83,6 +86,94 @@ class DataCleaner:
         logger.info(f"Cleaned food data: {len(df)} rows")
         return df
     
+    @staticmethod
+    def clean_food_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Clean streamed food data chunk by chunk.
+        
+        Args:
+            chunks: Iterable of raw food data chunks (e.g. DataLoader.iter_food_data())
+            
+        Yields:
+            Cleaned food data chunks
+        """
+        for chunk in chunks:
+            yield DataCleaner.clean_food_data(chunk)
+    
+    @staticmethod
+    def aggregate_food_supply(food: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                              year: Optional[int] = None,
+                              element: Optional[str] = FOOD_SUPPLY_ELEMENT) -> Optional[pd.DataFrame]:
+        """Compute mean food supply value per area.
+        
+        FAO exports mix elements with different units (kcal, g, tonnes), so
+        only rows of one element are averaged.
+        
+        Accepts a whole DataFrame or an iterable of chunks. Each chunk is reduced
+        to per-area sums and counts which are merged into a running total, so
+        memory stays bounded by the number of areas rather than the input size.
+        
+        Args:
+            food: Cleaned food DataFrame or iterable of cleaned chunks
+            year: Optional year to filter food data
+            element: Element to average when the data has an Element column
+                (None = all rows)
+            
+        Returns:
+            DataFrame with area column and "AvgFoodSupply", or None if the
+            area/value columns cannot be identified
+        """
+        chunks = [food] if isinstance(food, pd.DataFrame) else food
+        
+        area_col = None
+        totals = None
+        
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            
+            if year:
+                year_col = "Year" if "Year" in chunk.columns else next(
+                    (col for col in chunk.columns if "Year" in col), None)
+                if year_col:
+                    chunk = chunk[chunk[year_col] == year]
+            
+            if element and "Element" in chunk.columns:
+                chunk = chunk[chunk["Element"] == element]
+            
+            area_col = CountryIndex.find_column(chunk)
+            value_col = next((col for col in chunk.columns if "Value" in col), None)
+            if not area_col or not value_col:
+                return None
+            
+            partial = chunk.groupby(area_col, observed=True)[value_col].agg(["sum", "count"])
+            totals = partial if totals is None else totals.add(partial, fill_value=0)
+        
+        if totals is None:
+            return None
+        
+        totals = totals[totals["count"] > 0]
+        food_agg = (totals["sum"] / totals["count"]).reset_index()
+        food_agg[area_col] = food_agg[area_col].astype(object)
+        food_agg.columns = [area_col, "AvgFoodSupply"]
+        return food_agg
+    
+    @staticmethod
+    def _strip_text(series: pd.Series) -> pd.Series:
+        """Strip whitespace from a text column, preserving categorical encoding.
+        
+        Args:
+            series: Object or categorical string column
+            
+        Returns:
+            Stripped column with the same dtype family
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            stripped = series.cat.categories.astype(str).str.strip()
+            if stripped.is_unique:
+                return series.cat.rename_categories(stripped)
+            return series.astype(object).str.strip().astype("category")
+        return series.str.strip()
+    
     @staticmethod
     def handle_missing_values(df: pd.DataFrame, strategy: str = "mean") -> pd.DataFrame:
         """Handle missing values in dataset.
@@ -164,14 +255,16 @@ class DataCleaner:
     
     @staticmethod
     def get_correlation_ready_data(whr_df: pd.DataFrame, 
-                                   food_df: Optional[pd.DataFrame] = None,
-                                   year: Optional[int] = None) -> Tuple[pd.DataFrame, List[str]]:
+                                   food_df: Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]] = None,
+                                   year: Optional[int] = None,
+                                   element: Optional[str] = FOOD_SUPPLY_ELEMENT) -> Tuple[pd.DataFrame, List[str]]:
         """Prepare data for correlation analysis.
         
         Args:
             whr_df: Cleaned WHR data
-            food_df: Optional cleaned food data
+            food_df: Optional cleaned food data, whole or as an iterable of chunks
             year: Optional year to filter food data
+            element: Food element averaged into "AvgFoodSupply" (None = all rows)
             
         Returns:
             Tuple of (correlation-ready DataFrame, list of factor columns)
@@ -183,32 +276,14 @@ class DataCleaner:
                             ["Country name", "Year", "Regional indicator"]]
         
         # Add food data if available
-        if food_df is not None and len(food_df) > 0:
-            if year:
-                year_col = None
-                for col in food_df.columns:
-                    if "Year" in col:
-                        year_col = col
-                        break
-                if year_col:
-                    food_df = food_df[food_df[year_col] == year]
-            
-            # Aggregate food data
-            area_col = None
-            for col in food_df.columns:
-                if "Area" in col or "Country" in col.lower():
-                    area_col = col
-                    break
+        if food_df is not None:
+            food_agg = DataCleaner.aggregate_food_supply(food_df, year=year, element=element)
             
-            if area_col:
-                value_col = None
-                for col in food_df.columns:
-                    if "Value" in col:
-                        value_col = col
-                        break
-                
-                if value_col and area_col:
-                    food_agg = food_df.groupby(area_col)[value_col].mean().reset_index()
-                    food_agg.columns = [area_col, "AvgFoodSupply"]
+            if food_agg is not None and "Country name" in df.columns:
+                area_col = food_agg.columns[0]
+                food_agg = food_agg.rename(columns={area_col: "Country name"})
+                df = df.merge(food_agg, on="Country name", how="left")
+                if df["AvgFoodSupply"].notna().any():
+                    happiness_factors.append("AvgFoodSupply")
         
         return df, happiness_factors
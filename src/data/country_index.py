@@ -0,0 +1,173 @@
+"""Hashed country index for constant-time country lookups."""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Union
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CountryIndex:
+    """Map normalized country names to row positions in a dataset.
+
+    Built once per dataset, after which every country filter is a dictionary
+    lookup plus a positional ``take`` instead of a full-column string scan.
+    Names are matched case-insensitively with surrounding and repeated
+    whitespace ignored.
+    """
+
+    # Country column names in order of preference
+    COLUMN_NAMES = ["Country name", "Country", "Area", "CountryName", "Country_abr"]
+
+    def __init__(self, positions: Dict[str, np.ndarray], n_rows: int):
+        """Initialize index from precomputed positions.
+
+        Args:
+            positions: Mapping of normalized country key to sorted row positions
+            n_rows: Number of rows in the indexed dataset
+        """
+        self._positions = positions
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_series(cls, values: pd.Series) -> "CountryIndex":
+        """Build index from a country column.
+
+        Args:
+            values: Country name column (object or categorical)
+
+        Returns:
+            CountryIndex over the column's row positions
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Normalize each category once, then map row codes through it
+            cat_keys = cls.normalize_series(pd.Series(values.cat.categories, dtype=object))
+            key_codes, keys = pd.factorize(cat_keys, use_na_sentinel=True)
+            codes = values.cat.codes.to_numpy()
+            codes = np.where(codes >= 0, np.append(key_codes, -1)[codes], -1)
+        else:
+            codes, keys = pd.factorize(cls.normalize_series(values), use_na_sentinel=True)
+
+        valid = np.flatnonzero(codes >= 0)
+        order = valid[np.argsort(codes[valid], kind="stable")]
+        counts = np.bincount(codes[valid], minlength=len(keys))
+        groups = np.split(order, np.cumsum(counts)[:-1]) if len(keys) else []
+
+        positions = {key: group for key, group in zip(keys, groups) if len(group)}
+        logger.debug(f"Built country index with {len(positions)} keys over {len(values)} rows")
+        return cls(positions, len(values))
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Normalize a single country name to its index key.
+
+        Args:
+            name: Country name
+
+        Returns:
+            Normalized key
+        """
+        return " ".join(str(name).split()).casefold()
+
+    @staticmethod
+    def normalize_series(values: pd.Series) -> pd.Series:
+        """Normalize a column of country names to index keys.
+
+        Args:
+            values: Series of country names (non-string values are converted
+                to their string form)
+
+        Returns:
+            Series of normalized keys (missing values stay missing)
+        """
+        text = values.astype(object)
+        if pd.api.types.infer_dtype(text, skipna=True) not in ("string", "empty"):
+            present = text.notna()
+            text = text.copy()
+            text[present] = text[present].map(str)
+        return (text.str.strip()
+                .str.replace(r"\s+", " ", regex=True).str.casefold())
+
+    @classmethod
+    def find_column(cls, df: pd.DataFrame) -> Optional[str]:
+        """Find the country name column of a dataset.
+
+        Exact names ("Country name", "Country", "Area", ...) win over
+        substring matches, and numeric or code columns (e.g. the FAO
+        "Area Code") are never chosen.
+
+        Args:
+            df: DataFrame to search (only column names and dtypes are used)
+
+        Returns:
+            Column name, or None if no column looks like country names
+        """
+        candidates = [col for col, dtype in df.dtypes.items()
+                      if not pd.api.types.is_numeric_dtype(dtype)
+                      and not str(col).strip().lower().endswith("code")]
+        keys = {str(col).strip().lower(): col for col in reversed(candidates)}
+        for name in cls.COLUMN_NAMES:
+            if name.lower() in keys:
+                return keys[name.lower()]
+        for col in candidates:
+            if any(name.lower() in str(col).lower() for name in ("Country", "Area")):
+                return col
+        return None
+
+    def positions(self, countries: Union[str, Iterable[str]]) -> np.ndarray:
+        """Get row positions for one or more countries.
+
+        Args:
+            countries: Country name or iterable of names
+
+        Returns:
+            Sorted array of row positions (empty if none match)
+        """
+        if isinstance(countries, str):
+            return self._positions.get(self.normalize(countries), np.array([], dtype=np.intp))
+
+        found = [self._positions[key] for key in dict.fromkeys(self.normalize(c) for c in countries)
+                 if key in self._positions]
+        if not found:
+            return np.array([], dtype=np.intp)
+        return np.sort(np.concatenate(found)) if len(found) > 1 else found[0]
+
+    def take(self, df: pd.DataFrame, countries: Union[str, Iterable[str]]) -> pd.DataFrame:
+        """Select the rows of an indexed DataFrame for given countries.
+
+        Args:
+            df: DataFrame this index was built from
+            countries: Country name or iterable of names
+
+        Returns:
+            Rows of df for the countries, in original order
+        """
+        return df.take(self.positions(countries))
+
+    def mask(self, countries: Union[str, Iterable[str]]) -> np.ndarray:
+        """Get a boolean row mask for given countries.
+
+        Args:
+            countries: Country name or iterable of names
+
+        Returns:
+            Boolean array of length n_rows
+        """
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.positions(countries)] = True
+        return mask
+
+    def keys(self) -> List[str]:
+        """Get all normalized country keys.
+
+        Returns:
+            List of keys
+        """
+        return list(self._positions)
+
+    def __contains__(self, country: str) -> bool:
+        return self.normalize(country) in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
@@ -1,30 +1,147 @@
 """Data loading module for happiness analysis."""
 
 import os
+import re
+import time
 import logging
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional, Union
 import pandas as pd
 import numpy as np
 
+from src.data.cache import ColumnarCache
+from src.data.country_index import CountryIndex
+from src.data.profiler import DataProfiler
+
 logger = logging.getLogger(__name__)
 
 
 class DataLoader:
     """Robust data loader for happiness and food consumption datasets."""
     
-    def __init__(self, data_dir: str = "data"):
+    # Declared per-dataset schemas. Column names are matched after stripping
+    # whitespace; columns missing from a file are ignored. Integer columns that
+    # contain missing values fall back to float32.
+    SCHEMAS = {
+        "WHR2024": {
+            "encoding": "utf-8-sig",
+            "dtypes": {
+                "Country name": "object",
+                "Regional indicator": "category",
+                "Ladder score": "float64",
+                "upperwhisker": "float64",
+                "lowerwhisker": "float64",
+                "Explained by: Log GDP per capita": "float64",
+                "Explained by: Social support": "float64",
+                "Explained by: Healthy life expectancy": "float64",
+                "Explained by: Freedom to make life choices": "float64",
+                "Explained by: Generosity": "float64",
+                "Explained by: Perceptions of corruption": "float64",
+                "Dystopia + residual": "float64"
+            }
+        },
+        "EdibleFoods": {
+            "encoding": "utf-8-sig",
+            "dtypes": {
+                "Area Code": "int32",
+                "Area": "category",
+                "Item Code": "int32",
+                "Item": "category",
+                "Element Code": "int32",
+                "Element": "category",
+                "Unit": "category",
+                "Flag": "category",
+                "Year Code": "int16",
+                "Year": "int16",
+                "Value": "float32"
+            }
+        }
+    }
+    
+    # Column names used by other WHR releases, mapped to WHR2024 names.
+    # Keys are matched case-insensitively after stripping whitespace.
+    WHR_COLUMN_ALIASES = {
+        "country": "Country name",
+        "country or region": "Country name",
+        "region": "Regional indicator",
+        "year": "Year",
+        "happiness score": "Ladder score",
+        "score": "Ladder score",
+        "life ladder": "Ladder score",
+        "whisker-high": "upperwhisker",
+        "whisker-low": "lowerwhisker",
+        "upper confidence interval": "upperwhisker",
+        "lower confidence interval": "lowerwhisker",
+        "economy (gdp per capita)": "Explained by: Log GDP per capita",
+        "gdp per capita": "Explained by: Log GDP per capita",
+        "explained by: gdp per capita": "Explained by: Log GDP per capita",
+        "family": "Explained by: Social support",
+        "social support": "Explained by: Social support",
+        "health (life expectancy)": "Explained by: Healthy life expectancy",
+        "healthy life expectancy": "Explained by: Healthy life expectancy",
+        "freedom": "Explained by: Freedom to make life choices",
+        "freedom to make life choices": "Explained by: Freedom to make life choices",
+        "generosity": "Explained by: Generosity",
+        "trust (government corruption)": "Explained by: Perceptions of corruption",
+        "perceptions of corruption": "Explained by: Perceptions of corruption",
+        "dystopia residual": "Dystopia + residual"
+    }
+    
+    # Supported CSV parse engines; "auto" prefers multithreaded pyarrow
+    ENGINES = ("auto", "c", "pyarrow", "python")
+    DTYPE_BACKENDS = (None, "numpy_nullable", "pyarrow")
+    
+    def __init__(self, data_dir: str = "data", use_cache: bool = True,
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 use_schema: bool = True,
+                 engine: str = "c",
+                 dtype_backend: Optional[str] = None):
         """Initialize DataLoader with data directory path.
         
         Args:
             data_dir: Path to data directory containing CSV files
+            use_cache: Whether to use the columnar on-disk cache for parsed CSVs
+            cache_dir: Cache location (defaults to ``<data_dir>/.cache``)
+            use_schema: Whether to apply the declared dtypes in SCHEMAS
+            engine: CSV parse engine for full loads: "c", "pyarrow"
+                (multithreaded, requires pyarrow), "python" or "auto"
+            dtype_backend: Optional pandas dtype backend, e.g. "pyarrow" for
+                Arrow-backed columns
+            
+        Raises:
+            ValueError: If engine or dtype_backend is not supported
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {self.ENGINES}")
+        if dtype_backend not in self.DTYPE_BACKENDS:
+            raise ValueError(f"Unknown dtype_backend {dtype_backend!r}, expected one of {self.DTYPE_BACKENDS}")
+        
+        pyarrow_available = importlib.util.find_spec("pyarrow") is not None
+        if dtype_backend == "pyarrow" and not pyarrow_available:
+            logger.warning("pyarrow is not installed, using NumPy-backed dtypes")
+            dtype_backend = None
+        if engine == "auto":
+            engine = "pyarrow" if pyarrow_available else "c"
+        
         self.data_dir = Path(data_dir)
+        self.use_schema = use_schema
+        self.engine = engine
+        self.dtype_backend = dtype_backend
         self.whr_path = self.data_dir / "WHR2024.csv"
         self.food_path = self.data_dir / "EdibleFoods-1961-2011.csv"
         
+        self.cache: Optional[ColumnarCache] = None
+        if use_cache:
+            self.cache = ColumnarCache(cache_dir if cache_dir is not None else self.data_dir / ".cache")
+        self.load_stats: Dict[str, Dict] = {}
+        
         self.whr_data: Optional[pd.DataFrame] = None
+        self.whr_panel: Optional[pd.DataFrame] = None
         self.food_data: Optional[pd.DataFrame] = None
+        self.whr_index: Optional[CountryIndex] = None
+        self.food_index: Optional[CountryIndex] = None
         self.finland_whr: Optional[pd.DataFrame] = None
         self.finland_food: Optional[pd.DataFrame] = None
     
@@ -58,7 +175,7 @@ class DataLoader:
             raise FileNotFoundError(f"WHR2024.csv not found at {self.whr_path}")
         
         logger.info(f"Loading WHR2024.csv from {self.whr_path}")
-        self.whr_data = pd.read_csv(self.whr_path)
+        self.whr_data = self._read_csv(self.whr_path, "WHR2024")
         
         logger.info(f"Loaded {len(self.whr_data)} countries from WHR2024.csv")
         logger.info(f"Columns: {self.whr_data.columns.tolist()}")
@@ -67,8 +184,7 @@ class DataLoader:
         if self.whr_data.empty:
             raise ValueError("WHR2024.csv is empty")
         
-        # Standardize column names
-        self.whr_data.columns = self.whr_data.columns.str.strip()
+        self.whr_index = CountryIndex.from_series(self.whr_data[self._find_country_column(self.whr_data)])
         
         return self.whr_data
     
@@ -86,7 +202,7 @@ class DataLoader:
             raise FileNotFoundError(f"EdibleFoods-1961-2011.csv not found at {self.food_path}")
         
         logger.info(f"Loading EdibleFoods-1961-2011.csv from {self.food_path}")
-        self.food_data = pd.read_csv(self.food_path)
+        self.food_data = self._read_csv(self.food_path, "EdibleFoods")
         
         logger.info(f"Loaded {len(self.food_data)} records from EdibleFoods")
         logger.info(f"Columns: {self.food_data.columns.tolist()}")
@@ -95,11 +211,168 @@ class DataLoader:
         if self.food_data.empty:
             raise ValueError("EdibleFoods-1961-2011.csv is empty")
         
-        # Standardize column names
-        self.food_data.columns = self.food_data.columns.str.strip()
+        self.food_index = CountryIndex.from_series(self.food_data[self._find_country_column(self.food_data)])
         
         return self.food_data
     
+    def iter_food_data(self, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Stream Food Supply data in fixed-size chunks.
+        
+        Only one chunk is held in memory at a time, so arbitrarily large FAO
+        extracts can be processed with bounded peak memory. Chunks are read
+        straight from the CSV and bypass the columnar cache.
+        
+        Args:
+            chunksize: Number of rows per chunk
+            
+        Yields:
+            Food data DataFrame chunks with standardized column names
+            
+        Raises:
+            FileNotFoundError: If EdibleFoods CSV not found
+            ValueError: If chunksize is not positive
+        """
+        if not self.food_path.exists():
+            raise FileNotFoundError(f"EdibleFoods-1961-2011.csv not found at {self.food_path}")
+        if chunksize <= 0:
+            raise ValueError("chunksize must be positive")
+        
+        logger.info(f"Streaming EdibleFoods-1961-2011.csv from {self.food_path} in chunks of {chunksize}")
+        yield from self._iter_csv(self.food_path, "EdibleFoods", chunksize)
+    
+    def load_filtered(self, dataset: str,
+                      countries: Optional[List[str]] = None,
+                      years: Optional[Tuple[Optional[int], Optional[int]]] = None,
+                      chunksize: int = 100_000) -> pd.DataFrame:
+        """Load only the rows of a dataset matching countries and years.
+        
+        Filters are applied while reading so non-matching rows are never
+        materialized: a warm columnar cache entry is filtered on its country
+        and year columns before the other columns are read, otherwise the CSV
+        is streamed and each chunk is filtered before being kept. Country
+        names match case-insensitively after whitespace normalization.
+        
+        Args:
+            dataset: Dataset name, "WHR2024" or "EdibleFoods"
+            countries: Country/area names to keep (None = all)
+            years: Inclusive (start, end) year range; either bound may be None
+            chunksize: Rows per chunk when streaming the CSV
+            
+        Returns:
+            Filtered DataFrame
+            
+        Raises:
+            ValueError: If dataset is unknown or a country or year filter is
+                given for a dataset without such a column
+            FileNotFoundError: If the dataset file is missing
+        """
+        paths = {"WHR2024": self.whr_path, "EdibleFoods": self.food_path}
+        if dataset not in paths:
+            raise ValueError(f"Unknown dataset {dataset!r}, expected one of {list(paths)}")
+        path = paths[dataset]
+        if not path.exists():
+            raise FileNotFoundError(f"{path.name} not found at {path}")
+        
+        start = time.perf_counter()
+        wanted = None
+        if countries is not None:
+            wanted = {CountryIndex.normalize(country) for country in countries}
+        
+        def build_filters(columns: List[str]) -> Dict:
+            filters = {}
+            if wanted is not None:
+                country_col = CountryIndex.find_column(pd.DataFrame(columns=columns))
+                if country_col is None:
+                    raise ValueError(f"{dataset} has no country column to filter on")
+                filters[country_col] = lambda values: CountryIndex.normalize_series(values).isin(wanted).to_numpy()
+            if years is not None:
+                year_col = self._find_year_column(pd.DataFrame(columns=columns))
+                if year_col not in columns:
+                    raise ValueError(f"{dataset} has no year column to filter on")
+                low, high = years
+                filters[year_col] = lambda values: (
+                    (values >= (low if low is not None else -np.inf))
+                    & (values <= (high if high is not None else np.inf))
+                ).to_numpy()
+            return filters
+        
+        df = None
+        source = "csv"
+        if self.cache is not None:
+            key = self.cache.fingerprint(path, variant=self._cache_variant(dataset))
+            columns = self.cache.read_columns(path, key)
+            if columns is not None:
+                df = self.cache.load(path, key, filters=build_filters(columns))
+                source = "cache"
+        
+        if df is None:
+            source = "csv"
+            parts = []
+            filters = None
+            for chunk in self._iter_csv(path, dataset, chunksize, record_stats=False):
+                if filters is None:
+                    filters = build_filters(chunk.columns.tolist())
+                mask = np.ones(len(chunk), dtype=bool)
+                for col, predicate in filters.items():
+                    mask &= predicate(chunk[col])
+                if mask.any():
+                    parts.append(chunk[mask])
+            
+            if parts:
+                df = pd.concat(parts, ignore_index=True)
+            else:
+                header = pd.read_csv(path, nrows=0, **self._read_options(path, dataset))
+                header.columns = header.columns.str.strip()
+                df = header
+            df = self._apply_schema(df, dataset)
+        
+        elapsed = time.perf_counter() - start
+        self.load_stats[f"{dataset} (filtered)"] = {"source": source, "seconds": elapsed, "rows": len(df)}
+        logger.info(f"Loaded {len(df)} filtered rows from {path.name} via {source} in {elapsed:.3f}s")
+        return df
+    
+    def load_whr_panel(self, max_workers: Optional[int] = None) -> pd.DataFrame:
+        """Load every annual WHR release into one long-format panel.
+        
+        All ``WHR*.csv`` files in the data directory are parsed in parallel on
+        a thread pool, their column names reconciled via WHR_COLUMN_ALIASES,
+        and the results combined with a single concat. The release year is
+        taken from a year column if the file has one, otherwise from the
+        file name (e.g. ``WHR2023.csv``).
+        
+        Args:
+            max_workers: Thread pool size (None = ThreadPoolExecutor default)
+            
+        Returns:
+            Panel DataFrame with a "Year" column
+            
+        Raises:
+            FileNotFoundError: If no WHR*.csv files are found
+            ValueError: If a file has neither a year column nor a year in its name
+        """
+        paths = sorted(self.data_dir.glob("WHR*.csv"))
+        if not paths:
+            raise FileNotFoundError(f"No WHR*.csv files found in {self.data_dir}")
+        
+        logger.info(f"Loading {len(paths)} WHR releases from {self.data_dir}")
+        start = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(self._load_whr_release, paths))
+        
+        self.whr_panel = pd.concat(frames, ignore_index=True, sort=False)
+        
+        elapsed = time.perf_counter() - start
+        self.load_stats["WHR panel"] = {
+            "source": "panel",
+            "seconds": elapsed,
+            "rows": len(self.whr_panel),
+            "files": {path.stem: self.load_stats[path.stem]["seconds"] for path in paths}
+        }
+        logger.info(f"Loaded WHR panel with {len(self.whr_panel)} rows from {len(paths)} files in {elapsed:.3f}s")
+        
+        return self.whr_panel
+    
     def load_all_data(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Load all required datasets.
         
@@ -110,6 +383,31 @@ class DataLoader:
         self.load_food_data()
         return self.whr_data, self.food_data
     
+    def get_country_data(self, country: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Extract one country's rows from both datasets.
+        
+        Loaded datasets are served from their country index; datasets that
+        are not loaded yet are read with the country filter pushed down, so
+        the rest of the world is never materialized.
+        
+        Args:
+            country: Country name (case and whitespace insensitive)
+            
+        Returns:
+            Tuple of (country WHR data, country Food data)
+        """
+        if self.whr_data is None:
+            country_whr = self.load_filtered("WHR2024", countries=[country])
+        else:
+            country_whr = self.whr_index.take(self.whr_data, country)
+        
+        if self.food_data is None:
+            country_food = self.load_filtered("EdibleFoods", countries=[country])
+        else:
+            country_food = self.food_index.take(self.food_data, country)
+        
+        return country_whr, country_food
+    
     def get_finland_data(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Extract Finland-specific data from both datasets.
         
@@ -119,28 +417,13 @@ class DataLoader:
         Raises:
             ValueError: If Finland not found in datasets
         """
-        if self.whr_data is None:
-            self.load_whr_data()
-        if self.food_data is None:
-            self.load_food_data()
-        
-        # Get Finland data - handle multiple possible country column names
-        country_col = self._find_country_column(self.whr_data)
-        self.finland_whr = self.whr_data[
-            self.whr_data[country_col].str.contains("Finland", case=False, na=False)
-        ]
+        self.finland_whr, self.finland_food = self.get_country_data("Finland")
         
         if self.finland_whr.empty:
             raise ValueError("Finland not found in WHR2024.csv")
         
         logger.info(f"Found Finland in WHR data with shape {self.finland_whr.shape}")
         
-        # Get Finland food data
-        country_col = self._find_country_column(self.food_data)
-        self.finland_food = self.food_data[
-            self.food_data[country_col].str.contains("Finland", case=False, na=False)
-        ]
-        
         if self.finland_food.empty:
             logger.warning("Finland not found in food data")
         else:
@@ -148,9 +431,29 @@ class DataLoader:
         
         return self.finland_whr, self.finland_food
     
-    def get_summary_statistics(self) -> Dict[str, Dict]:
+    def get_load_statistics(self) -> Dict[str, any]:
+        """Get cache hit/miss counters and per-dataset load timings.
+        
+        Returns:
+            Dictionary with cache counters and load timings
+        """
+        return {
+            "cache_enabled": self.cache is not None,
+            "cache": self.cache.get_stats() if self.cache is not None else {"hits": 0, "misses": 0},
+            "loads": {name: dict(stats) for name, stats in self.load_stats.items()}
+        }
+    
+    def get_summary_statistics(self, approximate: bool = False) -> Dict[str, Dict]:
         """Generate summary statistics for all datasets.
         
+        Each dataset is profiled in a single pass; only the quartiles need an
+        extra (sorting) pass over the numeric columns. With ``approximate``,
+        quartiles and distinct areas come from KLL and HyperLogLog sketches
+        instead, and each summary carries the sketches' error bounds.
+        
+        Args:
+            approximate: Whether to use sketches instead of exact statistics
+            
         Returns:
             Dictionary containing summary statistics
         """
@@ -159,28 +462,49 @@ class DataLoader:
         if self.food_data is None:
             self.load_food_data()
         
+        whr_profile = DataProfiler(approximate=approximate).update(self.whr_data)
+        food_profile = DataProfiler(approximate=approximate).update(self.food_data)
+        area_col = self._find_country_column(self.food_data)
+        if approximate:
+            unique_areas = food_profile.distinct_counts().get(area_col)
+        else:
+            unique_areas = self.food_data[area_col].nunique()
+        
+        year_col = self._find_year_column(self.food_data)
+        year_stats = food_profile.numeric_summary().get(year_col)
+        if year_stats is not None:
+            year_range = f"{year_stats['min']:g}-{year_stats['max']:g}"
+        else:
+            year_range = f"{self.food_data[year_col].min()}-{self.food_data[year_col].max()}"
+        
         summary = {
             "WHR": {
-                "rows": len(self.whr_data),
-                "columns": len(self.whr_data.columns),
-                "countries": self.whr_data.shape[0],
-                "missing_values": self.whr_data.isnull().sum().to_dict(),
-                "numeric_summary": self.whr_data.describe().to_dict()
+                "rows": whr_profile.rows,
+                "columns": len(whr_profile.columns),
+                "countries": whr_profile.rows,
+                "missing_values": whr_profile.missing_values(),
+                "numeric_summary": self._describe(self.whr_data, whr_profile)
             },
             "Food": {
-                "rows": len(self.food_data),
-                "columns": len(self.food_data.columns),
-                "unique_areas": self.food_data[self._find_country_column(self.food_data)].nunique(),
-                "year_range": f"{self.food_data[self._find_year_column(self.food_data)].min()}-{self.food_data[self._find_year_column(self.food_data)].max()}",
-                "missing_values": self.food_data.isnull().sum().to_dict()
+                "rows": food_profile.rows,
+                "columns": len(food_profile.columns),
+                "unique_areas": unique_areas,
+                "year_range": year_range,
+                "missing_values": food_profile.missing_values()
             }
         }
+        if approximate:
+            summary["WHR"]["approximation"] = whr_profile.error_bounds()
+            summary["Food"]["approximation"] = food_profile.error_bounds()
         
         return summary
     
-    def get_data_quality_report(self) -> Dict[str, any]:
+    def get_data_quality_report(self, approximate: bool = False) -> Dict[str, any]:
         """Generate detailed data quality report.
         
+        Args:
+            approximate: Whether to count duplicates with a Bloom filter
+            
         Returns:
             Data quality report dictionary
         """
@@ -190,12 +514,247 @@ class DataLoader:
             self.load_food_data()
         
         report = {
-            "WHR": self._quality_report(self.whr_data),
-            "Food": self._quality_report(self.food_data)
+            "WHR": self._quality_report(self.whr_data, approximate),
+            "Food": self._quality_report(self.food_data, approximate)
         }
         
         return report
     
+    def get_food_stream_report(self, chunksize: int = 100_000,
+                               approximate: bool = False) -> Dict[str, any]:
+        """Profile the food file chunk by chunk without loading it whole.
+        
+        In approximate mode memory stays bounded regardless of file size:
+        duplicates are tracked in a Bloom filter, and the report adds
+        sketch-based quartiles, "distinct_counts" and "approximation" bounds.
+        
+        Args:
+            chunksize: Number of rows per chunk
+            approximate: Whether to use sketches instead of exact structures
+            
+        Returns:
+            Quality report dictionary with an added "numeric_summary"
+        """
+        profiler = DataProfiler.profile(self.iter_food_data(chunksize), approximate=approximate)
+        report = profiler.report()
+        if approximate:
+            report["numeric_summary"] = self._describe(None, profiler)
+            report["distinct_counts"] = profiler.distinct_counts()
+        else:
+            report["numeric_summary"] = profiler.numeric_summary()
+        return report
+    
+    def _load_whr_release(self, path: Path) -> pd.DataFrame:
+        """Parse one WHR release and reconcile it to WHR2024 column names.
+        
+        Args:
+            path: Path to a WHR*.csv file
+            
+        Returns:
+            DataFrame with reconciled columns and a "Year" column
+        """
+        df = self._read_csv(path, path.stem, schema_name="WHR2024")
+        df = df.rename(columns=lambda col: self.WHR_COLUMN_ALIASES.get(str(col).strip().lower(), col))
+        df = df.loc[:, ~df.columns.duplicated()]
+        
+        if "Year" not in df.columns:
+            match = re.search(r"(\d{4})", path.stem)
+            if match is None:
+                raise ValueError(f"Cannot determine year of {path.name}")
+            df.insert(1, "Year", int(match.group(1)))
+        
+        return df
+    
+    def _read_csv(self, path: Path, name: str, schema_name: Optional[str] = None) -> pd.DataFrame:
+        """Read a CSV file, serving it from the columnar cache when possible.
+        
+        Args:
+            path: CSV file path
+            name: Dataset name used in load statistics
+            schema_name: Dataset name in SCHEMAS (defaults to name)
+            
+        Returns:
+            Parsed DataFrame with standardized column names
+        """
+        schema_name = schema_name or name
+        start = time.perf_counter()
+        df = None
+        key = None
+        
+        engine = None
+        
+        if self.cache is not None:
+            variant = self._cache_variant(schema_name)
+            key = self.cache.fingerprint(path, variant=variant)
+            df = self.cache.load(path, key)
+        
+        source = "cache" if df is not None else "csv"
+        if df is None:
+            df, engine = self._parse_csv(path, schema_name)
+            # Standardize column names
+            df.columns = df.columns.str.strip()
+            df = self._apply_schema(df, schema_name)
+            if self.cache is not None and not df.empty:
+                self.cache.store(path, df, key, variant)
+        
+        elapsed = time.perf_counter() - start
+        self.load_stats[name] = {"source": source, "engine": engine, "seconds": elapsed, "rows": len(df)}
+        logger.info(f"Loaded {path.name} from {source} in {elapsed:.3f}s")
+        return df
+    
+    def _parse_csv(self, path: Path, name: str) -> Tuple[pd.DataFrame, str]:
+        """Parse a whole CSV file with the configured engine.
+        
+        The pyarrow engine parses on multiple threads. If it is unavailable,
+        rejects the options, or produces a quirky header (e.g. a leaked BOM),
+        the file is re-read with the C parser.
+        
+        Args:
+            path: CSV file path
+            name: Dataset name in SCHEMAS
+            
+        Returns:
+            Tuple of (parsed DataFrame, engine actually used)
+        """
+        options = self._read_options(path, name)
+        if self.dtype_backend is not None:
+            options["dtype_backend"] = self.dtype_backend
+        
+        if self.engine == "pyarrow":
+            try:
+                df = pd.read_csv(path, engine="pyarrow", **options)
+                if not any(str(col).startswith("\ufeff") for col in df.columns):
+                    return df, "pyarrow"
+                logger.warning(f"pyarrow left a BOM in the header of {path.name}, re-reading with C parser")
+            except (ImportError, ValueError, TypeError) as e:
+                logger.warning(f"pyarrow engine failed for {path.name} ({e}), falling back to C parser")
+            return pd.read_csv(path, engine="c", **options), "c"
+        
+        return pd.read_csv(path, engine=self.engine, **options), self.engine
+    
+    def _cache_variant(self, name: str) -> str:
+        """Describe parse options that change the cached result.
+        
+        Args:
+            name: Dataset name in SCHEMAS
+            
+        Returns:
+            String mixed into the cache key
+        """
+        schema = repr(self.SCHEMAS.get(name)) if self.use_schema else ""
+        return f"{schema}|{self.dtype_backend}"
+    
+    def _iter_csv(self, path: Path, name: str, chunksize: int,
+                  record_stats: bool = True) -> Iterator[pd.DataFrame]:
+        """Stream a CSV file in chunks with the dataset schema applied.
+        
+        Chunked reads always use the C parser since pyarrow does not support
+        chunksize.
+        
+        Args:
+            path: CSV file path
+            name: Dataset name in SCHEMAS
+            chunksize: Number of rows per chunk
+            record_stats: Whether to record load statistics when done
+            
+        Yields:
+            DataFrame chunks with standardized column names
+        """
+        start = time.perf_counter()
+        rows = 0
+        chunks = 0
+        
+        options = self._read_options(path, name)
+        if self.dtype_backend is not None:
+            options["dtype_backend"] = self.dtype_backend
+        with pd.read_csv(path, chunksize=chunksize, **options) as reader:
+            for chunk in reader:
+                chunk.columns = chunk.columns.str.strip()
+                chunk = self._apply_schema(chunk, name)
+                rows += len(chunk)
+                chunks += 1
+                yield chunk
+        
+        elapsed = time.perf_counter() - start
+        if record_stats:
+            self.load_stats[f"{name} (stream)"] = {
+                "source": "csv", "seconds": elapsed, "rows": rows, "chunks": chunks
+            }
+        logger.info(f"Streamed {rows} records in {chunks} chunks from {path.name}")
+    
+    def _read_options(self, path: Path, name: str) -> Dict:
+        """Build pd.read_csv options from the declared schema.
+        
+        Text dtypes are passed to the parser so categorical columns are
+        dictionary encoded while reading. Numeric dtypes are applied afterwards
+        by :meth:`_apply_schema` since they depend on missing values.
+        
+        Args:
+            path: CSV file path
+            name: Dataset name in SCHEMAS
+            
+        Returns:
+            Keyword arguments for pd.read_csv
+        """
+        schema = self.SCHEMAS.get(name)
+        if not self.use_schema or schema is None:
+            return {}
+        
+        # Header names may carry a BOM or stray whitespace
+        header = pd.read_csv(path, nrows=0, encoding=schema["encoding"]).columns
+        raw_names = {str(col).strip(): col for col in header}
+        dtype = {
+            raw_names[col]: col_type
+            for col, col_type in schema["dtypes"].items()
+            if col in raw_names and col_type in ("category", "object")
+        }
+        return {"encoding": schema["encoding"], "dtype": dtype}
+    
+    def _apply_schema(self, df: pd.DataFrame, name: str) -> pd.DataFrame:
+        """Cast numeric columns to the compact dtypes declared in SCHEMAS.
+        
+        Args:
+            df: Parsed DataFrame with stripped column names
+            name: Dataset name in SCHEMAS
+            
+        Returns:
+            DataFrame with schema dtypes applied
+        """
+        schema = self.SCHEMAS.get(name)
+        if not self.use_schema or schema is None:
+            return df
+        
+        for col, col_type in schema["dtypes"].items():
+            if col not in df.columns or col_type == "object":
+                continue
+            if col_type == "category":
+                # Concatenated chunks lose their per-chunk categories
+                if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                    df[col] = df[col].astype("category")
+                continue
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                logger.warning(f"Column {col} in {name} is not numeric, keeping inferred dtype")
+                continue
+            if isinstance(df[col].dtype, pd.ArrowDtype):
+                # Arrow integers are nullable, so no float fallback is needed
+                try:
+                    df[col] = df[col].astype(f"{col_type}[pyarrow]")
+                except (ValueError, TypeError):
+                    logger.warning(f"Column {col} in {name} does not fit {col_type}, keeping inferred dtype")
+                continue
+            
+            target = np.dtype(col_type)
+            if target.kind in "iu":
+                values = df[col]
+                info = np.iinfo(target)
+                has_missing = values.isnull().any()
+                if (has_missing or (values % 1 != 0).any()
+                        or values.min() < info.min or values.max() > info.max):
+                    target = np.dtype("float32") if has_missing else values.dtype
+            df[col] = df[col].astype(target)
+        
+        return df
+    
     @staticmethod
     def _find_country_column(df: pd.DataFrame) -> str:
         """Find the country column name in dataframe.
@@ -206,11 +765,8 @@ class DataLoader:
         Returns:
             Column name containing country information
         """
-        possible_names = ["Country", "Area", "Country name", "CountryName", "Country_abr"]
-        for col in df.columns:
-            if col in possible_names or any(name.lower() in col.lower() for name in possible_names):
-                return col
-        return df.columns[0]  # Fallback to first column
+        country_col = CountryIndex.find_column(df)
+        return country_col if country_col is not None else df.columns[0]  # Fallback to first column
     
     @staticmethod
     def _find_year_column(df: pd.DataFrame) -> str:
@@ -229,22 +785,48 @@ class DataLoader:
         return "Year"  # Default
     
     @staticmethod
-    def _quality_report(df: pd.DataFrame) -> Dict:
+    def _quality_report(df: pd.DataFrame, approximate: bool = False) -> Dict:
         """Generate quality report for a dataframe.
         
         Args:
             df: DataFrame to analyze
+            approximate: Whether to use sketches instead of exact structures
             
         Returns:
             Quality report dictionary
         """
-        missing_pct = (df.isnull().sum() / len(df) * 100).to_dict()
+        return DataProfiler(approximate=approximate).update(df).report()
+    
+    @staticmethod
+    def _describe(df: Optional[pd.DataFrame], profile: DataProfiler) -> Dict[str, Dict[str, float]]:
+        """Build a describe()-style summary from a profile plus quartiles.
+        
+        Args:
+            df: Profiled DataFrame (unused for approximate profiles)
+            profile: Profiler that has seen df
+            
+        Returns:
+            Dictionary of column to count/mean/std/min/quartiles/max
+        """
+        stats = profile.numeric_summary()
+        if not stats:
+            return {}
+        if profile.approximate:
+            sketched = profile.quantiles([0.25, 0.5, 0.75])
+            quartiles = pd.DataFrame(sketched, index=[0.25, 0.5, 0.75])
+        else:
+            quartiles = df[list(stats)].quantile([0.25, 0.5, 0.75])
         
         return {
-            "total_rows": len(df),
-            "total_columns": len(df.columns),
-            "memory_usage_mb": df.memory_usage(deep=True).sum() / 1024 ** 2,
-            "duplicate_rows": len(df[df.duplicated()]),
-            "missing_values_percent": missing_pct,
-            "completeness": f"{(1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100:.2f}%"
+            col: {
+                "count": col_stats["count"],
+                "mean": col_stats["mean"],
+                "std": col_stats["std"],
+                "min": col_stats["min"],
+                "25%": float(quartiles.loc[0.25, col]),
+                "50%": float(quartiles.loc[0.5, col]),
+                "75%": float(quartiles.loc[0.75, col]),
+                "max": col_stats["max"]
+            }
+            for col, col_stats in stats.items()
         }
@@ -0,0 +1,362 @@
+"""Single-pass, chunkable data quality profiler."""
+
+import logging
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence
+import pandas as pd
+import numpy as np
+
+from src.data.sketches import BloomFilter, HyperLogLog, KLLSketch, hash_values
+
+logger = logging.getLogger(__name__)
+
+
+class DataProfiler:
+    """Accumulate data quality statistics in one sweep over each chunk.
+
+    Null counts, duplicate rows (via 64-bit row hashes), numeric
+    count/mean/std/min/max and memory usage are all gathered by a single
+    :meth:`update` per chunk. Profilers over different chunks can be merged,
+    so a file of any size is profiled in linear time with one chunk in memory.
+    Exact duplicate tracking collects each chunk's distinct uint64 row
+    hashes and deduplicates across chunks with one sort when the count is
+    read, so its memory is O(rows) at 8 bytes each; use approximate mode
+    for fixed memory.
+
+    In approximate mode, exact duplicate tracking is replaced by a Bloom
+    filter, and HyperLogLog (distinct values of text columns) and KLL
+    (quantiles of numeric columns) sketches are maintained, all with fixed
+    memory and mergeable across chunks and worker processes.
+    """
+
+    def __init__(self, approximate: bool = False, hll_precision: int = 12,
+                 kll_k: int = 200, bloom_capacity: int = 1_000_000,
+                 bloom_error_rate: float = 0.01, seed: Optional[int] = None):
+        """Initialize an empty profiler.
+
+        Args:
+            approximate: Whether to use sketches instead of exact structures
+            hll_precision: HyperLogLog index bits (approximate mode)
+            kll_k: KLL accuracy parameter (approximate mode)
+            bloom_capacity: Expected distinct rows for the Bloom filter
+            bloom_error_rate: Bloom filter false-positive rate at capacity
+            seed: Root seed; each KLL sketch gets its own child of
+                ``SeedSequence(seed)`` (None = fresh entropy)
+        """
+        self.approximate = approximate
+        self.hll_precision = hll_precision
+        self.kll_k = kll_k
+        self.rows = 0
+        self.columns: Optional[List[str]] = None
+        self.null_counts: Optional[np.ndarray] = None
+        self.memory_bytes = 0
+        self.inferred_memory_bytes = 0
+        self.numeric_columns: List[str] = []
+        self._count: Optional[np.ndarray] = None
+        self._mean: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None
+        self._min: Optional[np.ndarray] = None
+        self._max: Optional[np.ndarray] = None
+        self._row_hashes: List[np.ndarray] = []
+        self._bloom: Optional[BloomFilter] = None
+        self._distinct: Dict[str, HyperLogLog] = {}
+        self._quantiles: Dict[str, KLLSketch] = {}
+        self._seeds = np.random.SeedSequence(seed)
+        if approximate:
+            self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+
+    @classmethod
+    def profile(cls, frames: Iterable[pd.DataFrame], **kwargs) -> "DataProfiler":
+        """Profile a stream of DataFrame chunks.
+
+        Args:
+            frames: Iterable of chunks sharing the same columns
+            **kwargs: Options passed to the constructor (e.g. approximate=True)
+
+        Returns:
+            Profiler holding statistics over all chunks
+        """
+        profiler = cls(**kwargs)
+        for frame in frames:
+            profiler.update(frame)
+        return profiler
+
+    def update(self, df: pd.DataFrame) -> "DataProfiler":
+        """Add one chunk to the profile.
+
+        Args:
+            df: DataFrame chunk
+
+        Returns:
+            self, for chaining
+        """
+        if self.columns is None:
+            self._init_columns(df)
+        elif list(df.columns) != self.columns:
+            raise ValueError("All profiled chunks must have the same columns")
+
+        self.rows += len(df)
+        self.null_counts += df.isnull().sum().to_numpy()
+        self.memory_bytes += int(df.memory_usage(deep=True).sum())
+        self.inferred_memory_bytes += self._inferred_memory_usage(df)
+        self._update_duplicates(df)
+        if self.numeric_columns:
+            values = df[self.numeric_columns].to_numpy(dtype=float, na_value=np.nan)
+            self._update_numeric(values)
+            for i, col in enumerate(self.numeric_columns):
+                if col in self._quantiles:
+                    self._quantiles[col].update(values[:, i])
+        for col, sketch in self._distinct.items():
+            sketch.add_hashes(hash_values(df[col].dropna()))
+        return self
+
+    def merge(self, other: "DataProfiler") -> "DataProfiler":
+        """Merge another profiler (e.g. from a different chunk range) into this one.
+
+        Args:
+            other: Profiler over the same columns
+
+        Returns:
+            self, for chaining
+        """
+        if other.columns is None:
+            return self
+        if other.approximate != self.approximate:
+            raise ValueError("Cannot merge exact and approximate profiles")
+        if self.columns is None:
+            self.columns = list(other.columns)
+            self.null_counts = np.zeros(len(self.columns), dtype=np.int64)
+            self.numeric_columns = list(other.numeric_columns)
+            self._init_numeric(len(self.numeric_columns))
+            self._distinct = {col: HyperLogLog(sketch.precision) for col, sketch in other._distinct.items()}
+            self._quantiles = {col: KLLSketch(sketch.k, child) for (col, sketch), child
+                               in zip(other._quantiles.items(), self._seeds.spawn(len(other._quantiles)))}
+        elif other.columns != self.columns:
+            raise ValueError("Cannot merge profiles over different columns")
+
+        self.rows += other.rows
+        self.null_counts += other.null_counts
+        self.memory_bytes += other.memory_bytes
+        self.inferred_memory_bytes += other.inferred_memory_bytes
+
+        if self.approximate:
+            self._bloom.merge(other._bloom)
+        else:
+            self._row_hashes.extend(other._row_hashes)
+        for col, sketch in other._distinct.items():
+            self._distinct[col].merge(sketch)
+        for col, sketch in other._quantiles.items():
+            self._quantiles[col].merge(sketch)
+
+        if self.numeric_columns:
+            self._combine_moments(other._count, other._mean, other._m2)
+            self._min = np.fmin(self._min, other._min)
+            self._max = np.fmax(self._max, other._max)
+        return self
+
+    @property
+    def duplicate_rows(self) -> int:
+        """Number of rows that repeat an earlier row.
+
+        In exact mode the per-chunk hashes are deduplicated here, once, and
+        kept as a single array of distinct hashes for later reads.
+        """
+        if self.approximate:
+            return self._bloom.duplicates
+        if len(self._row_hashes) > 1:
+            self._row_hashes = [np.unique(np.concatenate(self._row_hashes))]
+        distinct = len(self._row_hashes[0]) if self._row_hashes else 0
+        return self.rows - distinct
+
+    def report(self) -> Dict:
+        """Build the data quality report.
+
+        Returns:
+            Quality report dictionary
+        """
+        n_columns = len(self.columns or [])
+        total_cells = self.rows * n_columns
+        memory_mb = self.memory_bytes / 1024 ** 2
+        inferred_mb = self.inferred_memory_bytes / 1024 ** 2
+
+        if self.rows:
+            missing_pct = dict(zip(self.columns, (self.null_counts / self.rows * 100).tolist()))
+        else:
+            missing_pct = {col: np.nan for col in self.columns or []}
+
+        report = {
+            "total_rows": self.rows,
+            "total_columns": n_columns,
+            "memory_usage_mb": memory_mb,
+            "memory_usage_mb_inferred": inferred_mb,
+            "memory_savings_percent": (1 - memory_mb / inferred_mb) * 100 if inferred_mb else 0.0,
+            "duplicate_rows": self.duplicate_rows,
+            "missing_values_percent": missing_pct,
+            "completeness": f"{(1 - self.null_counts.sum() / total_cells) * 100:.2f}%" if total_cells else "nan%"
+        }
+        if self.approximate:
+            report["approximation"] = self.error_bounds()
+        return report
+
+    def error_bounds(self) -> Dict[str, float]:
+        """Describe the error of the approximate statistics.
+
+        Returns:
+            Dictionary with the HyperLogLog relative standard error, the KLL
+            normalized rank error, the Bloom filter false-positive rate and
+            an upper bound on falsely counted duplicate rows
+        """
+        if not self.approximate:
+            return {}
+        fpr = self._bloom.false_positive_rate
+        return {
+            "distinct_relative_std_error": HyperLogLog(self.hll_precision).relative_error,
+            "quantile_rank_error": KLLSketch(self.kll_k).rank_error,
+            "duplicate_false_positive_rate": fpr,
+            "duplicate_rows_max_overcount": float(np.ceil(fpr * self.rows))
+        }
+
+    def distinct_counts(self) -> Dict[str, int]:
+        """Get estimated distinct values of each text column (approximate mode).
+
+        Returns:
+            Dictionary of column to estimated distinct count
+        """
+        return {col: int(round(sketch.estimate())) for col, sketch in self._distinct.items()}
+
+    def quantiles(self, qs: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Get estimated quantiles of each numeric column (approximate mode).
+
+        Args:
+            qs: Quantile levels in [0, 1]
+
+        Returns:
+            Dictionary of column to quantile values
+        """
+        return {col: sketch.quantiles(qs) for col, sketch in self._quantiles.items()}
+
+    def missing_values(self) -> Dict[str, int]:
+        """Get missing value counts per column.
+
+        Returns:
+            Dictionary of column to null count
+        """
+        return dict(zip(self.columns or [], (int(n) for n in self.null_counts))) if self.columns else {}
+
+    def numeric_summary(self) -> Dict[str, Dict[str, float]]:
+        """Get count/mean/std/min/max for each numeric column.
+
+        Returns:
+            Dictionary of column to statistics
+        """
+        summary = {}
+        for i, col in enumerate(self.numeric_columns):
+            count = self._count[i]
+            summary[col] = {
+                "count": float(count),
+                "mean": float(self._mean[i]) if count else np.nan,
+                "std": float(np.sqrt(self._m2[i] / (count - 1))) if count > 1 else np.nan,
+                "min": float(self._min[i]) if count else np.nan,
+                "max": float(self._max[i]) if count else np.nan
+            }
+        return summary
+
+    def _init_columns(self, df: pd.DataFrame):
+        """Set up per-column accumulators from the first chunk."""
+        self.columns = list(df.columns)
+        self.null_counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.numeric_columns = [
+            col for col in self.columns
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+        ]
+        self._init_numeric(len(self.numeric_columns))
+
+        if self.approximate:
+            children = self._seeds.spawn(len(self.numeric_columns))
+            self._quantiles = {col: KLLSketch(self.kll_k, child)
+                               for col, child in zip(self.numeric_columns, children)}
+            self._distinct = {
+                col: HyperLogLog(self.hll_precision) for col in self.columns
+                if col not in self.numeric_columns and not pd.api.types.is_bool_dtype(df[col])
+            }
+
+    def _init_numeric(self, k: int):
+        """Reset numeric moment accumulators."""
+        self._count = np.zeros(k)
+        self._mean = np.zeros(k)
+        self._m2 = np.zeros(k)
+        self._min = np.full(k, np.nan)
+        self._max = np.full(k, np.nan)
+
+    def _update_duplicates(self, df: pd.DataFrame):
+        """Count duplicate rows within the chunk and against earlier chunks."""
+        if len(df) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        if self.approximate:
+            self._bloom.add_hashes(hashes)
+            return
+        self._row_hashes.append(np.unique(hashes.astype(np.uint64, copy=False)))
+
+    def _update_numeric(self, values: np.ndarray):
+        """Fold a chunk's numeric block into the running moments."""
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+            m2 = np.nansum((values - mean) ** 2, axis=0)
+        self._combine_moments(count, mean, m2)
+
+        if valid.any():
+            has_values = count > 0
+            chunk_min = np.full(values.shape[1], np.nan)
+            chunk_max = np.full(values.shape[1], np.nan)
+            chunk_min[has_values] = np.nanmin(values[:, has_values], axis=0)
+            chunk_max[has_values] = np.nanmax(values[:, has_values], axis=0)
+            self._min = np.fmin(self._min, chunk_min)
+            self._max = np.fmax(self._max, chunk_max)
+
+    def _combine_moments(self, count: np.ndarray, mean: np.ndarray, m2: np.ndarray):
+        """Combine running count/mean/M2 with another partition (Chan et al.)."""
+        total = self._count + count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean - self._mean
+            self._mean = np.where(total > 0, self._mean + delta * count / total, 0.0)
+            self._m2 = np.where(total > 0, self._m2 + m2 + delta ** 2 * self._count * count / total, 0.0)
+        self._count = total
+
+    @staticmethod
+    def _inferred_memory_usage(df: pd.DataFrame) -> int:
+        """Estimate deep memory usage of a frame with pandas-inferred dtypes.
+
+        Categorical columns are measured as Python-object strings and compact
+        numeric columns as 64-bit, i.e. what the frame costs without a schema.
+        Object sizes of categorical columns are computed from the category
+        sizes and code counts, without materializing the object column.
+
+        Args:
+            df: DataFrame to measure
+
+        Returns:
+            Estimated memory usage in bytes
+        """
+        total = int(df.index.memory_usage(deep=True))
+        for col in df.columns:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                total += DataProfiler._object_memory_usage(series)
+            elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf" and series.dtype.itemsize < 8:
+                total += len(series) * 8
+            else:
+                total += int(series.memory_usage(deep=True, index=False))
+        return total
+
+    @staticmethod
+    def _object_memory_usage(series: pd.Series) -> int:
+        """Deep memory usage a categorical column would have as an object column."""
+        codes = series.cat.codes.to_numpy()
+        sizes = np.array([sys.getsizeof(value) for value in series.cat.categories], dtype=np.int64)
+        counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+        missing = int((codes < 0).sum())
+        # One pointer per row plus each referenced object (NaN for missing codes)
+        return len(codes) * 8 + int(counts @ sizes) + missing * sys.getsizeof(np.nan)
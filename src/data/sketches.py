@@ -0,0 +1,315 @@
+"""Mergeable approximate sketches for profiling very large datasets.
+
+All sketches consume 64-bit hashes or float values in NumPy batches, hold
+only plain NumPy state (so they pickle cheaply across worker processes) and
+support ``merge`` so partial sketches built per chunk or per process can be
+combined into one.
+"""
+
+import math
+from typing import List, Optional, Sequence, Union
+import pandas as pd
+import numpy as np
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """Hash a column to 64-bit values suitable for the sketches.
+
+    Args:
+        values: Column to hash (categoricals hash by value, not code)
+
+    Returns:
+        uint64 array of hashes
+    """
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of uint64 values (0 for 0)."""
+    hi = (values >> np.uint64(32)).astype(np.float64)
+    lo = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    hi_bits = np.frexp(hi)[1]
+    lo_bits = np.frexp(lo)[1]
+    return np.where(hi_bits > 0, hi_bits + 32, lo_bits)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch."""
+
+    def __init__(self, precision: int = 12):
+        """Initialize sketch with 2**precision registers.
+
+        Args:
+            precision: Number of index bits (4-18)
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of the estimate relative to the true count."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes: np.ndarray) -> "HyperLogLog":
+        """Add a batch of 64-bit hashes.
+
+        Args:
+            hashes: uint64 array
+
+        Returns:
+            self, for chaining
+        """
+        if len(hashes) == 0:
+            return self
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        rank = (width - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merge another sketch with the same precision.
+
+        Args:
+            other: Sketch to merge
+
+        Returns:
+            self, for chaining
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        """Estimate the number of distinct hashes added.
+
+        Returns:
+            Estimated distinct count
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return float(raw)
+
+
+class KLLSketch:
+    """KLL quantile sketch over float values."""
+
+    def __init__(self, k: int = 200,
+                 seed: Optional[Union[int, np.random.SeedSequence]] = None):
+        """Initialize sketch.
+
+        Args:
+            k: Accuracy parameter; rank error shrinks roughly as 1/k
+            seed: Seed for the random compaction offsets (None = fresh
+                entropy). Sketches that will be merged need independent
+                seeds, e.g. children of one ``SeedSequence``; a shared
+                seed correlates their compaction errors.
+        """
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        """Approximate normalized rank error (99% confidence, single quantile)."""
+        return 2.446 / self.k ** 0.9433
+
+    def update(self, values: np.ndarray) -> "KLLSketch":
+        """Add a batch of values (NaN is ignored).
+
+        Args:
+            values: Array of numbers
+
+        Returns:
+            self, for chaining
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Merge another sketch into this one.
+
+        Args:
+            other: Sketch to merge
+
+        Returns:
+            self, for chaining
+        """
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.count += other.count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Estimate quantiles.
+
+        Args:
+            qs: Quantile levels in [0, 1]
+
+        Returns:
+            Array of estimated quantile values (NaN if sketch is empty)
+        """
+        qs = np.asarray(qs, dtype=float)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        targets = qs * cumulative[-1]
+        positions = np.clip(np.searchsorted(cumulative, targets, side="left"), 0, len(items) - 1)
+        result = items[positions]
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+    def _capacity(self, level: int) -> int:
+        """Capacity of a compactor level given the current height."""
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        """Compact full levels until the sketch fits its size budget."""
+        while sum(len(level) for level in self._levels) > sum(
+                self._capacity(h) for h in range(len(self._levels))):
+            for h, level in enumerate(self._levels):
+                if len(level) < self._capacity(h):
+                    continue
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                level = np.sort(level)
+                odd = len(level) % 2
+                body = level[:-1] if odd else level
+                offset = int(self._rng.integers(2))
+                self._levels[h + 1] = np.concatenate([self._levels[h + 1], body[offset::2]])
+                self._levels[h] = level[-1:] if odd else level[:0]
+                break
+
+
+class BloomFilter:
+    """Bloom filter that estimates duplicate rows from 64-bit row hashes."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """Initialize filter sized for an expected number of distinct rows.
+
+        Args:
+            capacity: Expected number of distinct items
+            error_rate: Target false-positive rate at capacity
+        """
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.n_bits = max(64, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.n_hashes = max(1, int(round(self.n_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+        self.items = 0
+        self.duplicates = 0
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Current probability that a new item is wrongly reported as seen."""
+        fill = self._fill_ratio()
+        return fill ** self.n_hashes
+
+    def add_hashes(self, hashes: np.ndarray) -> int:
+        """Add a batch of hashes, counting those already (probably) present.
+
+        Args:
+            hashes: uint64 array of row hashes
+
+        Returns:
+            Number of duplicates detected in this batch
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return 0
+        unique = np.unique(hashes)
+        positions = self._positions(unique)
+        seen = self._test(positions).all(axis=1)
+        duplicates = (len(hashes) - len(unique)) + int(seen.sum())
+        self._set(positions[~seen])
+        self.items += len(hashes)
+        self.duplicates += duplicates
+        return duplicates
+
+    def cardinality(self) -> float:
+        """Estimate distinct items from the fraction of set bits.
+
+        Returns:
+            Estimated number of distinct items added
+        """
+        fill = self._fill_ratio()
+        if fill >= 1:
+            return float("inf")
+        return -self.n_bits / self.n_hashes * math.log1p(-fill)
+
+    def merge(self, other: "BloomFilter") -> "BloomFilter":
+        """Merge a filter built with the same parameters.
+
+        Duplicates shared between the two partitions are estimated from the
+        cardinalities of the filters and of their union.
+
+        Args:
+            other: Filter to merge
+
+        Returns:
+            self, for chaining
+        """
+        if other.n_bits != self.n_bits or other.n_hashes != self.n_hashes:
+            raise ValueError("Cannot merge Bloom filters with different parameters")
+        before = self.cardinality() + other.cardinality()
+        np.bitwise_or(self.bits, other.bits, out=self.bits)
+        overlap = max(0.0, before - self.cardinality())
+        self.items += other.items
+        self.duplicates += other.duplicates + int(round(overlap))
+        return self
+
+    def _fill_ratio(self) -> float:
+        """Fraction of bits set."""
+        return int(np.unpackbits(self.bits)[:self.n_bits].sum()) / self.n_bits
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        """Bit positions for each hash via double hashing."""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return ((h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.n_bits)).astype(np.int64)
+
+    def _test(self, positions: np.ndarray) -> np.ndarray:
+        """Check which bit positions are set."""
+        return (self.bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1 == 1
+
+    def _set(self, positions: np.ndarray):
+        """Set bit positions."""
+        positions = positions.ravel()
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
@@ -2,11 +2,14 @@
 
 import logging
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 
+from src.data.country_index import CountryIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,12 +25,29 @@ class HappinessVisualizer:
         "secondary": "#FF5733"
     }
     
+    @staticmethod
+    def _highlight_colors(countries: pd.Series, highlight: List[str], default: str) -> List[str]:
+        """Build per-row marker colors highlighting selected countries.
+        
+        Args:
+            countries: Country name column
+            highlight: Countries to highlight
+            default: Color for all other countries
+            
+        Returns:
+            List of colors aligned with countries
+        """
+        wanted = [CountryIndex.normalize(country) for country in highlight]
+        mask = CountryIndex.normalize_series(countries).isin(wanted).to_numpy()
+        return np.where(mask, HappinessVisualizer.COLORS["finland"], default).tolist()
+    
     @staticmethod
     def create_correlation_heatmap(correlations: pd.DataFrame, title: str = "Correlation Heatmap") -> go.Figure:
         """Create correlation heatmap visualization.
         
         Args:
-            correlations: DataFrame with correlation values
+            correlations: DataFrame with correlation values (square factor
+                matrix, e.g. from HappinessAnalyzer.get_correlation_matrix)
             title: Chart title
             
         Returns:
@@ -36,7 +56,8 @@ class HappinessVisualizer:
         # Create heatmap
         fig = go.Figure(data=go.Heatmap(
             z=correlations.values if hasattr(correlations, 'values') else correlations,
-            x=correlations.index if hasattr(correlations, 'index') else range(len(correlations)),
+            x=correlations.columns if hasattr(correlations, 'columns') else range(len(correlations)),
+            y=correlations.index if hasattr(correlations, 'index') else range(len(correlations)),
             colorscale="RdBu",
             zmid=0,
             zmin=-1,
@@ -101,6 +122,97 @@ class HappinessVisualizer:
         
         return fig
     
+    @staticmethod
+    def create_driver_chart(summary: pd.DataFrame,
+                            title: str = "Multivariate Happiness Drivers") -> go.Figure:
+        """Create bar chart of standardized driver coefficients.
+        
+        Args:
+            summary: Driver summary with "Coefficient" and optional "Lower"/"Upper"
+                interval columns (e.g. from HappinessAnalyzer.fit_driver_model)
+            title: Chart title
+            
+        Returns:
+            Plotly figure object
+        """
+        error_y = None
+        if {"Lower", "Upper"} <= set(summary.columns) and summary["Upper"].ne(summary["Lower"]).any():
+            error_y = dict(
+                type="data",
+                symmetric=False,
+                array=summary["Upper"] - summary["Coefficient"],
+                arrayminus=summary["Coefficient"] - summary["Lower"]
+            )
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                x=summary.index,
+                y=summary["Coefficient"],
+                marker_color=HappinessVisualizer.COLORS["primary"],
+                error_y=error_y,
+                text=summary["Coefficient"].round(3),
+                textposition="auto"
+            )
+        ])
+        
+        fig.update_layout(
+            title=title,
+            xaxis_title="Drivers",
+            yaxis_title="Standardized Coefficient",
+            height=500,
+            width=900,
+            showlegend=False
+        )
+        
+        fig.add_hline(y=0, line_dash="dash", line_color="gray")
+        
+        return fig
+    
+    @staticmethod
+    def create_influence_chart(influence: pd.Series, title: str = "Country Influence",
+                               top_n: int = 15,
+                               highlight: Optional[List[str]] = None) -> go.Figure:
+        """Create bar chart of the countries that move a correlation most.
+        
+        Args:
+            influence: Influence per country for one factor (e.g. a column of
+                HappinessAnalyzer.calculate_influence()["influence"])
+            title: Chart title
+            top_n: Number of most influential countries to show
+            highlight: Countries to highlight (default: Finland)
+            
+        Returns:
+            Plotly figure object
+        """
+        top = influence.dropna()
+        top = top.loc[top.abs().sort_values(ascending=False).index[:top_n]]
+        countries = pd.Series(top.index.astype(str))
+        colors = HappinessVisualizer._highlight_colors(countries, highlight or ["Finland"],
+                                                       HappinessVisualizer.COLORS["secondary"])
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                x=countries,
+                y=top.to_numpy(),
+                marker_color=colors,
+                text=top.round(4).to_numpy(),
+                textposition="auto"
+            )
+        ])
+        
+        fig.update_layout(
+            title=title,
+            xaxis_title="Country",
+            yaxis_title="Change in Correlation",
+            height=500,
+            width=900,
+            showlegend=False
+        )
+        
+        fig.add_hline(y=0, line_dash="dash", line_color="gray")
+        
+        return fig
+    
     @staticmethod
     def create_country_comparison(data: pd.DataFrame, 
                                  country_col: str, 
@@ -124,9 +236,9 @@ class HappinessVisualizer:
         nordic_data = nordic_data.sort_values(metric_col, ascending=False)
         
         # Highlight Finland
-        colors = [HappinessVisualizer.COLORS["finland"] if "Finland" in country 
-                 else HappinessVisualizer.COLORS["nordic"] 
-                 for country in nordic_data[country_col]]
+        colors = HappinessVisualizer._highlight_colors(
+            nordic_data[country_col], ["Finland"], HappinessVisualizer.COLORS["nordic"]
+        )
         
         fig = go.Figure(data=[
             go.Bar(
@@ -178,9 +290,9 @@ class HappinessVisualizer:
         
         # Determine colors
         if highlight_countries:
-            colors = [HappinessVisualizer.COLORS["finland"] if any(h in country for h in highlight_countries)
-                     else HappinessVisualizer.COLORS["other"]
-                     for country in plot_data[country_col]]
+            colors = HappinessVisualizer._highlight_colors(
+                plot_data[country_col], highlight_countries, HappinessVisualizer.COLORS["other"]
+            )
         else:
             colors = HappinessVisualizer.COLORS["primary"]
         
@@ -228,9 +340,10 @@ class HappinessVisualizer:
         df = pd.DataFrame(ranking_data)
         
         # Highlight Finland
-        colors = [HappinessVisualizer.COLORS["finland"] if "Finland" in str(country)
-                 else HappinessVisualizer.COLORS["nordic"]
-                 for country in df.get("Country name", df.columns[0])]
+        countries = df["Country name"] if "Country name" in df.columns else df.iloc[:, 0]
+        colors = HappinessVisualizer._highlight_colors(
+            countries, ["Finland"], HappinessVisualizer.COLORS["nordic"]
+        )
         
         fig = go.Figure(data=[
             go.Bar(
@@ -313,14 +426,16 @@ class HappinessVisualizer:
         fig = go.Figure()
         
         if country_col and country_col in time_data.columns:
-            for country in time_data[country_col].unique():
-                country_data = time_data[time_data[country_col] == country].sort_values(time_col)
+            keys = CountryIndex.normalize_series(time_data[country_col])
+            for key, country_data in time_data.groupby(keys, sort=False):
+                name = str(country_data[country_col].iloc[0])
+                country_data = country_data.sort_values(time_col)
                 fig.add_trace(go.Scatter(
                     x=country_data[time_col],
                     y=country_data[value_col],
                     mode="lines+markers",
-                    name=str(country),
-                    line_color=HappinessVisualizer.COLORS["finland"] if "Finland" in str(country) else None
+                    name=name,
+                    line_color=HappinessVisualizer.COLORS["finland"] if key == "finland" else None
                 ))
         else:
             sorted_data = time_data.sort_values(time_col)
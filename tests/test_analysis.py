@@ -1,5 +1,6 @@
 """Test suite for analysis module."""
 
+import os
 import pytest
 import pandas as pd
 import numpy as np
@@ -10,6 +11,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data.loader import DataLoader
 from src.analysis.analyzer import HappinessAnalyzer
+from src.analysis.correlation import CorrelationEngine
+from src.analysis.ranking import RankTable
+from src.analysis.drivers import DriverModel
+from src.analysis.statistics import SufficientStatistics
+from src.analysis.result_cache import ResultCache
+from src.analysis.similarity import CountrySimilarityIndex
+from src.analysis.panel import PanelCube
+from src.analysis.uncertainty import RankSimulator
+from src.analysis.gaps import GapTensor
+from scipy import stats
 
 
 class TestHappinessAnalyzer:
@@ -18,7 +29,7 @@ class TestHappinessAnalyzer:
     @pytest.fixture
     def analyzer(self):
         """Create analyzer instance with real data."""
-        loader = DataLoader("data")
+        loader = DataLoader("data", use_cache=False)
         whr_data = loader.load_whr_data()
         return HappinessAnalyzer(whr_data)
     
@@ -72,6 +83,756 @@ class TestHappinessAnalyzer:
         assert len(profile) > 0
         assert "country" in profile
         assert "all_data" in profile
+    
+    def test_get_country_profile(self, analyzer):
+        """Test profile lookup for arbitrary countries."""
+        profile = analyzer.get_country_profile("denmark")
+        assert profile["country"] == "Denmark"
+        assert profile["global_rank"] == 2
+        assert analyzer.get_finland_profile()["global_rank"] == 1
+        assert analyzer.get_country_profile("Atlantis") == {}
+    
+    def test_get_profiles_batch(self, analyzer):
+        """Test batch profiles match single lookups and include peer ranks."""
+        profiles = analyzer.get_profiles(["Finland", "sweden", "Atlantis"])
+        assert set(profiles) == {"Finland", "sweden"}
+        assert profiles["sweden"]["global_rank"] == analyzer.get_country_profile("Sweden")["global_rank"]
+        assert profiles["Finland"]["peer_ranks"]["Nordic"]["Ladder score"] == 1
+        assert "Nordic" in profiles["sweden"]["peer_ranks"]
+        
+        analyzer.add_peer_group("Baltic", ["Estonia", "Latvia", "Lithuania"])
+        baltic = analyzer.get_country_profile("Lithuania")["peer_ranks"]["Baltic"]
+        assert baltic["Ladder score"] == 1
+    
+    def test_compare_peer_groups(self, analyzer):
+        """Test grouped comparison matches pandas groupby statistics."""
+        rng = np.random.default_rng(0)
+        countries = analyzer.whr_data[analyzer.country_col]
+        mapping = {country: f"Group {rng.integers(0, 12)}" for country in countries}
+        result = analyzer.compare_peer_groups(mapping)
+        
+        numeric = analyzer.whr_data.select_dtypes(include=[np.number])
+        labels = countries.map(mapping)
+        expected_ranks = numeric.groupby(labels).rank(method="first", ascending=False).fillna(0)
+        ranks = result["ranks"].drop(columns="Group")
+        np.testing.assert_array_equal(ranks.to_numpy(), expected_ranks.to_numpy())
+        
+        expected_mean = numeric.groupby(labels).mean()
+        pd.testing.assert_frame_equal(result["mean"].sort_index(), expected_mean.sort_index(),
+                                      check_names=False)
+        assert (result["count"].sum() == numeric.notna().sum()).all()
+
+
+class TestCorrelationEngine:
+    """Test vectorized correlation engine."""
+    
+    @pytest.fixture
+    def data(self):
+        """Create factors with ties and scattered missing values."""
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=120)
+        Y = rng.normal(size=(120, 25)) + 0.3 * x[:, None]
+        Y[:, 3] = np.round(Y[:, 3])
+        Y[rng.integers(0, 120, 40), rng.integers(0, 25, 40)] = np.nan
+        x[5] = np.nan
+        return x, Y
+    
+    def test_matches_scipy(self, data):
+        """Test batched results equal per-column scipy calls."""
+        x, Y = data
+        pearson_r, pearson_p, n = CorrelationEngine.pearson(x, Y)
+        spearman_r, spearman_p, _ = CorrelationEngine.spearman(x, Y)
+        
+        for j in range(Y.shape[1]):
+            valid = ~np.isnan(x) & ~np.isnan(Y[:, j])
+            assert n[j] == valid.sum()
+            expected = stats.pearsonr(x[valid], Y[valid, j])
+            assert pearson_r[j] == pytest.approx(expected[0], rel=1e-10)
+            assert pearson_p[j] == pytest.approx(expected[1], rel=1e-8)
+            expected = stats.spearmanr(x[valid], Y[valid, j])
+            assert spearman_r[j] == pytest.approx(expected[0], rel=1e-10)
+            assert spearman_p[j] == pytest.approx(expected[1], rel=1e-8)
+    
+    def test_analyzer_skips_sparse_factors(self, data):
+        """Test factors with fewer than 3 pairs are dropped like before."""
+        x, Y = data
+        df = pd.DataFrame(Y, columns=[f"Factor {i}" for i in range(Y.shape[1])])
+        df["Sparse"] = np.nan
+        df.loc[:1, "Sparse"] = [1.0, 2.0]
+        df["Country name"] = [f"Country {i}" for i in range(len(df))]
+        df["Ladder score"] = x
+        
+        pearson, spearman = HappinessAnalyzer(df).calculate_correlations()
+        assert "Sparse" not in pearson.index
+        assert len(pearson) == len(spearman) == Y.shape[1]
+        assert pearson["Correlation"].abs().is_monotonic_decreasing
+    
+    def test_cross_matches_pandas(self, data):
+        """Test full pairwise matrix equals DataFrame.corr."""
+        _, Y = data
+        df = pd.DataFrame(Y)
+        for method in ["pearson", "spearman"]:
+            r, p, n = CorrelationEngine.cross(Y, Y, method)
+            np.testing.assert_allclose(r, df.corr(method).to_numpy(), atol=1e-12)
+            assert n[0, 0] == df[0].notna().sum()
+            assert np.allclose(np.diag(p), 0.0)
+    
+    def test_correlation_matrix_incremental(self):
+        """Test matrix cache recomputes only added or changed factors."""
+        loader = DataLoader("data", use_cache=False)
+        analyzer = HappinessAnalyzer(loader.load_whr_data())
+        corr, pvals = analyzer.get_correlation_matrix()
+        numeric = analyzer.whr_data.select_dtypes(include=[np.number])
+        np.testing.assert_allclose(corr.to_numpy(), numeric.corr().to_numpy(), atol=1e-12)
+        assert corr.shape == pvals.shape == (numeric.shape[1], numeric.shape[1])
+        
+        computed = analyzer.matrix_stats["columns_computed"]
+        analyzer.add_factor("Noise", np.random.default_rng(0).normal(size=len(analyzer.whr_data)))
+        corr, _ = analyzer.get_correlation_matrix()
+        assert analyzer.matrix_stats["columns_computed"] == computed + 1
+        assert corr.loc["Noise", "Ladder score"] == pytest.approx(
+            analyzer.whr_data["Noise"].corr(analyzer.whr_data["Ladder score"]))
+        
+        analyzer.remove_factor("Noise")
+        corr, _ = analyzer.get_correlation_matrix()
+        assert "Noise" not in corr.index
+        assert analyzer.matrix_stats["columns_computed"] == computed + 1
+    
+    def test_rank_matches_scipy(self):
+        """Test vectorized ranking equals scipy rankdata with ties."""
+        values = np.round(np.random.default_rng(1).normal(size=(20, 15, 3)))
+        for axis in range(3):
+            np.testing.assert_allclose(CorrelationEngine.rank(values, axis), stats.rankdata(values, axis=axis))
+    
+    def test_bootstrap_deterministic_across_workers(self, data):
+        """Test bootstrap intervals depend on the seed, not the worker count."""
+        x, Y = data
+        inline = CorrelationEngine.bootstrap(x, Y[:, :5], 600, "spearman", max_workers=1, block_size=200)
+        pooled = CorrelationEngine.bootstrap(x, Y[:, :5], 600, "spearman", max_workers=2, block_size=200)
+        for key in ["lower", "upper", "std_error"]:
+            np.testing.assert_array_equal(inline[key], pooled[key])
+        
+        r = CorrelationEngine.spearman(x, Y[:, :5])[0]
+        assert np.all((inline["lower"] <= r) & (r <= inline["upper"]))
+    
+    def test_bootstrap_intervals_cached(self):
+        """Test analyzer bootstrap intervals are cached with the point estimates."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        intervals = analyzer.calculate_bootstrap_intervals(n_resamples=500, max_workers=1)
+        pearson, _ = analyzer.calculate_correlations()
+        
+        assert list(intervals.index) == list(pearson.index)
+        np.testing.assert_allclose(intervals["Correlation"], pearson["Correlation"])
+        assert (intervals["CI lower"] <= intervals["Correlation"]).all()
+        assert (intervals["Correlation"] <= intervals["CI upper"]).all()
+        
+        again = analyzer.calculate_bootstrap_intervals(n_resamples=500, max_workers=1)
+        pd.testing.assert_frame_equal(intervals, again)
+        assert len(analyzer._bootstrap_cache) == 1
+    
+    def test_permutation_test_early_stopping(self, data):
+        """Test permutation p-values track parametric ones and stop early."""
+        x, Y = data
+        full = CorrelationEngine.permutation_test(x, Y, n_permutations=4000, early_stop=False)
+        early = CorrelationEngine.permutation_test(x, Y, n_permutations=4000)
+        parametric = CorrelationEngine.pearson(x, Y)[1]
+        
+        assert np.all(full["permutations"] == 4000)
+        assert early["permutations"].sum() < full["permutations"].sum()
+        np.testing.assert_allclose(full["p_values"], parametric, atol=0.03)
+        decided = early["permutations"] < 4000
+        assert np.array_equal(early["p_values"][decided] < 0.05, parametric[decided] < 0.05)
+    
+    def test_significant_factors_permutation(self):
+        """Test permutation significance mode on real data."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        pearson, spearman = analyzer.calculate_correlations()
+        parametric = analyzer.get_significant_factors(pearson, spearman)
+        permutation = analyzer.get_significant_factors(pearson, spearman, method="permutation",
+                                                       n_permutations=2000)
+        
+        assert set(permutation) == set(parametric)
+        for stats_dict in permutation.values():
+            assert stats_dict["pearson_p"] >= 1 / 2001
+        with pytest.raises(ValueError):
+            analyzer.get_significant_factors(pearson, spearman, method="bayesian")
+    
+    def test_grouped_matches_per_group(self, data):
+        """Test one grouped pass equals correlating each group separately."""
+        x, Y = data
+        labels = np.random.default_rng(2).integers(-1, 4, len(x))
+        for method in ["pearson", "spearman"]:
+            r, p, n = CorrelationEngine.grouped(x, Y, labels, 4, method)
+            single = CorrelationEngine.pearson if method == "pearson" else CorrelationEngine.spearman
+            for group in range(4):
+                rows = labels == group
+                expected = single(x[rows], Y[rows])
+                np.testing.assert_allclose(r[group], expected[0], atol=1e-12)
+                np.testing.assert_allclose(p[group], expected[1], rtol=1e-8)
+                np.testing.assert_array_equal(n[group], expected[2])
+    
+    def test_grouped_correlations_by_region(self):
+        """Test analyzer region grid against filtered calculate_correlations."""
+        whr_data = DataLoader("data", use_cache=False).load_whr_data()
+        regions = np.random.default_rng(3).choice(["North", "South", "East"], len(whr_data))
+        whr_data["Regional indicator"] = pd.Categorical(regions)
+        analyzer = HappinessAnalyzer(whr_data)
+        
+        grid, pvals = analyzer.calculate_grouped_correlations(method="spearman")
+        assert list(grid.index) == ["East", "North", "South"]
+        assert "Regional indicator" not in grid.columns
+        _, expected = HappinessAnalyzer(whr_data[regions == "North"]).calculate_correlations()
+        np.testing.assert_allclose(grid.loc["North", expected.index], expected["Correlation"], atol=1e-12)
+        np.testing.assert_allclose(pvals.loc["North", expected.index], expected["P-value"], rtol=1e-8)
+        
+        nordic, _ = analyzer.calculate_grouped_correlations({c: "Nordic" for c in analyzer.NORDIC_COUNTRIES})
+        assert list(nordic.index) == ["Nordic"]
+        with pytest.raises(ValueError):
+            analyzer.calculate_grouped_correlations("Continent")
+
+    
+    def test_partial_matches_residual_regression(self, data):
+        """Test precision-matrix partial correlations equal residual correlations."""
+        x, Y = data
+        Z = np.column_stack([np.nan_to_num(Y[:, 0]), np.random.default_rng(4).normal(size=len(x))])
+        r, p, n = CorrelationEngine.partial(x, Y[:, 1:], Z)
+        
+        for j in range(Y.shape[1] - 1):
+            rows = ~np.isnan(x) & ~np.isnan(Y[:, j + 1])
+            design = np.column_stack([np.ones(rows.sum()), Z[rows]])
+            residuals = [v - design @ np.linalg.lstsq(design, v, rcond=None)[0] for v in (x[rows], Y[rows, j + 1])]
+            expected = stats.pearsonr(*residuals)[0]
+            assert n[j] == rows.sum()
+            assert r[j] == pytest.approx(expected, abs=1e-10)
+            t = expected * np.sqrt((rows.sum() - 4) / (1 - expected ** 2))
+            assert p[j] == pytest.approx(2 * stats.t.sf(abs(t), rows.sum() - 4), rel=1e-8)
+    
+    def test_partial_correlations_analyzer(self):
+        """Test analyzer partial correlations with and without covariates."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        pearson, _ = analyzer.calculate_correlations()
+        unadjusted = analyzer.calculate_partial_correlations([])
+        np.testing.assert_allclose(unadjusted["Correlation"], pearson["Correlation"], atol=1e-12)
+        
+        gdp = "Explained by: Log GDP per capita"
+        partial = analyzer.calculate_partial_correlations([gdp])
+        assert gdp not in partial.index
+        np.testing.assert_allclose(partial["Zero-order"], pearson.loc[partial.index, "Correlation"])
+        assert (partial["Correlation"].abs() < partial["Zero-order"].abs()).loc[
+            "Explained by: Healthy life expectancy"]
+        with pytest.raises(ValueError):
+            analyzer.calculate_partial_correlations(["Unknown"])
+
+    
+    def test_jackknife_matches_refits(self, data):
+        """Test closed-form leave-one-out correlations equal explicit refits."""
+        x, Y = data
+        loo, r = CorrelationEngine.jackknife(x, Y[:, :6])
+        np.testing.assert_allclose(r, CorrelationEngine.pearson(x, Y[:, :6])[0], atol=1e-12)
+        
+        for i in [0, 5, 17, 60]:
+            for j in range(6):
+                rows = ~np.isnan(x) & ~np.isnan(Y[:, j])
+                if not rows[i]:
+                    assert np.isnan(loo[i, j])
+                    continue
+                rows[i] = False
+                assert loo[i, j] == pytest.approx(stats.pearsonr(x[rows], Y[rows, j])[0], abs=1e-10)
+    
+    def test_country_influence(self):
+        """Test analyzer influence matrix for Finland."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        result = analyzer.calculate_influence()
+        influence = result["influence"]
+        assert influence.shape == (len(analyzer.whr_data), len(analyzer.calculate_correlations()[0]))
+        
+        factor = "Explained by: Social support"
+        without = analyzer.whr_data[analyzer.whr_data["Country name"] != "Finland"]
+        expected = without["Ladder score"].corr(without[factor])
+        assert result["loo"].loc["Finland", factor] == pytest.approx(expected, abs=1e-12)
+        full = analyzer.whr_data["Ladder score"].corr(analyzer.whr_data[factor])
+        assert influence.loc["Finland", factor] == pytest.approx(full - expected, abs=1e-12)
+
+
+class TestRankTable:
+    """Test precomputed rank table."""
+    
+    @pytest.fixture
+    def values(self):
+        """Create metrics with ties and missing values."""
+        rng = np.random.default_rng(0)
+        values = np.round(rng.normal(size=(40, 5)), 1)
+        values[rng.integers(0, 40, 10), rng.integers(0, 5, 10)] = np.nan
+        return values
+    
+    def test_global_ranks(self, values):
+        """Test ranks match descending order with ties broken by row."""
+        table = RankTable(values, list("abcde"))
+        for j in range(values.shape[1]):
+            col = values[:, j]
+            valid = col[~np.isnan(col)]
+            for i in range(len(col)):
+                expected = 0 if np.isnan(col[i]) else (valid > col[i]).sum() + (col[:i] == col[i]).sum() + 1
+                assert table.ranks[i, j] == expected
+        np.testing.assert_array_equal(table.counts, (~np.isnan(values)).sum(axis=0))
+    
+    def test_group_ranks(self, values):
+        """Test ranks within a peer group equal ranks of the subset."""
+        table = RankTable(values, list("abcde"))
+        rows = np.array([2, 5, 11, 30, 39])
+        table.add_group("peers", rows)
+        ranks, counts = table.group_ranks("peers")
+        
+        np.testing.assert_array_equal(ranks[rows], RankTable.compute_ranks(values[rows]))
+        assert ranks.sum(axis=1)[np.setdiff1d(np.arange(40), rows)].sum() == 0
+        assert table.rank(rows[0], "a", "peers") == ranks[rows[0], 0]
+        np.testing.assert_array_equal(counts, (~np.isnan(values[rows])).sum(axis=0))
+
+
+class TestDriverModel:
+    """Test batched multivariate driver model."""
+    
+    @pytest.fixture
+    def data(self):
+        """Create drivers with known effects and a few missing rows."""
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(150, 4)), columns=list("abcd"))
+        y = pd.Series(2 * X["a"] - X["b"] + 0.5 * rng.normal(size=150))
+        X.iloc[:3, 1] = np.nan
+        return X, y
+    
+    def test_matches_sklearn_ridge(self, data):
+        """Test every batched subset equals a weighted sklearn fit."""
+        from sklearn.linear_model import Ridge
+        from sklearn.preprocessing import StandardScaler
+        
+        X, y = data
+        weights = DriverModel.bootstrap_weights(len(X), 4, seed=1)
+        result = DriverModel(alpha=2.0).fit(X, y, weights)
+        
+        complete = X.notna().all(axis=1).to_numpy()
+        Xs = StandardScaler().fit_transform(X[complete])
+        ys = (y[complete] - y[complete].mean()) / y[complete].std(ddof=0)
+        for s in range(len(weights)):
+            model = Ridge(alpha=2.0).fit(Xs, ys, sample_weight=weights[s, complete])
+            np.testing.assert_allclose(result["coefficients"].iloc[s], model.coef_, atol=1e-8)
+            assert result["r2"].iloc[s] == pytest.approx(model.score(Xs, ys, sample_weight=weights[s, complete]))
+    
+    def test_leave_one_group_out(self, data):
+        """Test leave-one-group-out fits equal fits on the remaining rows."""
+        X, y = data
+        labels = np.arange(len(X)) % 3
+        weights, names = DriverModel.group_weights(labels, ["g0", "g1", "g2"], leave_out=True)
+        result = DriverModel().fit(X, y, weights, names)
+        
+        assert list(result["coefficients"].index) == ["Without g0", "Without g1", "Without g2"]
+        
+        def raw_coefficients(coef, X_fit, y_fit):
+            """Convert standardized coefficients back to original units."""
+            complete = X_fit.notna().all(axis=1)
+            return coef * y_fit[complete].std(ddof=0) / X_fit[complete].std(ddof=0)
+        
+        keep = labels != 1
+        subset = DriverModel().fit(X[keep], y[keep])
+        np.testing.assert_allclose(
+            raw_coefficients(result["coefficients"].loc["Without g1"], X, y),
+            raw_coefficients(subset["coefficients"].iloc[0], X[keep], y[keep]))
+    
+    def test_analyzer_driver_modes(self):
+        """Test analyzer exposes full, bootstrap and group fits."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        full = analyzer.fit_driver_model()
+        drivers = list(full["coefficients"].columns)
+        assert all(col.startswith("Explained by:") for col in drivers)
+        assert 0 < full["r2"].iloc[0] < 1
+        
+        boot = analyzer.fit_driver_model(mode="bootstrap", n_resamples=200)
+        assert boot["coefficients"].shape == (200, len(drivers))
+        assert (boot["summary"]["Lower"] <= boot["summary"]["Upper"]).all()
+        
+        with pytest.raises(ValueError):
+            analyzer.fit_driver_model(mode="groups")
+
+
+class TestSufficientStatistics:
+    """Test incremental sufficient-statistics store."""
+    
+    @pytest.fixture
+    def frame(self):
+        """Create offset, differently scaled columns with missing values."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.normal(size=(200, 4)) * [1, 10, 100, 1] + [1000, 5, -3, 0],
+                          columns=list("abcd"))
+        df.iloc[rng.integers(0, 200, 30), rng.integers(0, 4, 30)] = np.nan
+        return df
+    
+    def test_merge_matches_pandas(self, frame):
+        """Test merged partitions equal whole-frame pandas statistics."""
+        stats_store = SufficientStatistics.from_frame(frame.iloc[:120])
+        stats_store.merge(SufficientStatistics.from_frame(frame.iloc[120:]))
+        
+        np.testing.assert_allclose(stats_store.correlation(), frame.corr(), atol=1e-10)
+        np.testing.assert_allclose(stats_store.covariance(), frame.cov(), rtol=1e-9)
+        np.testing.assert_allclose(stats_store.means(), frame.mean())
+        np.testing.assert_allclose(stats_store.variances(), frame.var())
+    
+    def test_remove_and_update(self, frame):
+        """Test removing and revising rows equals recomputing."""
+        stats_store = SufficientStatistics.from_frame(frame)
+        stats_store.remove(frame.iloc[:50])
+        revised = frame.iloc[60:70] * 2
+        stats_store.update(frame.iloc[60:70], revised)
+        
+        expected = frame.iloc[50:].copy()
+        expected.iloc[10:20] = revised.to_numpy()
+        np.testing.assert_allclose(stats_store.correlation(), expected.corr(), atol=1e-10)
+        
+        with pytest.raises(ValueError):
+            SufficientStatistics.from_frame(frame.iloc[:5]).remove(frame.iloc[:10])
+    
+    def test_analyzer_update_rows(self):
+        """Test streaming correlations follow inserted and revised countries."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        pearson, _ = analyzer.calculate_correlations()
+        np.testing.assert_allclose(analyzer.get_streaming_correlations(), pearson, atol=1e-10)
+        
+        rows = analyzer.whr_data.iloc[[0, 5]].copy()
+        rows["Country name"] = ["Finland", "Atlantis"]
+        rows["Ladder score"] = [7.9, 3.0]
+        analyzer.update_rows(rows)
+        
+        pearson, _ = analyzer.calculate_correlations()
+        streamed = analyzer.get_streaming_correlations()
+        np.testing.assert_allclose(streamed.sort_index(), pearson.sort_index(), atol=1e-10)
+        assert analyzer.get_country_profile("Finland")["score"] == pytest.approx(7.9)
+        assert "Atlantis" in analyzer.country_index
+    
+    def test_partial_column_revision(self):
+        """Test revising only some columns keeps the store equal to a recompute."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        analyzer.update_rows(pd.DataFrame({"Country name": ["Finland", "Atlantis"], "Ladder score": [5.0, 4.0]}))
+        
+        assert len(analyzer.whr_data) == 144
+        assert analyzer.get_country_profile("Finland")["score"] == pytest.approx(5.0)
+        expected = SufficientStatistics.from_frame(analyzer.whr_data, analyzer.statistics.columns)
+        np.testing.assert_array_equal(analyzer.statistics.count, expected.count)
+        np.testing.assert_allclose(analyzer.statistics.correlation(), expected.correlation(), atol=1e-10)
+    
+    def test_failed_update_leaves_store_unchanged(self, frame):
+        """Test update validates both row sets before changing the sums."""
+        stats_store = SufficientStatistics.from_frame(frame)
+        before = stats_store.correlation()
+        with pytest.raises(ValueError):
+            stats_store.update(frame.iloc[:3], frame.iloc[:3, :1])
+        np.testing.assert_array_equal(stats_store.count, SufficientStatistics.from_frame(frame).count)
+        pd.testing.assert_frame_equal(stats_store.correlation(), before)
+
+
+class TestResultCache:
+    """Test content-addressed result cache."""
+    
+    @pytest.fixture
+    def frame(self):
+        """Create a small input frame."""
+        return pd.DataFrame({"Country name": ["A", "B", "C"], "Ladder score": [7.0, 6.0, 5.0]})
+    
+    def test_content_addressed_keys(self, frame):
+        """Test keys depend on frame content and parameters only."""
+        key = ResultCache.key(frame, task="x", p=0.05)
+        assert key == ResultCache.key(frame.copy(), p=0.05, task="x")
+        assert key != ResultCache.key(frame, task="x", p=0.01)
+        
+        changed = frame.copy()
+        changed.loc[1, "Ladder score"] = 6.5
+        assert key != ResultCache.key(changed, task="x", p=0.05)
+    
+    def test_keys_depend_on_code_version(self, frame, monkeypatch):
+        """Test editing the analysis code invalidates cached results."""
+        key = ResultCache.key(frame, task="x")
+        monkeypatch.setattr(ResultCache, "_code_version", "edited")
+        assert ResultCache.key(frame, task="x") != key
+    
+    def test_entries_are_not_unpickled(self, tmp_path, frame):
+        """Test a pickle planted in the cache directory is discarded, not loaded."""
+        import pickle
+        import zlib
+        cache = ResultCache(tmp_path)
+        path = cache._entry_path("a" * 40)
+        path.write_bytes(zlib.compress(pickle.dumps({"frame": frame})))
+        assert cache.get("a" * 40) is None
+        assert not path.exists()
+        
+        results = {"frame": frame.set_index("Country name"), "r": np.float64(0.5),
+                   "ranks": np.arange(3), "rows": [{"Rank": np.int64(1)}]}
+        assert cache.put("b" * 40, results)
+        loaded = cache.get("b" * 40)
+        pd.testing.assert_frame_equal(loaded["frame"], results["frame"])
+        np.testing.assert_array_equal(loaded["ranks"], results["ranks"])
+        assert loaded["r"] == 0.5 and loaded["rows"] == [{"Rank": 1}]
+    
+    def test_roundtrip_and_lru_eviction(self, tmp_path, frame):
+        """Test results persist across instances and old entries are evicted."""
+        cache = ResultCache(tmp_path)
+        assert cache.put("a" * 40, {"frame": frame, "value": 1})
+        
+        fresh = ResultCache(tmp_path)
+        loaded = fresh.get("a" * 40)
+        pd.testing.assert_frame_equal(loaded["frame"], frame)
+        assert fresh.get("b" * 40) is None
+        assert fresh.get_stats()["hits"] == 1 and fresh.get_stats()["misses"] == 1
+        
+        payload = np.random.default_rng(0).bytes(4000)
+        small = ResultCache(tmp_path, max_bytes=9000)
+        for i, name in enumerate("cde"):
+            small.put(name * 40, payload)
+            os.utime(small._entry_path(name * 40), ns=(i * 10 ** 9, i * 10 ** 9))
+        small.put("f" * 40, payload)
+        assert small.get("c" * 40) is None
+        assert small.get("f" * 40) == payload
+        assert small.get_stats()["bytes"] <= 9000
+    
+    def test_full_analysis_served_from_disk(self, tmp_path):
+        """Test a fresh analyzer reuses results written by another."""
+        whr_data = DataLoader("data", use_cache=False).load_whr_data()
+        first = HappinessAnalyzer(whr_data).run_full_analysis(ResultCache(tmp_path))
+        
+        cache = ResultCache(tmp_path)
+        second = HappinessAnalyzer(whr_data).run_full_analysis(cache)
+        stats_after = cache.get_stats()
+        assert (stats_after["hits"], stats_after["misses"], stats_after["entries"]) == (1, 0, 1)
+        pd.testing.assert_frame_equal(first["pearson"], second["pearson"])
+        assert first["finland_profile"]["global_rank"] == second["finland_profile"]["global_rank"]
+
+
+class TestCountrySimilarityIndex:
+    """Test nearest-neighbour country similarity index."""
+    
+    @pytest.fixture
+    def frame(self):
+        """Create random factor vectors with a few missing values."""
+        rng = np.random.default_rng(5)
+        values = rng.normal(size=(60, 4)) * [1.0, 10.0, 0.1, 3.0]
+        values[[3, 17], [1, 2]] = np.nan
+        frame = pd.DataFrame(values, columns=["a", "b", "c", "d"])
+        frame.insert(0, "Country name", [f"Country {i}" for i in range(60)])
+        return frame
+    
+    @staticmethod
+    def brute_force(frame, features):
+        """Standardized pairwise distances computed directly."""
+        values = frame[features]
+        scaled = ((values - values.mean()) / values.std(ddof=0)).fillna(0).to_numpy()
+        return np.linalg.norm(scaled[:, None, :] - scaled[None, :, :], axis=2)
+    
+    def test_knn_and_radius_match_brute_force(self, frame):
+        """Test queries agree with exhaustive distance computation."""
+        features = ["a", "b", "c", "d"]
+        index = CountrySimilarityIndex.from_frame(frame, "Country name", features)
+        distances = self.brute_force(frame, features)
+        
+        result = index.knn(" country 3 ", k=5)
+        expected = np.argsort(np.where(np.arange(60) == 3, np.inf, distances[3]))[:5]
+        assert result["Country"].tolist() == [f"Country {i}" for i in expected]
+        np.testing.assert_allclose(result["Distance"], distances[3, expected])
+        
+        within = index.radius("Country 10", 2.0)
+        expected = set(np.flatnonzero(distances[10] <= 2.0)) - {10}
+        assert set(within["Country"]) == {f"Country {i}" for i in expected}
+        assert within["Distance"].is_monotonic_increasing
+        
+        with pytest.raises(KeyError):
+            index.knn("Atlantis")
+    
+    def test_incremental_updates_match_rebuild(self, frame):
+        """Test buffered inserts and revisions answer like a rebuilt tree."""
+        features = ["a", "b", "c", "d"]
+        index = CountrySimilarityIndex.from_frame(frame, "Country name", features,
+                                                  rebuild_threshold=100)
+        revised = frame.iloc[[2, 8]].copy()
+        revised[features] = [[0.1, 1.0, 0.0, 0.5], [5.0, -20.0, 0.3, 1.0]]
+        added = pd.DataFrame({"Country name": ["Atlantis"], "a": [0.2], "b": [1.5], "c": [0.01], "d": [0.4]})
+        for rows in (revised, added):
+            index.update(rows["Country name"].tolist(), rows[features].to_numpy())
+        
+        queries = ["Country 2", "Country 8", "Atlantis", "Country 30"]
+        buffered = [(index.knn(country, 6), index.radius(country, 1.5)) for country in queries]
+        
+        index.rebuild()
+        for country, (knn, within) in zip(queries, buffered):
+            pd.testing.assert_frame_equal(knn, index.knn(country, 6))
+            pd.testing.assert_frame_equal(within, index.radius(country, 1.5))
+        assert "Atlantis" in index and len(index) == 61
+    
+    def test_analyzer_similar_countries(self):
+        """Test analyzer neighbours follow row updates."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        similar = analyzer.find_similar_countries("Finland", k=5)
+        assert len(similar) == 5
+        assert "Finland" not in similar["Country"].tolist()
+        assert analyzer.score_col in similar.columns
+        
+        twin = analyzer.whr_data[analyzer.whr_data["Country name"] == "Finland"].copy()
+        twin["Country name"] = "New Finland"
+        analyzer.update_rows(twin)
+        similar = analyzer.find_similar_countries("Finland", k=1)
+        assert similar["Country"].iloc[0] == "New Finland"
+        assert similar["Distance"].iloc[0] == pytest.approx(0.0)
+
+
+class TestPanelCube:
+    """Test multi-year panel mode."""
+    
+    @pytest.fixture
+    def panel(self):
+        """Create a three-year panel by perturbing the 2024 release."""
+        whr_data = DataLoader("data", use_cache=False).load_whr_data()
+        rng = np.random.default_rng(1)
+        frames = []
+        for year in [2022, 2023, 2024]:
+            frame = whr_data.copy()
+            numeric = frame.select_dtypes(include=[np.number]).columns
+            frame[numeric] = frame[numeric] + rng.normal(scale=0.1, size=frame[numeric].shape)
+            if year == 2022:
+                frame = frame.iloc[5:]
+            frame.insert(1, "Year", year)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+    
+    def test_correlations_and_ranks_match_snapshots(self, panel):
+        """Test per-year statistics equal single-snapshot analysis."""
+        analyzer = HappinessAnalyzer(panel, year_col="Year")
+        assert len(analyzer.whr_data) == 143 and "Year" not in analyzer.whr_data.columns
+        pearson_by_year, pvalues_by_year = analyzer.get_panel_correlations()
+        spearman_by_year, _ = analyzer.get_panel_correlations("spearman")
+        ranks = analyzer.get_panel_ranks()
+        
+        for year in [2022, 2023, 2024]:
+            snapshot = HappinessAnalyzer(panel[panel["Year"] == year].drop(columns="Year"))
+            pearson, spearman = snapshot.calculate_correlations()
+            np.testing.assert_allclose(pearson_by_year.loc[year, pearson.index], pearson["Correlation"], atol=1e-12)
+            np.testing.assert_allclose(pvalues_by_year.loc[year, pearson.index], pearson["P-value"], rtol=1e-8)
+            np.testing.assert_allclose(spearman_by_year.loc[year, spearman.index], spearman["Correlation"], atol=1e-12)
+            
+            expected = snapshot.rank_table.ranks[:, snapshot.rank_table.metric_position("Ladder score")]
+            found = ranks[year].reindex(snapshot.whr_data["Country name"]).to_numpy()
+            np.testing.assert_array_equal(found, expected)
+    
+    def test_rank_changes(self, panel):
+        """Test year-over-year rank changes are rank differences."""
+        analyzer = HappinessAnalyzer(panel, year_col="Year")
+        ranks = analyzer.get_panel_ranks()
+        changes = analyzer.get_rank_changes()
+        
+        assert list(changes.columns) == [2023, 2024]
+        assert pd.isna(changes.loc["Finland", 2023])
+        assert changes.loc["Denmark", 2024] == ranks.loc["Denmark", 2023] - ranks.loc["Denmark", 2024]
+        assert list(analyzer.get_rank_changes(periods=2).columns) == [2024]
+    
+    def test_peer_groups_by_year(self, panel):
+        """Test per-year group comparisons equal snapshot comparisons."""
+        analyzer = HappinessAnalyzer(panel, year_col="Year")
+        groups = {country: "Nordic" for country in analyzer.NORDIC_COUNTRIES}
+        groups.update({"Germany": "West", "France": "West", "Italy": "West"})
+        by_year = analyzer.compare_peer_groups_by_year(groups)
+        
+        snapshot = HappinessAnalyzer(panel[panel["Year"] == 2023].drop(columns="Year"))
+        expected = snapshot.compare_peer_groups(groups)
+        for stat in ["mean", "std", "count"]:
+            np.testing.assert_allclose(by_year[stat].loc[2023].to_numpy(), expected[stat].to_numpy())
+        pd.testing.assert_frame_equal(by_year["ranks"].loc[2023].sort_index(), expected["ranks"].sort_index(),
+                                      check_dtype=False, check_names=False)
+        
+        with pytest.raises(ValueError):
+            HappinessAnalyzer(panel[panel["Year"] == 2024]).get_panel_ranks()
+
+
+class TestRankSimulator:
+    """Test Monte Carlo rank uncertainty."""
+    
+    @pytest.fixture
+    def simulator(self):
+        """Create scores with overlapping intervals."""
+        scores = np.array([7.0, 6.9, 5.0, 4.0, np.nan, 6.95])
+        return RankSimulator(scores, scores - 0.2, scores + 0.2, list("ABCDEF"))
+    
+    def test_deterministic_across_workers(self, simulator):
+        """Test rank counts depend on the seed, not the worker count."""
+        inline = simulator.simulate(3000, seed=1, chunk_size=700, max_workers=1)
+        pooled = simulator.simulate(3000, seed=1, chunk_size=700, max_workers=2)
+        np.testing.assert_array_equal(inline, pooled)
+        assert inline.shape == (5, 5)
+        np.testing.assert_array_equal(inline.sum(axis=0), 3000)
+        np.testing.assert_array_equal(inline.sum(axis=1), 3000)
+    
+    def test_summary(self, simulator):
+        """Test summary statistics of the rank distributions."""
+        summary = simulator.summarize(simulator.simulate(4000, chunk_size=1000))
+        assert list(summary.index) == ["A", "F", "B", "C", "D"]
+        assert summary["P(#1)"].sum() == pytest.approx(1.0)
+        assert summary.loc["C", "P(#1)"] == 0.0
+        assert (summary.loc["C", "Rank lower"], summary.loc["C", "Rank upper"]) == (4, 4)
+        assert summary.loc["A", "Rank lower"] == 1 and summary.loc["A", "Rank upper"] == 3
+        
+        fixed = RankSimulator(np.array([2.0, 3.0, 1.0]), np.full(3, np.nan), np.full(3, np.nan), list("xyz"))
+        summary = fixed.summarize(fixed.simulate(100))
+        np.testing.assert_array_equal(summary["Mean rank"], summary["Rank"])
+    
+    def test_analyzer_rank_uncertainty(self):
+        """Test simulated ranks are consistent with the point profile."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        result = analyzer.simulate_rank_uncertainty(n_draws=2000, max_workers=1)
+        summary = result["summary"]
+        
+        finland = summary.loc["Finland"]
+        assert finland["Rank"] == analyzer.get_finland_profile()["global_rank"]
+        assert finland["Rank lower"] <= finland["Rank"] <= finland["Rank upper"]
+        np.testing.assert_allclose(result["distribution"].sum(axis=1), 1.0)
+        assert result["distribution"].loc["Finland", 1] == finland["P(#1)"]
+        
+        cached = analyzer.simulate_rank_uncertainty(n_draws=2000, max_workers=1)
+        pd.testing.assert_frame_equal(cached["summary"], summary)
+        assert len(analyzer._rank_uncertainty_cache) == 1
+
+
+class TestGapTensor:
+    """Test all-pairs component gap tensor."""
+    
+    @pytest.fixture
+    def components(self):
+        """Create random component values for many countries."""
+        values = np.random.default_rng(6).normal(size=(90, 5))
+        values[7, 2] = np.nan
+        return values, [f"Country {i}" for i in range(90)], list("abcde")
+    
+    def test_blocked_matches_materialized(self, components):
+        """Test blocked mode gives the same gaps as the full tensor."""
+        values, names, parts = components
+        full = GapTensor(values, names, parts)
+        blocked = GapTensor(values, names, parts, max_bytes=20_000)
+        assert not full.blocked and blocked.blocked
+        assert full.tensor.shape == (90, 90, 5)
+        
+        np.testing.assert_array_equal(blocked.gaps("Country 3", "country 40"), values[3] - values[40])
+        np.testing.assert_array_equal(full.gaps("Country 3", "Country 40"), values[3] - values[40])
+        for component in [None, "c"]:
+            pd.testing.assert_frame_equal(blocked.matrix(component), full.matrix(component))
+        assert sum(1 for _ in blocked.iter_blocks()) == -(-90 // blocked.block_rows)
+        with pytest.raises(KeyError):
+            full.gaps("Country 3", "Atlantis")
+    
+    def test_explain_gap(self):
+        """Test Finland's gaps decompose its ladder score lead."""
+        analyzer = HappinessAnalyzer(DataLoader("data", use_cache=False).load_whr_data())
+        explained = analyzer.explain_gap("Finland", "Denmark")
+        assert len(explained) == 7 and "Dystopia + residual" in explained.index
+        assert explained["Share"].sum() == pytest.approx(1.0)
+        assert explained["Gap"].abs().is_monotonic_decreasing
+        
+        scores = analyzer.whr_data.set_index("Country name")["Ladder score"]
+        assert explained["Gap"].sum() == pytest.approx(scores["Finland"] - scores["Denmark"], abs=5e-3)
+        totals = analyzer.get_gap_matrix()
+        assert totals.loc["Finland", "Denmark"] == pytest.approx(explained["Gap"].sum())
+        assert totals.loc["Denmark", "Finland"] == pytest.approx(-explained["Gap"].sum())
 
 
 if __name__ == "__main__":
@@ -4,12 +4,16 @@ import pytest
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import shutil
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.data.loader import DataLoader
 from src.data.cleaner import DataCleaner
+from src.data.country_index import CountryIndex
+from src.data.profiler import DataProfiler
+from src.data.sketches import BloomFilter, HyperLogLog, KLLSketch, hash_values
 
 
 class TestDataLoader:
@@ -18,7 +22,7 @@ class TestDataLoader:
     @pytest.fixture
     def loader(self):
         """Create DataLoader instance."""
-        return DataLoader("data")
+        return DataLoader("data", use_cache=False)
     
     def test_file_validation(self, loader):
         """Test file validation."""
@@ -63,6 +67,579 @@ class TestDataLoader:
         assert summary["WHR"]["rows"] > 0
 
 
+class TestColumnarCache:
+    """Test columnar CSV cache."""
+    
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        """Create a data directory with a copy of WHR2024.csv."""
+        shutil.copy(Path("data") / "WHR2024.csv", tmp_path / "WHR2024.csv")
+        return tmp_path
+    
+    def test_warm_load_hits_cache(self, data_dir):
+        """Test second load is served from cache with identical content."""
+        cold = DataLoader(str(data_dir)).load_whr_data()
+        
+        loader = DataLoader(str(data_dir))
+        warm = loader.load_whr_data()
+        stats = loader.get_load_statistics()
+        
+        assert stats["cache"]["hits"] == 1
+        assert stats["loads"]["WHR2024"]["source"] == "cache"
+        pd.testing.assert_frame_equal(cold, warm)
+    
+    def test_cache_invalidated_on_change(self, data_dir):
+        """Test modified source file is re-parsed."""
+        DataLoader(str(data_dir)).load_whr_data()
+        
+        csv_path = data_dir / "WHR2024.csv"
+        lines = csv_path.read_text(encoding="utf-8-sig").splitlines()
+        csv_path.write_text("\n".join(lines[:11]) + "\n", encoding="utf-8")
+        
+        loader = DataLoader(str(data_dir))
+        whr = loader.load_whr_data()
+        assert len(whr) == 10
+        assert loader.get_load_statistics()["loads"]["WHR2024"]["source"] == "csv"
+    
+    def test_variants_keep_their_entries(self, data_dir):
+        """Test loads with different parse variants do not evict each other."""
+        for _ in range(2):
+            DataLoader(str(data_dir)).load_whr_data()
+            DataLoader(str(data_dir), use_schema=False).load_whr_data()
+        
+        loader = DataLoader(str(data_dir), use_schema=False)
+        loader.load_whr_data()
+        assert loader.get_load_statistics()["loads"]["WHR2024"]["source"] == "cache"
+        assert len(list((data_dir / ".cache").glob("WHR2024-*"))) == 2
+        
+        csv_path = data_dir / "WHR2024.csv"
+        csv_path.write_text(csv_path.read_text(encoding="utf-8-sig") + "\n", encoding="utf-8")
+        DataLoader(str(data_dir)).load_whr_data()
+        assert len(list((data_dir / ".cache").glob("WHR2024-*"))) == 2
+    
+    def test_categorical_cache_roundtrip(self, tmp_path):
+        """Test categorical schema columns survive the cache."""
+        pd.DataFrame({
+            "Area": ["Finland", "Sweden", "Finland"],
+            "Year": [2010, 2010, 2011],
+            "Value": [1.5, 2.5, np.nan]
+        }).to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        
+        cold = DataLoader(str(tmp_path)).load_food_data()
+        loader = DataLoader(str(tmp_path))
+        warm = loader.load_food_data()
+        assert loader.get_load_statistics()["cache"]["hits"] == 1
+        pd.testing.assert_frame_equal(cold, warm)
+    
+    def test_cache_disabled(self, data_dir):
+        """Test loader works without cache."""
+        loader = DataLoader(str(data_dir), use_cache=False)
+        loader.load_whr_data()
+        assert loader.cache is None
+        assert not (data_dir / ".cache").exists()
+
+
+class TestFoodStreaming:
+    """Test chunked food data ingestion."""
+    
+    @pytest.fixture
+    def food_dir(self, tmp_path):
+        """Create a data directory with a small synthetic food CSV."""
+        food = pd.DataFrame({
+            "Area": ["Finland", "Sweden", "Finland", "Denmark", "Sweden", "Finland", "Denmark"],
+            "Item": ["Fish", "Fish", "Milk", "Fish", "Milk", "Fish", "Milk"],
+            "Element": ["Food supply (kcal/capita/day)"] * 7,
+            "Unit": ["kcal/capita/day"] * 7,
+            "Year": [2010, 2010, 2010, 2011, 2011, 2011, 2011],
+            "Value": [30.0, 25.0, 130.0, 20.0, 110.0, 32.0, np.nan]
+        })
+        food.to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        return tmp_path
+    
+    def test_iter_food_data_chunks(self, food_dir):
+        """Test streaming yields fixed-size chunks covering all rows."""
+        loader = DataLoader(str(food_dir))
+        chunks = list(loader.iter_food_data(chunksize=3))
+        assert [len(c) for c in chunks] == [3, 3, 1]
+        
+        # Chunks carry their own categories, so compare decoded values
+        streamed = pd.concat(chunks, ignore_index=True)
+        full = loader.load_food_data()
+        text_cols = ["Area", "Item", "Element", "Unit"]
+        pd.testing.assert_frame_equal(
+            streamed.astype({c: object for c in text_cols}),
+            full.astype({c: object for c in text_cols})
+        )
+    
+    def test_streamed_aggregation_matches_full(self, food_dir):
+        """Test per-chunk aggregation equals whole-frame aggregation."""
+        loader = DataLoader(str(food_dir))
+        full = DataCleaner.aggregate_food_supply(DataCleaner.clean_food_data(loader.load_food_data()))
+        streamed = DataCleaner.aggregate_food_supply(
+            DataCleaner.clean_food_chunks(loader.iter_food_data(chunksize=2))
+        )
+        pd.testing.assert_frame_equal(full, streamed)
+        assert full.set_index("Area").loc["Finland", "AvgFoodSupply"] == pytest.approx(64.0)
+    
+    def test_correlation_ready_data_with_chunks(self, food_dir):
+        """Test food aggregates are joined onto WHR data from a stream."""
+        whr = pd.DataFrame({
+            "Country name": ["Finland", "Denmark", "Norway"],
+            "Ladder score": [7.7, 7.5, 7.3]
+        })
+        loader = DataLoader(str(food_dir))
+        df, factors = DataCleaner.get_correlation_ready_data(
+            whr, DataCleaner.clean_food_chunks(loader.iter_food_data(chunksize=2)), year=2011
+        )
+        assert "AvgFoodSupply" in factors
+        values = df.set_index("Country name")["AvgFoodSupply"]
+        assert values["Finland"] == pytest.approx(32.0)
+        assert np.isnan(values["Norway"])
+    
+    def test_correlation_ready_data_fao_layout(self, tmp_path):
+        """Test food aggregates join on the area name and average one element."""
+        pd.DataFrame({
+            "Area Code": [67, 54, 67, 67],
+            "Area": ["Finland", "Denmark", "Finland", "Finland"],
+            "Item Code": [2761, 2761, 2848, 2848],
+            "Item": ["Fish", "Fish", "Milk", "Milk"],
+            "Element": ["Food supply (kcal/capita/day)"] * 3 + ["Food supply quantity (tonnes)"],
+            "Year Code": [2011] * 4,
+            "Year": [2011] * 4,
+            "Unit": ["kcal/capita/day"] * 3 + ["tonnes"],
+            "Value": [32.0, 20.0, 130.0, 900_000.0]
+        }).to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        whr = pd.DataFrame({
+            "Country name": ["Finland", "Denmark"],
+            "Ladder score": [7.7, 7.5]
+        })
+        loader = DataLoader(str(tmp_path))
+        food = DataCleaner.clean_food_data(loader.load_food_data())
+        df, factors = DataCleaner.get_correlation_ready_data(whr, food, year=2011)
+        assert "AvgFoodSupply" in factors
+        values = df.set_index("Country name")["AvgFoodSupply"]
+        assert values.notna().all()
+        assert values["Finland"] == pytest.approx(81.0)
+
+
+class TestFilteredLoad:
+    """Test predicate pushdown in filtered loads."""
+    
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        """Create a data directory with WHR and synthetic food data."""
+        shutil.copy(Path("data") / "WHR2024.csv", tmp_path / "WHR2024.csv")
+        areas = ["Finland", "Sweden", "Norway", " finland "]
+        pd.DataFrame({
+            "Area": [areas[i % 4] for i in range(40)],
+            "Item": ["Fish"] * 40,
+            "Year": [1961 + i for i in range(40)],
+            "Value": np.arange(40, dtype=float)
+        }).to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        return tmp_path
+    
+    def test_filtered_csv_matches_cached(self, data_dir):
+        """Test streamed and cached pushdown return the same rows."""
+        cold_loader = DataLoader(str(data_dir))
+        cold = cold_loader.load_filtered("EdibleFoods", countries=["FINLAND"],
+                                         years=(1970, 1990), chunksize=7)
+        assert cold_loader.load_stats["EdibleFoods (filtered)"]["source"] == "csv"
+        assert cold_loader.food_data is None
+        
+        cold_loader.load_food_data()
+        warm_loader = DataLoader(str(data_dir))
+        warm = warm_loader.load_filtered("EdibleFoods", countries=["FINLAND"], years=(1970, 1990))
+        assert warm_loader.load_stats["EdibleFoods (filtered)"]["source"] == "cache"
+        
+        pd.testing.assert_frame_equal(cold, warm)
+        assert cold["Year"].between(1970, 1990).all()
+        assert set(cold["Area"].astype(str).str.strip()) == {"Finland", "finland"}
+        assert len(cold) == 10
+    
+    def test_filtered_no_match(self, data_dir):
+        """Test a filter matching nothing returns an empty frame with columns."""
+        df = DataLoader(str(data_dir)).load_filtered("EdibleFoods", countries=["Atlantis"])
+        assert df.empty
+        assert "Area" in df.columns
+    
+    def test_filtered_unknown_dataset(self, data_dir):
+        """Test unknown dataset names are rejected."""
+        with pytest.raises(ValueError):
+            DataLoader(str(data_dir)).load_filtered("Unknown")
+    
+    def test_get_finland_data_pushdown(self, data_dir):
+        """Test Finland extraction without loading full datasets."""
+        loader = DataLoader(str(data_dir))
+        finland_whr, finland_food = loader.get_finland_data()
+        assert len(finland_whr) == 1
+        assert len(finland_food) == 20
+        assert loader.whr_data is None
+        assert loader.food_data is None
+    
+    def test_filtered_food_fao_layout(self, tmp_path):
+        """Test country filters on the full FAO layout with its Area Code column."""
+        shutil.copy(Path("data") / "WHR2024.csv", tmp_path / "WHR2024.csv")
+        pd.DataFrame({
+            "Area Code": [67, 210, 67, 162],
+            "Area": ["Finland", "Sweden", "Finland", "Norway"],
+            "Item Code": [2761] * 4,
+            "Item": ["Fish"] * 4,
+            "Element": ["Food supply quantity (kg/capita/yr)"] * 4,
+            "Year": [2010, 2010, 2011, 2011],
+            "Unit": ["kg"] * 4,
+            "Value": [30.0, 25.0, 32.0, 40.0]
+        }).to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        
+        cold = DataLoader(str(tmp_path)).load_filtered("EdibleFoods", countries=["finland"], chunksize=2)
+        assert cold["Value"].tolist() == [30.0, 32.0]
+        
+        loader = DataLoader(str(tmp_path))
+        loader.load_food_data()
+        warm_loader = DataLoader(str(tmp_path))
+        warm = warm_loader.load_filtered("EdibleFoods", countries=["finland"])
+        assert warm_loader.load_stats["EdibleFoods (filtered)"]["source"] == "cache"
+        pd.testing.assert_frame_equal(cold, warm, check_categorical=False)
+        
+        _, finland_food = DataLoader(str(tmp_path)).get_finland_data()
+        assert finland_food["Area Code"].tolist() == [67, 67]
+        _, norway_food = loader.get_country_data("Norway")
+        assert norway_food["Value"].tolist() == [40.0]
+
+
+class TestCountryIndex:
+    """Test hashed country index."""
+    
+    def test_lookup_normalizes_names(self):
+        """Test case and whitespace insensitive lookups."""
+        index = CountryIndex.from_series(pd.Series(["Finland", " finland", "Sweden", None, "New  Zealand"]))
+        assert index.positions("FINLAND").tolist() == [0, 1]
+        assert index.positions("new zealand").tolist() == [4]
+        assert index.positions("Atlantis").tolist() == []
+        assert index.positions(["Sweden", "Finland"]).tolist() == [0, 1, 2]
+        assert "sweden" in index
+        assert len(index) == 3
+    
+    def test_categorical_index_matches_object(self):
+        """Test categorical columns index the same as object columns."""
+        values = pd.Series(["Finland", "Sweden", "Finland", np.nan, "Norway"])
+        obj = CountryIndex.from_series(values)
+        cat = CountryIndex.from_series(values.astype("category"))
+        for country in ["Finland", "Sweden", "Norway"]:
+            assert obj.positions(country).tolist() == cat.positions(country).tolist()
+        assert cat.mask("Finland").tolist() == [True, False, True, False, False]
+    
+    def test_non_string_names(self):
+        """Test numeric country columns are normalized as text."""
+        index = CountryIndex.from_series(pd.Series([4, 8, 4, None], dtype=object))
+        assert index.positions("4").tolist() == [0, 2]
+        assert CountryIndex.normalize_series(pd.Series([246, np.nan])).tolist()[0] == "246.0"
+    
+    def test_find_column_prefers_exact_names(self):
+        """Test the FAO "Area Code" column is never taken for country names."""
+        fao = pd.DataFrame({"Area Code": [1], "Area": ["Finland"], "Item Code": [2], "Item": ["Fish"]})
+        assert CountryIndex.find_column(fao) == "Area"
+        assert CountryIndex.find_column(pd.DataFrame(columns=["Area Code", "Area"])) == "Area"
+        assert CountryIndex.find_column(pd.DataFrame({"Code": [1], "Value": [2.0]})) is None
+    
+    def test_loader_builds_index(self):
+        """Test country data served from the index after load."""
+        loader = DataLoader("data", use_cache=False)
+        whr = loader.load_whr_data()
+        assert loader.whr_index is not None
+        finland = loader.whr_index.take(whr, "finland")
+        assert finland["Country name"].tolist() == ["Finland"]
+
+
+class TestParseEngines:
+    """Test configurable CSV parse engines."""
+    
+    def test_invalid_engine(self):
+        """Test unknown engines are rejected."""
+        with pytest.raises(ValueError):
+            DataLoader("data", engine="fast")
+    
+    def test_pyarrow_matches_c_parser(self):
+        """Test pyarrow engine yields the same frame as the C parser."""
+        pytest.importorskip("pyarrow")
+        c_data = DataLoader("data", use_cache=False).load_whr_data()
+        loader = DataLoader("data", use_cache=False, engine="pyarrow")
+        arrow_data = loader.load_whr_data()
+        assert loader.load_stats["WHR2024"]["engine"] == "pyarrow"
+        pd.testing.assert_frame_equal(c_data, arrow_data)
+    
+    def test_pyarrow_failure_falls_back(self, monkeypatch):
+        """Test fallback to the C parser when pyarrow cannot parse."""
+        read_csv = pd.read_csv
+        
+        def fake_read_csv(*args, **kwargs):
+            if kwargs.get("engine") == "pyarrow":
+                raise ImportError("pyarrow unavailable")
+            return read_csv(*args, **kwargs)
+        
+        monkeypatch.setattr(pd, "read_csv", fake_read_csv)
+        loader = DataLoader("data", use_cache=False)
+        loader.engine = "pyarrow"
+        whr = loader.load_whr_data()
+        assert loader.load_stats["WHR2024"]["engine"] == "c"
+        assert whr.columns[0] == "Country name"
+
+
+class TestWhrPanel:
+    """Test multi-year WHR panel loading."""
+    
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        """Create a data directory with two WHR releases."""
+        shutil.copy(Path("data") / "WHR2024.csv", tmp_path / "WHR2024.csv")
+        pd.DataFrame({
+            "Country or region": ["Finland", "Norway"],
+            "Score": [7.8, 7.5],
+            "Freedom": [0.6, 0.65]
+        }).to_csv(tmp_path / "WHR2019.csv", index=False)
+        return tmp_path
+    
+    def test_load_whr_panel(self, data_dir):
+        """Test releases are reconciled into one long-format panel."""
+        loader = DataLoader(str(data_dir))
+        panel = loader.load_whr_panel(max_workers=2)
+        
+        assert sorted(panel["Year"].unique()) == [2019, 2024]
+        assert len(panel) == 145
+        assert "Score" not in panel.columns
+        old = panel[panel["Year"] == 2019].set_index("Country name")
+        assert old.loc["Finland", "Ladder score"] == pytest.approx(7.8)
+        assert old.loc["Norway", "Explained by: Freedom to make life choices"] == pytest.approx(0.65)
+        
+        stats = loader.get_load_statistics()["loads"]["WHR panel"]
+        assert set(stats["files"]) == {"WHR2019", "WHR2024"}
+        assert stats["rows"] == 145
+    
+    def test_load_whr_panel_no_files(self, tmp_path):
+        """Test missing releases raise FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            DataLoader(str(tmp_path)).load_whr_panel()
+
+
+class TestDataProfiler:
+    """Test single-pass data profiler."""
+    
+    @pytest.fixture
+    def frame(self):
+        """Create a frame with duplicates and missing values."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            "Area": rng.choice(["Finland", "Sweden", "Norway"], 60),
+            "Year": rng.integers(1990, 1995, 60),
+            "Value": rng.normal(size=60)
+        })
+        df.loc[::7, "Value"] = np.nan
+        return pd.concat([df, df.iloc[[3, 10, 10, 45]]], ignore_index=True)
+    
+    def test_matches_pandas(self, frame):
+        """Test chunked profile equals whole-frame pandas statistics."""
+        profiler = DataProfiler.profile(frame.iloc[i:i + 9] for i in range(0, len(frame), 9))
+        report = profiler.report()
+        
+        assert report["total_rows"] == len(frame)
+        assert report["duplicate_rows"] == frame.duplicated().sum()
+        assert profiler.missing_values() == frame.isnull().sum().to_dict()
+        
+        expected = frame.describe()
+        for col, stats in profiler.numeric_summary().items():
+            for key in ["count", "mean", "std", "min", "max"]:
+                assert stats[key] == pytest.approx(expected.loc[key, col])
+    
+    def test_merge_matches_single_pass(self, frame):
+        """Test merging partition profiles equals one profile."""
+        left = DataProfiler().update(frame.iloc[:30])
+        right = DataProfiler().update(frame.iloc[30:])
+        merged = left.merge(right)
+        single = DataProfiler().update(frame)
+        
+        assert merged.report()["duplicate_rows"] == single.report()["duplicate_rows"]
+        for col, stats in single.numeric_summary().items():
+            for key, value in stats.items():
+                assert merged.numeric_summary()[col][key] == pytest.approx(value)
+    
+    def test_inferred_memory_of_categoricals(self, frame):
+        """Test inferred memory matches the materialized object columns."""
+        frame = frame.astype({"Area": "category"})
+        frame.loc[5, "Area"] = np.nan
+        inferred = frame.astype({"Area": object, "Year": np.int64})
+        assert DataProfiler._inferred_memory_usage(frame) == inferred.memory_usage(deep=True).sum()
+    
+    def test_summary_statistics_single_pass(self, tmp_path):
+        """Test summary statistics match describe() output."""
+        shutil.copy(Path("data") / "WHR2024.csv", tmp_path / "WHR2024.csv")
+        pd.DataFrame({
+            "Area": ["Finland", "Sweden", "Finland"],
+            "Year": [1961, 2000, 2011],
+            "Value": [1.0, 2.0, 3.0]
+        }).to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        
+        loader = DataLoader(str(tmp_path))
+        summary = loader.get_summary_statistics()
+        expected = loader.whr_data.describe().to_dict()
+        for col, stats in expected.items():
+            for key, value in stats.items():
+                assert summary["WHR"]["numeric_summary"][col][key] == pytest.approx(value)
+        assert summary["Food"]["year_range"] == "1961-2011"
+        assert summary["Food"]["unique_areas"] == 2
+        
+        stream_report = loader.get_food_stream_report(chunksize=2)
+        assert stream_report["total_rows"] == 3
+        assert stream_report["numeric_summary"]["Value"]["mean"] == pytest.approx(2.0)
+
+
+class TestSketches:
+    """Test approximate profiling sketches."""
+    
+    @pytest.fixture
+    def values(self):
+        """Create a large column with known distinct count."""
+        rng = np.random.default_rng(1)
+        return rng.integers(0, 20_000, 100_000)
+    
+    def test_hyperloglog_within_error(self, values):
+        """Test HyperLogLog estimate and merge stay within a few standard errors."""
+        hashes = hash_values(pd.Series(values))
+        hll = HyperLogLog(12).add_hashes(hashes)
+        exact = len(np.unique(values))
+        assert abs(hll.estimate() - exact) / exact < 4 * hll.relative_error
+        
+        left = HyperLogLog(12).add_hashes(hashes[:50_000])
+        right = HyperLogLog(12).add_hashes(hashes[50_000:])
+        assert left.merge(right).estimate() == pytest.approx(hll.estimate())
+    
+    def test_kll_quantiles_within_rank_error(self):
+        """Test merged KLL quantiles are within the rank error bound."""
+        rng = np.random.default_rng(2)
+        data = rng.normal(size=200_000)
+        seeds = np.random.SeedSequence(2).spawn(8)
+        sketch = KLLSketch(200, seeds[0])
+        for chunk, seed in zip(np.array_split(data, 7), seeds[1:]):
+            sketch.merge(KLLSketch(200, seed).update(chunk))
+        
+        qs = [0.1, 0.25, 0.5, 0.75, 0.9]
+        estimated = sketch.quantiles(qs)
+        ranks = np.searchsorted(np.sort(data), estimated) / len(data)
+        assert sketch.count == len(data)
+        assert np.all(np.abs(ranks - qs) < sketch.rank_error)
+    
+    def test_bloom_filter_counts_duplicates(self, values):
+        """Test Bloom filter duplicate count is close to exact."""
+        bloom = BloomFilter(capacity=50_000, error_rate=0.001)
+        for chunk in np.array_split(hash_values(pd.Series(values)), 10):
+            bloom.add_hashes(chunk)
+        exact = len(values) - len(np.unique(values))
+        assert exact <= bloom.duplicates <= exact + 0.01 * len(values)
+    
+    def test_approximate_profile_report(self):
+        """Test approximate profiler reports sketches and error bounds."""
+        rng = np.random.default_rng(3)
+        df = pd.DataFrame({
+            "Area": pd.Categorical(rng.choice([f"Area {i}" for i in range(300)], 5_000)),
+            "Value": rng.normal(size=5_000)
+        })
+        df = pd.concat([df, df.iloc[:100]], ignore_index=True)
+        
+        left = DataProfiler(approximate=True, seed=1).update(df.iloc[:2_000])
+        right = DataProfiler(approximate=True, seed=2).update(df.iloc[2_000:])
+        profiler = left.merge(right)
+        report = profiler.report()
+        
+        assert report["duplicate_rows"] == pytest.approx(df.duplicated().sum(), abs=5)
+        assert set(report["approximation"]) >= {"distinct_relative_std_error", "quantile_rank_error"}
+        assert profiler.distinct_counts()["Area"] == pytest.approx(300, rel=0.1)
+        median = profiler.quantiles([0.5])["Value"][0]
+        assert abs((df["Value"] < median).mean() - 0.5) < report["approximation"]["quantile_rank_error"]
+        
+        with pytest.raises(ValueError):
+            profiler.merge(DataProfiler().update(df))
+    
+    def test_loader_approximate_summary(self, tmp_path):
+        """Test loader summary and stream report in approximate mode."""
+        shutil.copy(Path("data") / "WHR2024.csv", tmp_path / "WHR2024.csv")
+        pd.DataFrame({
+            "Area": ["Finland", "Sweden", "Finland"],
+            "Year": [1961, 2000, 2011],
+            "Value": [1.0, 2.0, 3.0]
+        }).to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        
+        loader = DataLoader(str(tmp_path))
+        summary = loader.get_summary_statistics(approximate=True)
+        assert summary["Food"]["unique_areas"] == 2
+        assert "approximation" in summary["WHR"]
+        assert summary["WHR"]["numeric_summary"]["Ladder score"]["50%"] == pytest.approx(
+            loader.whr_data["Ladder score"].median(), abs=0.1)
+        
+        stream_report = loader.get_food_stream_report(chunksize=2, approximate=True)
+        assert stream_report["distinct_counts"]["Area"] == 2
+        assert stream_report["numeric_summary"]["Value"]["50%"] == pytest.approx(2.0)
+
+
+class TestSchemas:
+    """Test declared loader schemas."""
+    
+    @pytest.fixture
+    def food_dir(self, tmp_path):
+        """Create a data directory with a padded-header food CSV."""
+        text = (
+            "\ufeffArea , Item,Element,Unit,Year,Value\n"
+            "Finland,Fish,Food supply,kg,2010,30.5\n"
+            "Sweden,Fish,Food supply,kg,2010,25.0\n"
+            "Finland,Milk,Food supply,kg,2011,\n"
+        )
+        (tmp_path / "EdibleFoods-1961-2011.csv").write_text(text, encoding="utf-8")
+        return tmp_path
+    
+    def test_food_schema_dtypes(self, food_dir):
+        """Test compact and categorical dtypes and header cleanup."""
+        food = DataLoader(str(food_dir), use_cache=False).load_food_data()
+        assert list(food.columns) == ["Area", "Item", "Element", "Unit", "Year", "Value"]
+        for col in ["Area", "Item", "Element", "Unit"]:
+            assert isinstance(food[col].dtype, pd.CategoricalDtype)
+        assert food["Year"].dtype == np.int16
+        assert food["Value"].dtype == np.float32
+    
+    def test_fao_layout_loads(self, tmp_path):
+        """Test a full FAO-layout food file loads and indexes by area name."""
+        pd.DataFrame({
+            "Area Code": [67, 67, 210],
+            "Area": ["Finland", "Finland", "Sweden"],
+            "Item Code": [2761, 2848, 2761],
+            "Item": ["Fish", "Milk", "Fish"],
+            "Element": ["Food supply quantity (kg/capita/yr)"] * 3,
+            "Year": [2010, 2010, 2010],
+            "Unit": ["kg"] * 3,
+            "Value": [30.5, 130.0, 25.0]
+        }).to_csv(tmp_path / "EdibleFoods-1961-2011.csv", index=False)
+        
+        loader = DataLoader(str(tmp_path), use_cache=False)
+        food = loader.load_food_data()
+        assert food["Area Code"].dtype == np.int32
+        assert loader.food_index.positions("finland").tolist() == [0, 1]
+    
+    def test_schema_disabled(self, food_dir):
+        """Test inferred dtypes when schema is off."""
+        food = DataLoader(str(food_dir), use_cache=False, use_schema=False).load_food_data()
+        assert food["Area"].dtype == object
+        assert food["Year"].dtype == np.int64
+    
+    def test_quality_report_memory(self):
+        """Test quality report shows memory before and after schema."""
+        loader = DataLoader("data", use_cache=False)
+        report = DataLoader._quality_report(loader.load_whr_data())
+        assert report["memory_usage_mb_inferred"] >= report["memory_usage_mb"]
+        assert "memory_savings_percent" in report
+    
+    def test_clean_whr_keeps_country_names(self):
+        """Test numeric coercion leaves text columns intact."""
+        whr = DataCleaner.clean_whr_data(DataLoader("data", use_cache=False).load_whr_data())
+        assert whr["Country name"].notna().all()
+        assert "Finland" in set(whr["Country name"])
+
+
 class TestDataCleaner:
     """Test DataCleaner class."""
     